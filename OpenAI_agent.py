@@ -1,24 +1,60 @@
+import html
 import os
+import threading
 import time
-from openai import OpenAI
 from typing import Optional
 
+import metrics
+from desc_compactor import compact_description
+from storage import get_repo
+from summary_cache import cache as summary_cache, make_key
+
 API_KEY = os.getenv("OPENAI_API_KEY")
-if not API_KEY:
-    raise SystemExit("OPENAI_API_KEY не встановлений")
 
-client = OpenAI(api_key=API_KEY)
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """
+    Спільний клієнт OpenAI. SDK імпортується лише тут: він важить більшу частину
+    холодного старту, а тік без summary і порад його не потребує.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            if not API_KEY:
+                # не SystemExit: у фонових потоках (SummaryPipeline, TipsPool) він мовчки вбив би потік
+                raise RuntimeError("OPENAI_API_KEY не встановлений")
+            from openai import OpenAI
+            _client = OpenAI(api_key=API_KEY)
+        return _client
 
 MODEL = "gpt-5-mini"
 MAX_RETRIES = 3
 RETRY_BACKOFF = 1.5  # множник між спробами
 DEFAULT_TIMEOUT = 30
+# змінюй при кожній правці промпту summary — інакше кеш віддаватиме старі відповіді
+SUMMARY_PROMPT_VERSION = "1"
 
+def output_text(resp) -> str:
+    """Текст відповіді Responses API (спільне для sync і async клієнтів)."""
+    if hasattr(resp, "output_text") and resp.output_text:
+        return resp.output_text.strip()
+    out = ""
+    for item in getattr(resp, "output", []) or []:
+        for c in getattr(item, "content", []) or []:
+            if isinstance(c, dict) and c.get("type") == "output_text":
+                out += c.get("text", "")
+            elif isinstance(c, str):
+                out += c
+    return out.strip()
+
+@metrics.timed('openai')
 def _call_openai(prompt: str, timeout: int = DEFAULT_TIMEOUT, temperature: float = 0.7, top_p: float = 0.9, max_output_tokens: int = 300) -> str:
     delay = 1.0
     for attempt in range(1, MAX_RETRIES + 1):
         try:
-            resp = client.responses.create(
+            resp = get_client().responses.create(
                 model=MODEL,
                 input=prompt,
                 temperature=temperature,
@@ -26,26 +62,16 @@ def _call_openai(prompt: str, timeout: int = DEFAULT_TIMEOUT, temperature: float
                 max_output_tokens=max_output_tokens,
                 timeout=timeout
             )
-            if hasattr(resp, "output_text") and resp.output_text:
-                return resp.output_text.strip()
-            out = ""
-            for item in getattr(resp, "output", []) or []:
-                for c in getattr(item, "content", []) or []:
-                    if isinstance(c, dict) and c.get("type") == "output_text":
-                        out += c.get("text", "")
-                    elif isinstance(c, str):
-                        out += c
-            return out.strip()
+            return output_text(resp)
         except Exception as exc:
+            metrics.inc('openai_errors_total')
             if attempt == MAX_RETRIES:
                 raise
             time.sleep(delay)
             delay *= RETRY_BACKOFF
 
-def summarize_description(text: str) -> str:
-    if not text:
-        return ""
-    prompt = f"""
+def build_summary_prompt(text: str) -> str:
+    return f"""
 Стисни опис вакансії до короткого повідомлення для Telegram-каналу.
 Формат:
 — короткий вступ з назвою посади;
@@ -58,17 +84,36 @@ def summarize_description(text: str) -> str:
 Текст опису:
 {text}
 """
-    return _call_openai(prompt, timeout=DEFAULT_TIMEOUT)
 
-def create_useful_tips(num_tips: int = 3, locale: str = "uk") -> str:
+def summarize_description(text: str, job_id: Optional[int] = None) -> str:
     """
-    Згенерувати короткі корисні tips для junior.
-    Інструкції: кожна порада має бути унікальною, охоплювати різну тему
-    (наприклад: інструменти, soft-skill, інтерв'ю, навчальні ресурси, практика).
-    Не повторювати однакові фрази/словосполучення. Повернути маркований список.
+    Summary опису вакансії. Текст спершу стискається (desc_compactor); для job_id
+    оцінка токенів до/після записується в jobs.
     """
+    if not text:
+        return ""
+    text, key, cached = prepare_summary_input(text, job_id)
+    if cached:
+        return cached
+    summary = _call_openai(build_summary_prompt(text), timeout=DEFAULT_TIMEOUT)
+    summary_cache.put(key, summary)
+    return summary
+
+def prepare_summary_input(text: str, job_id: Optional[int] = None) -> tuple[str, str, Optional[str]]:
+    """Стиснути опис, записати оцінку токенів і глянути в кеш: (текст, ключ кешу, готовий summary або None)."""
+    compacted = compact_description(text)
+    metrics.inc('desc_tokens_total', compacted.tokens_before, kind='before')
+    metrics.inc('desc_tokens_total', compacted.tokens_after, kind='after')
+    if job_id is not None:
+        get_repo().save_desc_tokens(job_id, compacted.tokens_before, compacted.tokens_after)
+    text = compacted.text or text
+    # той самий текст під новим URL — беремо готовий summary з кешу
+    key = make_key(text, MODEL, SUMMARY_PROMPT_VERSION)
+    return text, key, summary_cache.get(key)
+
+def build_tips_prompt(num_tips: int = 3, locale: str = "uk") -> str:
     lang_note = "українською" if locale.startswith("uk") else "англійською"
-    prompt = f"""
+    return f"""
 Твоя задача — згенерувати {num_tips} коротких корисних порад для junior розробників.
 УМОВИ:
 - Мова: {lang_note}.
@@ -81,9 +126,8 @@ def create_useful_tips(num_tips: int = 3, locale: str = "uk") -> str:
 — ...
 — ...
 """
-    # трохи вища temperature + широкий top_p для більшої варіативності
-    raw = _call_openai(prompt, timeout=DEFAULT_TIMEOUT, temperature=0.85, top_p=0.95, max_output_tokens=256)
 
+def extract_tips(raw: str, num_tips: int) -> list[str]:
     # просте постоброблення: видалити надлишкові порожні рядки, гарантувати потрібну кількість елементів
     lines = [l.strip() for l in raw.splitlines() if l.strip()]
     # зберігаємо тільки марковані рядки або перші num_tips рядків як fallback
@@ -92,34 +136,52 @@ def create_useful_tips(num_tips: int = 3, locale: str = "uk") -> str:
         # fallback: взяти перші непорожні рядки і маркувати їх
         nonblank = [l for l in lines if not l.startswith("Почни")][:num_tips]
         tips = [f"— {l.lstrip('—-• ')}" for l in nonblank][:num_tips]
+    return tips
+
+def merge_tips(tips: list[str], alt_raw: str, num_tips: int) -> list[str]:
+    alt_lines = [l.strip() for l in alt_raw.splitlines() if l.strip()]
+    alt_tips = [l for l in alt_lines if l.startswith(("—", "-", "•"))]
+    for t in alt_tips:
+        if t not in tips and len(tips) < num_tips:
+            tips.append(t)
+    return tips
+
+def create_useful_tips(num_tips: int = 3, locale: str = "uk") -> str:
+    """
+    Згенерувати короткі корисні tips для junior.
+    Інструкції: кожна порада має бути унікальною, охоплювати різну тему
+    (наприклад: інструменти, soft-skill, інтерв'ю, навчальні ресурси, практика).
+    Не повторювати однакові фрази/словосполучення. Повернути маркований список.
+    """
+    prompt = build_tips_prompt(num_tips, locale)
+    # трохи вища temperature + широкий top_p для більшої варіативності
+    raw = _call_openai(prompt, timeout=DEFAULT_TIMEOUT, temperature=0.85, top_p=0.95, max_output_tokens=256)
+    tips = extract_tips(raw, num_tips)
     # якщо модель все ще повторює — спроба генерації ще раз з іншою temperature (простий retry)
     if len(set(tips)) < len(tips):
         alt = _call_openai(prompt, timeout=DEFAULT_TIMEOUT, temperature=0.95, top_p=1.0, max_output_tokens=256)
-        alt_lines = [l.strip() for l in alt.splitlines() if l.strip()]
-        alt_tips = [l for l in alt_lines if l.startswith(("—", "-", "•"))]
-        for t in alt_tips:
-            if t not in tips and len(tips) < num_tips:
-                tips.append(t)
+        tips = merge_tips(tips, alt, num_tips)
     # trim to requested count
     tips = tips[:num_tips]
     return "\n".join(tips)
 
 def format_for_telegram(title: str, company: str = "", salary: str = "", url: str = "", summary: str = "") -> str:
-    comp_line = f"🏢 {company}\n" if company else ""
-    salary_line = f"💰 {salary}\n\n" if salary else "💰 Зарплата не вказана\n\n"
+    # повідомлення йде з parse_mode=HTML: «<» чи «&» у полях картки Telegram відхилить (400)
+    comp_line = f"🏢 {html.escape(company)}\n" if company else ""
+    salary_line = f"💰 {html.escape(salary)}\n\n" if salary else "💰 Зарплата не вказана\n\n"
     message = (
-        f"🧑‍💻 <b>{title}</b>\n"
+        f"🧑‍💻 <b>{html.escape(title or '')}</b>\n"
         f"{comp_line}"
         f"{salary_line}"
-        f"{summary}\n\n"
-        f"🔗 <a href='{url}'>Детальніше</a>"
+        f"{html.escape(summary or '')}\n\n"
+        f"🔗 <a href='{html.escape(url or '', quote=True)}'>Детальніше</a>"
     )
     return message
 
 def create_vacancy_summary(title: str, company: str = "", salary: str = "", url: str = "") -> str:
     """
     Згенерувати підсумок вакансії. Якщо вдасться — витягнути повний опис з url через desc_parser,
-    інакше скористатись заголовком/полями.
+    інакше скористатись заголовком/полями. Повторний текст обслуговується з кешу summarize_description.
     """
     try:
         from desc_parser import get_vacancy_description
@@ -0,0 +1,85 @@
+"""
+Бенчмарк запису пачки вакансій: старий шлях (commit + SELECT на кожен рядок)
+проти store_jobs (одна транзакція + executemany). «bulk» міряє сам запис
+(перевірка карток на дублікати вимкнена), «bulk+dedup» — разом із нею.
+Усі картки різні, тож «reported» має дорівнювати кількості нових посилань.
+
+Запуск з кореня проєкту:
+    python -m benchmarks.bulk_insert
+"""
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+
+import dedup
+import parser_work_ua
+import storage
+
+BATCH_SIZES = (50, 1000, 10000)
+
+
+def make_items(n: int, offset: int = 0):
+    # різні назви в межах компанії — схожість слів 0.5, нижче порогу дубліката
+    return [
+        {"link": f"https://www.work.ua/jobs/{offset + i}/", "title": f"Junior developer #{offset + i}",
+         "company": f"Company {i % 97}", "salary": "25 000 грн", "posted_at": ""}
+        for i in range(n)
+    ]
+
+
+def legacy_store(items):
+    # копія старої логіки fetch_and_store для порівняння
+    conn = sqlite3.connect(storage.DB_PATH)
+    cur = conn.cursor()
+    inserted = []
+    for job in items:
+        link = job["link"]
+        now = datetime.utcnow().isoformat()
+        cur.execute(
+            "INSERT OR IGNORE INTO jobs (title, company, link, salary, summary, inserted_at, posted_on_telegram) VALUES (?, ?, ?, ?, ?, ?, 0)",
+            (job["title"], "", link, "", "", now)
+        )
+        conn.commit()
+        row = conn.execute("SELECT id FROM jobs WHERE link = ?", (link,)).fetchone()
+        if row:
+            inserted.append(link)
+    conn.close()
+    return inserted
+
+
+def bulk_store(items):
+    dedup.get_detector().threshold = 0
+    return parser_work_ua.store_jobs(items)
+
+
+def bulk_dedup_store(items):
+    dedup.get_detector().threshold = dedup.DEDUP_THRESHOLD
+    return parser_work_ua.store_jobs(items)
+
+
+def run(fn, items):
+    start = time.perf_counter()
+    result = fn(items)
+    elapsed = time.perf_counter() - start
+    return elapsed, len(result)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'batch':>6} {'path':>15} {'seconds':>9} {'rows/sec':>10} {'reported':>9}")
+        for n in BATCH_SIZES:
+            for name, fn in (("legacy", legacy_store), ("bulk", bulk_store), ("bulk+dedup", bulk_dedup_store)):
+                storage.use_database(os.path.join(tmp, f"{name}_{n}.db"))
+                parser_work_ua.init_db()
+                # перший прохід — усі рядки нові
+                elapsed, reported = run(fn, make_items(n))
+                print(f"{n:>6} {name:>15} {elapsed:>9.4f} {n / elapsed:>10.0f} {reported:>9}")
+                # другий прохід — половина вже є в БД (як на звичайному циклі)
+                elapsed, reported = run(fn, make_items(n, offset=n // 2))
+                print(f"{n:>6} {name + '/50%':>15} {elapsed:>9.4f} {n / elapsed:>10.0f} {reported:>9}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Холодний старт: скільки коштує запуск процесу бота з нуля.
+
+Кожен замір — окремий процес python, як у cron / serverless:
+  — import main (без мережі і БД);
+  — main.py --once на локальних заглушках: перший тік (нова сторінка списку,
+    пост з summary і порада) і наступний (список не змінився, кулдаун не минув).
+Для кожного друкується медіана часу і які важкі модулі довелося імпортувати.
+
+Запуск з кореня проєкту:
+    python -m benchmarks.cold_start
+    python -m benchmarks.cold_start --runs 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.servers import OpenAIServer, TelegramServer, WorkUaServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ('openai', 'bs4', 'lxml', 'requests')
+
+_IMPORT = """
+import sys, time
+t = time.perf_counter()
+import main
+print({"ms": (time.perf_counter() - t) * 1000, "heavy": [m for m in %r if m in sys.modules]})
+""" % (HEAVY,)
+
+_ONCE = """
+import sys, time
+t = time.perf_counter()
+import parser_work_ua
+parser_work_ua.BASE = %(workua)r
+parser_work_ua.URL = %(workua)r + "/jobs-junior/"
+import main
+main.TELEGRAM_API_URL = %(telegram)r
+main.TELEGRAM_SEND_URL = %(telegram)r + "/sendMessage"
+main.TELEGRAM_SEND_PHOTO_URL = %(telegram)r + "/sendPhoto"
+main.run_once()
+print({"ms": (time.perf_counter() - t) * 1000, "heavy": [m for m in %(heavy)r if m in sys.modules]})
+"""
+
+
+def _run(code: str, env: dict) -> dict:
+    t = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    result = eval(out.stdout.strip().splitlines()[-1])  # noqa: S307 — наш власний вивід
+    result["process_ms"] = (time.perf_counter() - t) * 1000
+    return result
+
+
+def _summary(name: str, results: list[dict]) -> dict:
+    return {
+        "case": name,
+        "runs": len(results),
+        "process_ms_p50": statistics.median(r["process_ms"] for r in results),
+        "in_process_ms_p50": statistics.median(r["ms"] for r in results),
+        "heavy_modules": sorted(set().union(*(r["heavy"] for r in results))),
+    }
+
+
+def measure(runs: int = 5) -> list[dict]:
+    tmp = tempfile.TemporaryDirectory()
+    workua = WorkUaServer(pages=1).start()
+    telegram = TelegramServer().start()
+    openai_srv = OpenAIServer(reply="— порада перша\n— порада друга\n— порада третя").start()
+    env = dict(os.environ)
+    env.update({
+        "TG_BOT_TOKEN": "cold", "TG_CHAT_ID": "@cold", "TG_TEST_MODE": "1", "LOG_LEVEL": "WARNING",
+        "OPENAI_API_KEY": "cold", "OPENAI_BASE_URL": openai_srv.base_url, "METRICS_PORT": "0",
+        "PAGE_CACHE_DIR": os.path.join(tmp.name, "pages"), "ARCHIVE_DIR": os.path.join(tmp.name, "archive"),
+    })
+    results = [_summary("import main", [_run(_IMPORT, env) for _ in range(runs)])]
+
+    once = _ONCE % {"workua": workua.url, "telegram": telegram.bot_url("cold"), "heavy": HEAVY}
+    first, steady = [], []
+    for i in range(runs):
+        # кожна пара тіків — на свіжій БД: перший постить, другий нічого не має робити
+        env["JOBS_DB_PATH"] = os.path.join(tmp.name, f"cold{i}.db")
+        first.append(_run(once, env))
+        steady.append(_run(once, env))
+    results.append(_summary("--once (first tick: crawl+post+tip)", first))
+    results.append(_summary("--once (idle tick: 304, cooldown)", steady))
+
+    for srv in (workua, telegram, openai_srv):
+        srv.stop()
+    tmp.cleanup()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замір холодного старту бота")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--json', action='store_true', help="вивести результат як JSON")
+    args = parser.parse_args()
+    results = measure(args.runs)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'case':<40} {'runs':>5} {'process ms':>11} {'in-proc ms':>11}  heavy modules")
+    for r in results:
+        print(f"{r['case']:<40} {r['runs']:>5} {r['process_ms_p50']:>11.0f} {r['in_process_ms_p50']:>11.0f}  "
+              f"{', '.join(r['heavy_modules']) or '—'}")
+
+
+if __name__ == '__main__':
+    main()
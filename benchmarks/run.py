@@ -0,0 +1,369 @@
+"""
+Офлайн-бенчмарк гарячих шляхів бота.
+
+Усе локально: фікстури work.ua (benchmarks/fixtures), синтетичні бази на
+1k/100k/1M вакансій і заглушки work.ua, Telegram та OpenAI (benchmarks/servers.py).
+Для кожного кейсу друкуються p50/p90/p99 і пропускна здатність; якщо є
+збережений baseline — порівнюємо p50 і повертаємо код 1 при регресії.
+
+Запуск з кореня проєкту:
+    python -m benchmarks.run                       # 1k і 100k
+    python -m benchmarks.run --sizes 1000,100000,1000000
+    python -m benchmarks.run --save-baseline       # записати benchmarks/baseline.json
+    python -m benchmarks.run --only parse,unposted
+    python -m benchmarks.run --only openai         # 429/Retry-After, AIMD і fallback батчу (з перевірками)
+    python -m benchmarks.run --record-fixtures     # перезаписати фікстури з живого work.ua
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.servers import FIXTURES, OpenAIServer, TelegramServer, WorkUaServer, load_fixture
+from benchmarks.synthetic_db import synthetic_db
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+DEFAULT_SIZES = (1000, 100000)
+REGRESSION_THRESHOLD = 0.25  # +25% до p50 вважаємо регресією
+
+
+def percentile(sorted_values, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[idx]
+
+
+def measure(name: str, fn, iterations: int, warmup: int = 1, items_per_call: int = 1) -> dict:
+    for _ in range(warmup):
+        fn()
+    samples = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    total = time.perf_counter() - start
+    samples.sort()
+    return {
+        "name": name,
+        "iterations": iterations,
+        "p50_ms": percentile(samples, 0.50) * 1000,
+        "p90_ms": percentile(samples, 0.90) * 1000,
+        "p99_ms": percentile(samples, 0.99) * 1000,
+        "throughput": iterations * items_per_call / total if total else 0.0,
+    }
+
+
+def print_result(r: dict, baseline: dict):
+    line = f"{r['name']:<38} {r['iterations']:>6} {r['p50_ms']:>10.3f} {r['p90_ms']:>10.3f} {r['p99_ms']:>10.3f} {r['throughput']:>12.1f}"
+    base = baseline.get(r['name'])
+    if base:
+        delta = (r['p50_ms'] - base['p50_ms']) / base['p50_ms'] if base['p50_ms'] else 0.0
+        flag = "  REGRESSION" if delta > REGRESSION_THRESHOLD else ""
+        line += f" {delta:>+8.0%}{flag}"
+        r['regression'] = bool(flag)
+    print(line, flush=True)
+
+
+def check(result: dict, actual: dict, expected: dict):
+    """Лічильники кейсу проти очікуваних: розбіжності друкуються і дають код виходу 1."""
+    failures = [f"{k}={actual.get(k)!r}, expected {v!r}" for k, v in expected.items() if actual.get(k) != v]
+    if failures:
+        result['failures'] = failures
+        print(f"  FAILED {result['name']}: " + "; ".join(failures), flush=True)
+
+
+def openai_cases(openai_srv, workua, add, tmp_dir: str, n: int = 40, concurrency: int = 8):
+    """
+    Async-движок і батч проти заглушки OpenAI: 429 з Retry-After (повтори, AIMD-ліміт)
+    і fallback батчу на async-виклики. Крім часу перевіряємо лічильники успіхів, повторів і fallback.
+    """
+    import asyncio
+
+    import openai_async
+    import openai_batch
+    import storage
+    from openai import AsyncOpenAI
+
+    # --- AsyncOpenAIEngine: перші rate_limited відповідей — 429 ---
+    rate_limited = 5
+    seen = {}
+
+    def engine_run():
+        async def go():
+            client = AsyncOpenAI(api_key="bench", base_url=openai_srv.base_url, max_retries=0)
+            engine = openai_async.AsyncOpenAIEngine(client=client, max_concurrency=concurrency, base_delay=0.01)
+            waits, limits = [], []
+            on_rate_limited = engine.rate.on_rate_limited
+
+            def record(wait):
+                on_rate_limited(wait)
+                waits.append(wait)
+                limits.append(engine.rate.limit)
+            engine.rate.on_rate_limited = record
+            try:
+                out = await engine.summarize_many((i, f"Опис async-вакансії #{i}: python, sql, git") for i in range(n))
+            finally:
+                await engine.aclose()
+            return out, engine, waits, limits
+
+        openai_srv.rate_limit_next = rate_limited
+        openai_srv.max_in_flight = 0
+        out, engine, waits, limits = asyncio.run(go())
+        seen.update(engine.stats, ok=sum(not isinstance(v, Exception) for v in out.values()),
+                    retry_after_honoured=all(w == float(openai_srv.retry_after) for w in waits),
+                    limit_halved=bool(limits) and min(limits) <= concurrency / 2,
+                    limit_recovered=bool(limits) and engine.rate.limit > min(limits),
+                    within_limit=openai_srv.max_in_flight <= concurrency)
+
+    r = measure(f"async_engine[{n},429x{rate_limited}]", engine_run, 1, warmup=0, items_per_call=n)
+    add(r)
+    check(r, seen, {'ok': n, 'calls': n + rate_limited, 'rate_limited': rate_limited, 'retries': rate_limited,
+                    'timeouts': 0, 'errors': 0, 'retry_after_honoured': True, 'limit_halved': True,
+                    'limit_recovered': True, 'within_limit': True})
+
+    # --- run_batch_summaries: батч і fallback на async, коли батч не вдався ---
+    vacancy_for = workua.vacancy_for
+    # різні описи — інакше кеш summary і дедуплікація описів забрали б більшість вакансій
+    workua.vacancy_for = lambda job_id: workua.vacancy_html.replace(
+        'id="job-description">', f'id="job-description"><p>Вакансія {job_id}: ' +
+        " ".join(f"навичка{job_id * 7 + k}" for k in range(12)) + '</p>', 1)
+    storage.use_database(os.path.join(tmp_dir, "openai.db"))
+    repo = storage.get_repo()
+    repo.init_schema()
+    batch_no = iter(range(10 ** 6))
+
+    def batch_run(fail: bool) -> dict:
+        base = 8000000 + next(batch_no) * 1000
+        repo.insert_jobs([{'link': f"{workua.url}/jobs/{base + i}/", 'title': f"Junior #{base + i}",
+                           'company': f"Bench {base + i}", 'salary': None, 'posted_at': None, 'source': 'bench'}
+                          for i in range(n)])
+        openai_srv.fail_batches = fail
+        openai_srv.rate_limit_next = 3 if fail else 0
+        try:
+            stats = openai_batch.run_batch_summaries(limit=n, poll_interval=0.01, timeout=10)
+            # 429 у fallback мали бути повторені, а не стати помилками
+            return dict(stats, rate_limit_left=openai_srv.rate_limit_next)
+        finally:
+            openai_srv.fail_batches = False
+
+    try:
+        for fail, expected in ((False, {'batched': n, 'batch_ok': n, 'fallback_ok': 0}),
+                               (True, {'batched': n, 'batch_ok': 0, 'fallback_ok': n})):
+            stats = {}
+            r = measure(f"batch_summaries[{n},{'fallback' if fail else 'batch'}]",
+                        lambda: stats.update(batch_run(fail)), 1, warmup=0, items_per_call=n)
+            add(r)
+            check(r, stats, dict(expected, jobs=n, cached=0, duplicates=0, failed=0, rate_limit_left=0))
+    finally:
+        workua.vacancy_for = vacancy_for
+        repo.close()
+        storage.use_database(os.path.join(tmp_dir, "bench.db"))
+
+
+def record_fixtures():
+    import http_client
+    from parser_work_ua import URL, parse_listing
+
+    listing = http_client.get(URL, timeout=15)
+    listing.raise_for_status()
+    jobs = parse_listing(listing.text)
+    if not jobs:
+        raise SystemExit("no job cards on the live page — not overwriting fixtures")
+    vacancy = http_client.get(jobs[0]['link'], timeout=15)
+    vacancy.raise_for_status()
+    for name, text in (('listing.html', listing.text), ('vacancy.html', vacancy.text)):
+        with open(os.path.join(FIXTURES, name), 'w', encoding='utf-8') as f:
+            f.write(text)
+    print(f"recorded {len(jobs)} cards and {jobs[0]['link']}")
+
+
+def run(sizes, only=None) -> list:
+    workua = WorkUaServer(pages=3).start()
+    telegram = TelegramServer().start()
+    openai_srv = OpenAIServer().start()
+
+    # модулі читають оточення під час імпорту — налаштовуємо до нього
+    os.environ["OPENAI_API_KEY"] = "bench"
+    os.environ["OPENAI_BASE_URL"] = openai_srv.base_url
+    os.environ.setdefault("TG_BOT_TOKEN", "bench")
+    os.environ.setdefault("TG_CHAT_ID", "@bench")
+
+    import storage
+    import parser_work_ua
+    import liveness
+    import desc_parser
+    import job_queue
+    import OpenAI_agent
+    import rate_limiter
+    import vacancy_page
+    import search
+    import main as bot
+
+    tmp = tempfile.TemporaryDirectory()
+    storage.use_database(os.path.join(tmp.name, "bench.db"))
+    parser_work_ua.init_db()
+    parser_work_ua.BASE = workua.url
+    parser_work_ua.URL = workua.url + "/jobs-junior/"
+    bot.TELEGRAM_SEND_URL = telegram.bot_url() + "/sendMessage"
+    bot.TELEGRAM_SEND_PHOTO_URL = telegram.bot_url() + "/sendPhoto"
+    # міряємо HTTP-шлях, а не ліміти Telegram (20 повідомлень/хв на чат)
+    bot.telegram_limiter = rate_limiter.TelegramRateLimiter(global_rate=1e9, per_chat_rate=1e9, per_chat_burst=1e9)
+
+    listing_html = load_fixture('listing.html')
+    vacancy_url = workua.url + "/jobs/5100000/"
+    results = []
+
+    def want(key: str) -> bool:
+        return not only or key in only
+
+    def add(r):
+        results.append(r)
+        print_result(r, BASELINE)
+
+    if want("parse"):
+        add(measure("parse_listing", lambda: parser_work_ua.parse_listing(listing_html), 200, items_per_call=20))
+
+    if want("fetch"):
+        def fetch_changed():
+            workua.offset += 100000  # нові id на сторінці → новий digest і нові рядки
+            parser_work_ua.fetch_and_store()
+        add(measure("fetch_and_store[changed]", fetch_changed, 20))
+        add(measure("fetch_and_store[unchanged]", parser_work_ua.fetch_and_store, 50))
+
+    if want("insert"):
+        counter = iter(range(10 ** 9))
+
+        def insert_batch():
+            base = next(counter) * 100
+            parser_work_ua.store_jobs([
+                {"link": f"https://www.work.ua/jobs/{9000000 + base + i}/", "title": f"Junior #{i}",
+                 "company": "Bench", "salary": "20 000 грн", "posted_at": ""}
+                for i in range(20)
+            ])
+        add(measure("store_jobs[20]", insert_batch, 100, items_per_call=20))
+
+    for n in sizes:
+        if not (want("unposted") or want("search") or want("delete")):
+            break
+        path = synthetic_db(n, tmp.name)
+        storage.use_database(path)
+        parser_work_ua.init_db()
+        iterations = 50 if n <= 1000 else (10 if n <= 100000 else 3)
+        if want("unposted"):
+            add(measure(f"get_unposted_jobs[{n}]", parser_work_ua.get_unposted_jobs, iterations))
+            queue = job_queue.UnpostedQueue()
+            queue.refresh()
+            add(measure(f"unposted_queue.refresh+head[{n}]", lambda: (queue.refresh(), queue.head(1)), iterations * 10))
+        if want("search"):
+            # FTS5-індекс проти LIKE: часте слово (кожна 20-та назва), префікс, рідкісний збіг і запит без збігів.
+            # LIKE тут без ранжування (новіші першими) і зупиняється на першій сторінці — на частих словах
+            # це йому фора; запит без збігів показує його реальну ціну — повне сканування таблиці
+            repo = storage.get_repo()
+            for query in ("python", "kotl", "salesforce company 42", "senior rust"):
+                terms = search.query_terms(query)
+                match = search.match_expression(terms)
+                add(measure(f"search[fts,{query}][{n}]", lambda: repo.search_jobs(match, 6), iterations * 10))
+                add(measure(f"search[like,{query}][{n}]", lambda: repo.search_jobs_like(terms, 6), iterations))
+        if want("delete"):
+            # перший виклик (у warmup) видаляє ~25% — далі міряємо сталий щохвилинний прохід
+            add(measure(f"delete_old_jobs[{n}]", lambda: parser_work_ua.delete_old_jobs(days=30), iterations))
+        storage.get_repo().close()
+        storage.use_database(os.path.join(tmp.name, "bench.db"))
+
+    # is_vacancy_active / get_vacancy_description — холодний шлях без кешу сторінок
+    vacancy_page.cache = vacancy_page.PageCache(os.path.join(tmp.name, "pages"), max_bytes=0)
+    if want("liveness"):
+        add(measure("is_vacancy_active", lambda: liveness.is_vacancy_active(vacancy_url), 50))
+
+    if want("description"):
+        add(measure("get_vacancy_description", lambda: desc_parser.get_vacancy_description(vacancy_url), 50))
+
+    if want("liveness") and want("description"):
+        def check_and_describe():
+            liveness.is_vacancy_active(vacancy_url)
+            desc_parser.get_vacancy_description(vacancy_url)
+        add(measure("liveness+description[no cache]", check_and_describe, 50))
+        vacancy_page.cache = vacancy_page.PageCache(os.path.join(tmp.name, "pages"))
+        # перевірка актуальності — умовний GET (304), опис — з кешу
+        add(measure("liveness+description[page cache]", check_and_describe, 50))
+
+    if want("compact"):
+        import desc_compactor
+        description = desc_parser.get_vacancy_description(vacancy_url)
+        compacted = desc_compactor.compact_description(description)
+        print(f"(description tokens: {compacted.tokens_before} -> {compacted.tokens_after})")
+        add(measure("compact_description", lambda: desc_compactor.compact_description(description), 2000))
+
+    if want("format"):
+        add(measure("format_for_telegram", lambda: OpenAI_agent.format_for_telegram(
+            "Junior Python developer", "SoftServe", "25 000 грн", vacancy_url, "Короткий опис " * 40), 10000))
+
+    if want("summarize"):
+        texts = iter(range(10 ** 9))
+        add(measure("summarize_description[stand-in]",
+                    lambda: OpenAI_agent.summarize_description(f"Опис вакансії #{next(texts)}"), 20))
+
+    if want("telegram"):
+        add(measure("send_to_telegram[message]", lambda: bot.send_to_telegram("bench"), 20))
+        add(measure("send_to_telegram[photo]", lambda: bot.send_to_telegram("bench", bot.PHOTO_PATH), 20))
+
+    if want("openai"):
+        openai_cases(openai_srv, workua, add, tmp.name)
+
+    for srv in (workua, telegram, openai_srv):
+        srv.stop()
+    tmp.cleanup()
+    return results
+
+
+def load_baseline() -> dict:
+    if not os.path.exists(BASELINE_PATH):
+        return {}
+    with open(BASELINE_PATH, encoding='utf-8') as f:
+        return json.load(f)
+
+
+BASELINE = {}
+
+
+def main():
+    global BASELINE
+    parser = argparse.ArgumentParser(description="Офлайн-бенчмарк гарячих шляхів бота")
+    parser.add_argument('--sizes', default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="розміри синтетичних баз через кому")
+    parser.add_argument('--only', default="",
+                        help="кейси через кому: parse,fetch,insert,unposted,search,delete,liveness,description,compact,format,summarize,telegram,openai")
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--record-fixtures', action='store_true')
+    args = parser.parse_args()
+
+    if args.record_fixtures:
+        record_fixtures()
+        return
+
+    BASELINE = {} if args.save_baseline else load_baseline()
+    if not BASELINE and not args.save_baseline:
+        print("(no baseline yet — run with --save-baseline to store one)")
+    print(f"{'case':<38} {'iters':>6} {'p50 ms':>10} {'p90 ms':>10} {'p99 ms':>10} {'ops/sec':>12}"
+          + (f" {'vs base':>8}" if BASELINE else ""))
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    only = {s.strip() for s in args.only.split(",") if s.strip()}
+    results = run(sizes, only)
+
+    if args.save_baseline:
+        with open(BASELINE_PATH, 'w', encoding='utf-8') as f:
+            json.dump({r['name']: {k: v for k, v in r.items() if k not in ('name', 'failures')} for r in results},
+                      f, indent=2)
+        print(f"baseline saved to {BASELINE_PATH}")
+        return
+    if any(r.get('regression') or r.get('failures') for r in results):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
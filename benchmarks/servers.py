@@ -0,0 +1,293 @@
+"""
+Локальні заглушки зовнішніх сервісів для бенчмарків і симуляцій.
+
+WorkUaServer — сторінки списку (?page=N) і вакансій з фікстур, з ETag/304.
+TelegramServer — sendMessage/sendPhoto, повертає file_id як справжній API.
+OpenAIServer — /v1/responses (з інжекцією 429 і повільних відповідей) і мінімальні /v1/files + /v1/batches.
+
+Кожен сервер піднімається у фоновому потоці на випадковому порту:
+    with WorkUaServer() as srv:
+        requests.get(srv.url + "/jobs-junior/")
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+def load_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return f.read()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, як у справжніх сервісів
+    disable_nagle_algorithm = True  # інакше delayed ACK додає ~40 мс до кожної відповіді
+
+    def log_message(self, *args):
+        pass
+
+    def _body(self) -> bytes:
+        n = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(n) if n else b""
+
+    def _send(self, status: int, body: bytes, content_type: str = "application/json", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _json(self, obj, status: int = 200):
+        self._send(status, json.dumps(obj, ensure_ascii=False).encode("utf-8"))
+
+
+class _BaseServer:
+    handler = _Handler
+
+    def __init__(self, latency: float = 0.0):
+        # штучна затримка відповіді, щоб імітувати мережу
+        self.latency = latency
+        self.requests = 0
+        self._httpd = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        server = self
+        handler = type("Handler", (self.handler,), {"server_ref": server})
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self._httpd.daemon_threads = True
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def hit(self):
+        self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+
+# --- work.ua ---
+
+class _WorkUaHandler(_Handler):
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        srv = self.server_ref
+        srv.hit()
+        path, _, query = self.path.partition("?")
+        m = re.search(r"page=(\d+)", query)
+        page = int(m.group(1)) if m else 1
+        if re.match(r"^/jobs/\d+/?$", path):
+            job_id = int(path.strip("/").split("/")[-1])
+            if job_id in srv.gone:
+                return self._send(404, "<html><body>Сторінку не знайдено</body></html>".encode(), "text/html; charset=utf-8")
+            body = srv.vacancy_for(job_id).encode("utf-8")
+            etag = '"%s"' % hashlib.md5(body).hexdigest()
+            if self.headers.get("If-None-Match") == etag:
+                return self._send(304, b"", "text/html; charset=utf-8", {"ETag": etag})
+            return self._send(200, body, "text/html; charset=utf-8", {"ETag": etag})
+        if page > srv.pages:
+            return self._send(200, b"<html><body></body></html>", "text/html; charset=utf-8")
+        body = srv.listing_for(page).encode("utf-8")
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        if self.headers.get("If-None-Match") == etag:
+            return self._send(304, b"", "text/html; charset=utf-8", {"ETag": etag})
+        self._send(200, body, "text/html; charset=utf-8", {"ETag": etag})
+
+
+class WorkUaServer(_BaseServer):
+    handler = _WorkUaHandler
+
+    def __init__(self, pages: int = 3, latency: float = 0.0):
+        super().__init__(latency)
+        self.pages = pages
+        self.listing_html = load_fixture('listing.html')
+        self.vacancy_html = load_fixture('vacancy.html')
+        self.gone = set()   # id вакансій, що віддають 404
+        self.offset = 0     # зсув id — «нові вакансії» без зміни фікстури
+
+    def vacancy_for(self, job_id: int) -> str:
+        return self.vacancy_html
+
+    def listing_for(self, page: int) -> str:
+        # кожна сторінка — та сама фікстура з унікальними id
+        shift = self.offset + (page - 1) * 1000
+
+        def repl(m):
+            return f"{m.group(1)}{int(m.group(2)) + shift}"
+        return re.sub(r"(/jobs/|job-)(\d+)", repl, self.listing_html)
+
+
+# --- Telegram ---
+
+class _TelegramHandler(_Handler):
+    def do_POST(self):
+        srv = self.server_ref
+        srv.hit()
+        body = self._body()
+        method = self.path.rsplit("/", 1)[-1]
+        if method == "getUpdates":
+            offset = json.loads(body or b"{}").get("offset", 0)
+            return self._json({"ok": True, "result": [u for u in srv.updates if u["update_id"] >= offset]})
+        srv.sent.append((method, len(body)))
+        srv.payloads.append((method, body))
+        if srv.fail_next:
+            srv.fail_next -= 1
+            return self._json({"ok": False, "error_code": 429, "description": "Too Many Requests: retry after 1",
+                               "parameters": {"retry_after": 1}}, status=429)
+        result = {"message_id": len(srv.sent), "date": int(time.time())}
+        if method == "sendPhoto":
+            result["photo"] = [{"file_id": "small-file-id"}, {"file_id": "bench-file-id"}]
+        self._json({"ok": True, "result": result})
+
+
+class TelegramServer(_BaseServer):
+    handler = _TelegramHandler
+
+    def __init__(self, latency: float = 0.0):
+        super().__init__(latency)
+        self.sent = []
+        self.payloads = []   # (метод, тіло запиту) — для перевірки відповідей /search
+        self.updates = []    # що віддає getUpdates
+        self.fail_next = 0
+
+    def bot_url(self, token: str = "bench") -> str:
+        return f"{self.url}/bot{token}"
+
+
+# --- OpenAI ---
+
+def _response_body(text: str) -> dict:
+    return {
+        "id": "resp_" + uuid.uuid4().hex[:12],
+        "object": "response",
+        "created_at": int(time.time()),
+        "status": "completed",
+        "model": "stand-in",
+        "output": [{"id": "msg_1", "type": "message", "role": "assistant", "status": "completed",
+                    "content": [{"type": "output_text", "text": text, "annotations": []}]}],
+        "usage": {"input_tokens": 1, "output_tokens": 1, "total_tokens": 2},
+    }
+
+
+class _OpenAIHandler(_Handler):
+    def do_POST(self):
+        srv = self.server_ref
+        srv.hit()
+        body = self._body()
+        if self.path.endswith("/responses"):
+            with srv.lock:
+                limited = srv.rate_limit_next > 0
+                if limited:
+                    srv.rate_limit_next -= 1
+                slow = not limited and srv.slow_next > 0
+                if slow:
+                    srv.slow_next -= 1
+                srv.in_flight += 1
+                srv.max_in_flight = max(srv.max_in_flight, srv.in_flight)
+            try:
+                if limited:
+                    return self._send(429, b'{"error":{"message":"rate limited","type":"requests"}}',
+                                      headers={"Retry-After": srv.retry_after, "x-ratelimit-remaining-requests": "0"})
+                if slow:
+                    time.sleep(srv.slow_seconds)
+                req = json.loads(body or b"{}")
+                prompt = req.get("input", "")
+                reply = srv.reply(prompt) if callable(srv.reply) else srv.reply
+                with srv.lock:
+                    srv.prompts.append(prompt)
+                    srv.replies.append(reply)
+                body = json.dumps(_response_body(reply), ensure_ascii=False).encode("utf-8")
+                return self._send(200, body, headers={"x-ratelimit-remaining-requests": "100",
+                                                      "x-ratelimit-reset-requests": "1s"})
+            finally:
+                with srv.lock:
+                    srv.in_flight -= 1
+        if self.path.endswith("/files"):
+            m = re.search(rb'filename="[^"]*"\r\n(?:[^\r\n]+\r\n)*\r\n(.*?)\r\n--', body, re.S)
+            file_id = "file-" + uuid.uuid4().hex[:8]
+            srv.files[file_id] = m.group(1) if m else b""
+            return self._json({"id": file_id, "object": "file", "bytes": len(srv.files[file_id]),
+                               "created_at": int(time.time()), "filename": "batch.jsonl",
+                               "purpose": "batch", "status": "processed"})
+        if self.path.endswith("/batches"):
+            req = json.loads(body)
+            lines = [json.loads(line) for line in srv.files[req["input_file_id"]].decode().splitlines() if line]
+            out = "\n".join(json.dumps({
+                "id": "batch_req_" + str(i),
+                "custom_id": line["custom_id"],
+                "response": {"status_code": 200, "body": _response_body(
+                    srv.reply(line["body"].get("input", "")) if callable(srv.reply) else srv.reply)},
+                "error": None,
+            }) for i, line in enumerate(lines))
+            out_id = "file-" + uuid.uuid4().hex[:8]
+            srv.files[out_id] = out.encode()
+            batch_id = "batch_" + uuid.uuid4().hex[:8]
+            srv.batches[batch_id] = {
+                "id": batch_id, "object": "batch", "endpoint": req["endpoint"],
+                "input_file_id": req["input_file_id"], "completion_window": req["completion_window"],
+                "status": "failed" if srv.fail_batches else "completed",
+                "output_file_id": None if srv.fail_batches else out_id, "created_at": int(time.time()),
+            }
+            return self._json(srv.batches[batch_id])
+        self._send(404, b'{"error":{"message":"not found"}}')
+
+    def do_GET(self):
+        srv = self.server_ref
+        srv.hit()
+        m = re.search(r"/batches/([^/]+)$", self.path)
+        if m and m.group(1) in srv.batches:
+            return self._json(srv.batches[m.group(1)])
+        m = re.search(r"/files/([^/]+)/content$", self.path)
+        if m and m.group(1) in srv.files:
+            return self._send(200, srv.files[m.group(1)], "application/octet-stream")
+        self._send(404, b'{"error":{"message":"not found"}}')
+
+
+class OpenAIServer(_BaseServer):
+    handler = _OpenAIHandler
+
+    def __init__(self, latency: float = 0.0, reply: str = "Коротко: junior-вакансія, вимоги базові, навчання є."):
+        super().__init__(latency)
+        self.reply = reply        # рядок або reply(prompt) -> рядок
+        self.prompts = []
+        self.replies = []
+        self.files = {}
+        self.batches = {}
+        self.rate_limit_next = 0  # скільки наступних /responses відповісти 429
+        self.retry_after = "0.05"  # Retry-After у цих відповідях, секунди
+        self.slow_next = 0        # скільки наступних /responses відповісти із затримкою slow_seconds
+        self.slow_seconds = 2.0
+        self.fail_batches = False  # батчі завершуються зі status=failed без output_file — шлях fallback
+        self.in_flight = 0
+        self.max_in_flight = 0    # найбільша кількість одночасних /responses
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return f"{self.url}/v1"
@@ -0,0 +1,370 @@
+"""
+Наскрізна симуляція бота на віртуальному годиннику.
+
+Справжній планувальник з main.build_scheduler працює на scheduler.VirtualClock:
+sleep() лише зсуває час, тож тиждень роботи проганяється за хвилини. Зовнішні
+сервіси — локальні заглушки (benchmarks/servers.py):
+  — work.ua: потік нових вакансій (Пуассон, rate × scale на годину), частина
+    закривається (404), частина — перевиставлення старих під новим id;
+  — OpenAI: різні summary/поради на кожен запит (щоб кеші й дедуплікація
+    поводились як у житті), токени рахуються для оцінки вартості;
+  — Telegram: приймає все; TelegramRateLimiter теж на віртуальному часі.
+
+Звіт — таймлайн по добах: нові/пропущені/опубліковані вакансії, глибина черги,
+затримка від появи на work.ua до поста (p50/p90), запізнення слотів порад,
+виклики й вартість OpenAI. Метки часу в БД (inserted_at, checked_at) лишаються
+настінними, тож retention і TTL перевірок тут не моделюються.
+
+Запуск з кореня проєкту:
+    python -m benchmarks.simulate                          # тиждень, 10x
+    python -m benchmarks.simulate --days 3 --scale 1 --channels 2
+    python -m benchmarks.simulate --json sim.json
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import random
+import statistics
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.servers import OpenAIServer, TelegramServer, WorkUaServer
+
+# вакансій на годину в jobs-junior зараз (оцінка) — множиться на --scale
+BASE_RATE = 6.0
+PAGE_SIZE = 20
+
+_LEVELS = ("Junior", "Trainee", "Intern", "Junior+", "Стажер")
+_STACKS = ("Python", "Java", "JavaScript", "Frontend", "QA", "Data", "DevOps", "PHP", "C#", ".NET", "Go",
+           "Android", "iOS", "React", "Node.js", "Flutter", "1C", "Support", "SQL", "Unity")
+_ROLES = ("developer", "engineer", "розробник", "спеціаліст", "analyst")
+_CITIES = ("Київ", "Львів", "Дніпро", "Харків", "Одеса", "віддалено")
+_SYLLABLES = ("soft", "data", "lab", "tech", "sys", "ware", "net", "byte", "cloud", "dev", "nova", "grid",
+              "pixel", "core", "logic", "bit", "mind", "flow", "stack", "quant")
+_WORDS = ("код", "тести", "ревʼю", "API", "бази", "документація", "інтеграції", "звіти", "клієнти", "команда",
+          "ментор", "навчання", "релізи", "баги", "дизайн", "аналітика", "сервіси", "моніторинг", "CI",
+          "мікросервіси", "дашборди", "автоматизація", "безпека", "продуктивність", "хмара", "мобільні",
+          "платежі", "логістика", "маркетинг", "контент", "пошук", "рекомендації", "чат-боти", "CRM")
+
+CARD = """<div class="card card-hover card-search wordwrap job-link js-job-link-blank mt-lg" id="job-{id}">
+  <h2 class="my-0"><a href="/jobs/{id}/" title="{title}, вакансія">{title}</a></h2>
+  <div class="mt-xs"><span class="strong-600">{salary}</span></div>
+  <div class="mt-xs"><span class="mr-xs"><span class="strong-600">{company}</span></span><span class="">{city}</span></div>
+  <div class="mt-sm"><time datetime="{posted}">{posted}</time></div>
+</div>
+"""
+PAGE = '<html><body><main class="container"><div id="pjax-jobs-list">\n{cards}</div></main></body></html>'
+VACANCY = ('<html><head><title>{title}</title></head><body><h1>{title}</h1>'
+           '<div id="job-description">{body}</div></body></html>')
+
+
+class TrafficWorkUaServer(WorkUaServer):
+    """work.ua з потоком вакансій: список — найновіші відкриті, сторінка вакансії — її власний опис."""
+
+    def __init__(self, rng: random.Random, pages: int = 1, latency: float = 0.0):
+        super().__init__(pages=pages, latency=latency)
+        self.rng = rng
+        self.jobs = {}       # id -> dict(title, company, salary, city, body)
+        self.open_ids = []   # відкриті, від найновішої
+        self.next_id = 7000000
+
+    def add(self, now: datetime, repost_of: int = None) -> int:
+        job_id = self.next_id
+        self.next_id += 1
+        if repost_of is not None and repost_of in self.jobs:
+            job = dict(self.jobs[repost_of])
+        else:
+            rng = self.rng
+            job = {
+                'title': f"{rng.choice(_LEVELS)} {rng.choice(_STACKS)} {rng.choice(_ROLES)}",
+                'company': "".join(rng.sample(_SYLLABLES, 2)).capitalize(),
+                'salary': f"{rng.randrange(15, 45)} 000 грн" if rng.random() < 0.6 else "",
+                'city': rng.choice(_CITIES),
+                'body': self._description(),
+            }
+        job['posted'] = now.strftime("%Y-%m-%d %H:%M:%S")
+        self.jobs[job_id] = job
+        self.open_ids.insert(0, job_id)
+        return job_id
+
+    def _description(self) -> str:
+        rng = self.rng
+        parts = []
+        for heading in ("Обов'язки:", "Вимоги:", "Ми пропонуємо:"):
+            parts.append(f"<p>{heading}</p><ul>")
+            for _ in range(rng.randrange(3, 7)):
+                parts.append("<li>" + " ".join(rng.sample(_WORDS, 5)) + f" {rng.randrange(1000)}</li>")
+            parts.append("</ul>")
+        return "".join(parts)
+
+    def close(self, job_id: int):
+        self.gone.add(job_id)
+        if job_id in self.open_ids:
+            self.open_ids.remove(job_id)
+
+    def listing_for(self, page: int) -> str:
+        ids = self.open_ids[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]
+        return PAGE.format(cards="".join(CARD.format(id=i, **self.jobs[i]) for i in ids))
+
+    def vacancy_for(self, job_id: int) -> str:
+        job = self.jobs.get(job_id)
+        if job is None:
+            return self.vacancy_html
+        return VACANCY.format(title=job['title'], body=job['body'])
+
+
+def _fake_openai_reply(rng: random.Random):
+    def reply(prompt: str) -> str:
+        # поради — кілька різних рядків, summary — короткий текст
+        if "порад" in prompt.lower() or "tips" in prompt.lower():
+            return "\n".join("— " + " ".join(rng.sample(_WORDS, 6)) for _ in range(3))
+        return "Коротко: " + " ".join(rng.sample(_WORDS, 12))
+    return reply
+
+
+def _pct(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def simulate(days: float = 7, scale: float = 10, rate: float = BASE_RATE, channels: int = 1,
+             close_rate: float = 0.2, repost_rate: float = 0.05, crawl_interval: int = 300,
+             price_in: float = 0.25, price_out: float = 2.0, seed: int = 1,
+             start: datetime = None) -> dict:
+    rng = random.Random(seed)
+    tmp = tempfile.TemporaryDirectory()
+    workua = TrafficWorkUaServer(rng).start()
+    telegram = TelegramServer().start()
+    openai_srv = OpenAIServer(reply=_fake_openai_reply(random.Random(seed + 1))).start()
+
+    # модулі читають оточення під час імпорту — налаштовуємо до нього
+    os.environ["OPENAI_API_KEY"] = "sim"
+    os.environ["OPENAI_BASE_URL"] = openai_srv.base_url
+    os.environ["TG_BOT_TOKEN"] = "sim"
+    os.environ["TG_CHAT_ID"] = "@sim0"
+    os.environ["TG_TEST_MODE"] = "0"
+    os.environ["METRICS_PORT"] = "0"
+    os.environ["JOBS_DB_PATH"] = os.path.join(tmp.name, "sim.db")
+    os.environ["PAGE_CACHE_DIR"] = os.path.join(tmp.name, "pages")
+    os.environ["ARCHIVE_DIR"] = os.path.join(tmp.name, "archive")
+    if channels > 1:
+        os.environ["TG_CHANNELS"] = json.dumps([{"chat_id": f"@sim{i}"} for i in range(channels)])
+
+    import storage
+    import parser_work_ua
+    import liveness
+    import rate_limiter
+    from desc_compactor import estimate_tokens
+    from scheduler import VirtualClock, latest_daily_slot
+    import main as bot
+
+    storage.use_database(os.path.join(tmp.name, "sim.db"))
+    parser_work_ua.init_db()
+    parser_work_ua.BASE = workua.url
+    parser_work_ua.URL = workua.url + "/jobs-junior/"
+    bot.TELEGRAM_SEND_URL = telegram.bot_url("sim") + "/sendMessage"
+    bot.TELEGRAM_SEND_PHOTO_URL = telegram.bot_url("sim") + "/sendPhoto"
+    bot.CRAWL_INTERVAL = crawl_interval
+    # актуальність перевіряємо завжди мережею (кеш сторінок живе в настінному часі)
+    liveness.LIVENESS_MAX_AGE = 0
+
+    start = start or datetime(2026, 10, 5, 6, 0, tzinfo=timezone.utc)  # понеділок, 09:00 за Києвом
+    end = start + timedelta(days=days)
+    clock = VirtualClock(start)
+    bot.clock = clock
+    bot.telegram_limiter = rate_limiter.TelegramRateLimiter(monotonic=clock.monotonic, sleep=clock.sleep)
+
+    arrivals = {}         # link -> віртуальний час появи на work.ua
+    posts = []            # (час, chat_id, link)
+    tips = []             # (час, слот, ok)
+    samples = []          # (час, глибина черги)
+    daily = defaultdict(lambda: defaultdict(int))
+
+    def day_of(dt: datetime) -> int:
+        return int((dt - start).total_seconds() // 86400)
+
+    orig_post_vacancy = bot.post_vacancy
+    orig_send_tips = bot.send_tips
+
+    def post_vacancy(logger, candidate, channel):
+        ok = orig_post_vacancy(logger, candidate, channel)
+        if ok:
+            now = clock.now()
+            posts.append((now, channel.chat_id, candidate['link']))
+            daily[day_of(now)]['posted'] += 1
+        return ok
+
+    def send_tips(logger, tag_key, tag, chat_ids):
+        now = clock.now()
+        ok = orig_send_tips(logger, tag_key, tag, chat_ids)
+        tips.append((now, latest_daily_slot(now, bot.TIP_SCHEDULE, bot.KYIV), ok))
+        return ok
+
+    bot.post_vacancy = post_vacancy
+    bot.send_tips = send_tips
+
+    logger = logging.getLogger("simulate")
+    chans = bot.setup_channels()
+    sched = bot.build_scheduler(logger, chans)
+    repo = storage.get_repo()
+    per_second = rate * scale / 3600.0
+
+    def traffic_job(now: datetime) -> datetime:
+        step = 60
+        for _ in range(_poisson(rng, per_second * step)):
+            repost = None
+            if workua.jobs and rng.random() < repost_rate:
+                repost = rng.choice(list(workua.jobs))
+            job_id = workua.add(now, repost_of=repost)
+            arrivals[f"{workua.url}/jobs/{job_id}/"] = now
+            daily[day_of(now)]['arrived'] += 1
+            if repost is not None:
+                daily[day_of(now)]['reposts'] += 1
+        for job_id in list(workua.open_ids):
+            if rng.random() < close_rate * step / 86400:
+                workua.close(job_id)
+        return now + timedelta(seconds=step)
+
+    def sample_job(now: datetime) -> datetime:
+        depth = repo.conn().execute("SELECT COUNT(*) FROM jobs WHERE posted_on_telegram = 0").fetchone()[0]
+        samples.append((now, depth))
+        return now + timedelta(hours=1)
+
+    def tips_refill_job(now: datetime) -> datetime:
+        # фоновий потік пулу порад — тут кроком планувальника
+        bot.tips_pool.refill()
+        return now + timedelta(minutes=10)
+
+    sched.add('sim_traffic', traffic_job)
+    sched.add('sim_sample', sample_job)
+    sched.add('sim_tips_refill', tips_refill_job)
+
+    wall = time.perf_counter()
+    sched.run_until(end)
+    wall = time.perf_counter() - wall
+
+    # --- звіт ---
+    inserted = {r['link']: r for r in map(dict, repo.conn().execute(
+        "SELECT link, posted_on_telegram, duplicate_of FROM jobs"))}
+    latency = defaultdict(list)
+    for when, _chat, link in posts:
+        if link in arrivals:
+            latency[day_of(when)].append((when - arrivals[link]).total_seconds() / 3600)
+    for link, when in arrivals.items():
+        row = inserted.get(link)
+        if row is None:
+            daily[day_of(when)]['missed'] += 1
+        elif row['posted_on_telegram'] == 2:
+            daily[day_of(when)]['duplicates'] += 1
+    depth_by_day = {}
+    for when, depth in samples:
+        depth_by_day[day_of(when)] = depth
+
+    tokens_in = sum(estimate_tokens(p if isinstance(p, str) else json.dumps(p)) for p in openai_srv.prompts)
+    tokens_out = sum(estimate_tokens(r) for r in openai_srv.replies)
+    tip_delays = [(when - slot).total_seconds() / 60 for when, slot, ok in tips if ok and slot is not None]
+    gaps = defaultdict(list)
+    last = {}
+    for when, chat, _ in posts:
+        if chat in last and when.date() == last[chat].date():
+            gaps[chat].append((when - last[chat]).total_seconds() / 60)
+        last[chat] = when
+
+    timeline = []
+    for d in range(int(days + 0.999)):
+        lat = latency.get(d, [])
+        row = daily[d]
+        timeline.append({
+            'day': d, 'arrived': row['arrived'], 'missed': row['missed'], 'duplicates': row['duplicates'],
+            'posted': row['posted'], 'queue_depth': depth_by_day.get(d),
+            'latency_p50_h': _pct(lat, 0.5), 'latency_p90_h': _pct(lat, 0.9),
+        })
+
+    report = {
+        'params': {'days': days, 'scale': scale, 'rate_per_hour': rate * scale, 'channels': len(chans),
+                   'crawl_interval_s': crawl_interval, 'close_rate_per_day': close_rate, 'repost_rate': repost_rate},
+        'timeline': timeline,
+        'queue_depth_hourly': [depth for _, depth in samples],
+        'posts': len(posts),
+        'post_gap_minutes': {chat: {'mean': statistics.mean(v), 'min': min(v)} for chat, v in gaps.items() if v},
+        'cooldown_minutes': {ch.chat_id: ch.cooldown.total_seconds() / 60 for ch in chans},
+        'tips': {'slots': len(tips), 'sent': sum(1 for *_, ok in tips if ok),
+                 'delay_minutes_p50': _pct(tip_delays, 0.5), 'delay_minutes_max': max(tip_delays, default=None)},
+        'openai': {'calls': len(openai_srv.prompts), 'tokens_in': tokens_in, 'tokens_out': tokens_out,
+                   'cost_usd': round(tokens_in / 1e6 * price_in + tokens_out / 1e6 * price_out, 4)},
+        'requests': {'workua': workua.requests, 'telegram': telegram.requests, 'openai': openai_srv.requests},
+        'wall_seconds': round(wall, 1),
+    }
+
+    for srv in (workua, telegram, openai_srv):
+        srv.stop()
+    storage.get_repo().close()
+    tmp.cleanup()
+    return report
+
+
+def _poisson(rng: random.Random, lam: float) -> int:
+    # Кнут: для малих lam на крок цього достатньо
+    n, p, limit = 0, 1.0, math.exp(-lam)
+    while True:
+        p *= rng.random()
+        if p < limit:
+            return n
+        n += 1
+
+
+def print_report(report: dict):
+    p = report['params']
+    print(f"simulated {p['days']} days, {p['rate_per_hour']:.0f} vacancies/hour, {p['channels']} channel(s), "
+          f"crawl every {p['crawl_interval_s']}s — {report['wall_seconds']}s wall")
+    print(f"{'day':>3} {'arrived':>8} {'missed':>7} {'dupes':>6} {'posted':>7} {'queue':>7} {'lat p50 h':>10} {'lat p90 h':>10}")
+    for row in report['timeline']:
+        fmt = lambda v: f"{v:10.1f}" if v is not None else f"{'—':>10}"
+        print(f"{row['day']:>3} {row['arrived']:>8} {row['missed']:>7} {row['duplicates']:>6} {row['posted']:>7} "
+              f"{row['queue_depth'] if row['queue_depth'] is not None else '—':>7} "
+              f"{fmt(row['latency_p50_h'])} {fmt(row['latency_p90_h'])}")
+    for chat, gap in report['post_gap_minutes'].items():
+        print(f"post gap {chat}: mean {gap['mean']:.1f} min, min {gap['min']:.1f} min "
+              f"(cooldown {report['cooldown_minutes'][chat]:.0f} min)")
+    t = report['tips']
+    print(f"tips: {t['sent']}/{t['slots']} slots sent, delay p50 {t['delay_minutes_p50']} min, max {t['delay_minutes_max']} min")
+    o = report['openai']
+    print(f"openai: {o['calls']} calls, ~{o['tokens_in']} in / ~{o['tokens_out']} out tokens, ~${o['cost_usd']}")
+    print(f"requests: {report['requests']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Симуляція бота на віртуальному годиннику")
+    parser.add_argument('--days', type=float, default=7)
+    parser.add_argument('--scale', type=float, default=10, help="множник до поточного потоку вакансій")
+    parser.add_argument('--rate', type=float, default=BASE_RATE, help="поточний потік, вакансій/год")
+    parser.add_argument('--channels', type=int, default=1)
+    parser.add_argument('--crawl-interval', type=int, default=300, help="секунд між crawl (у проді — CRAWL_INTERVAL)")
+    parser.add_argument('--close-rate', type=float, default=0.2, help="частка відкритих вакансій, що закриваються за добу")
+    parser.add_argument('--repost-rate', type=float, default=0.05)
+    parser.add_argument('--price-in', type=float, default=0.25, help="$ за 1M вхідних токенів")
+    parser.add_argument('--price-out', type=float, default=2.0, help="$ за 1M вихідних токенів")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', help="зберегти повний звіт у файл")
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    report = simulate(days=args.days, scale=args.scale, rate=args.rate, channels=args.channels,
+                      close_rate=args.close_rate, repost_rate=args.repost_rate,
+                      crawl_interval=args.crawl_interval, price_in=args.price_in, price_out=args.price_out,
+                      seed=args.seed)
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2, default=str)
+
+
+if __name__ == '__main__':
+    main()
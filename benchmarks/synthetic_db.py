@@ -0,0 +1,67 @@
+"""
+Синтетичні бази jobs заданого розміру (1k / 100k / 1M рядків).
+
+Частина рядків уже опублікована, частина старша за 30 днів — як у живій базі.
+Побудовані файли кешуються в теці (за замовчуванням .bench_cache/), бо
+мільйон рядків генерується секунди.
+"""
+import os
+import shutil
+import sqlite3
+from datetime import datetime, timedelta
+
+import storage
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.bench_cache')
+
+_SUMMARY = "Шукаємо junior-розробника. Вимоги: базові знання, Git, англійська. Пропонуємо навчання і ментора. " * 3
+# стек у назві — щоб пошук (search.py) мав і часті, і рідкісні слова
+_STACKS = ("Python", "Java", "QA", "Frontend", "DevOps", "PHP", "Android", "iOS", "Data", "Golang",
+           "C#", "Ruby", "Scala", "Elixir", "Rust", "Kotlin", "Flutter", "Unity", "SAP", "Salesforce")
+# версія вмісту: змінюється разом із _rows, щоб не брати застарілий шаблон з кешу
+_VERSION = 2
+
+
+def _rows(n: int):
+    now = datetime.utcnow()
+    for i in range(n):
+        # рівномірно за останні 40 днів: ~25% рядків старші за 30 днів
+        inserted = now - timedelta(seconds=(40 * 86400) * (n - i) / n)
+        posted = 1 if i < n * 0.7 else 0
+        yield (
+            f"Junior {_STACKS[i % len(_STACKS)]} developer #{i}", f"Company {i % 997}",
+            f"https://www.work.ua/jobs/{1000000 + i}/",
+            f"{15 + i % 30} 000 грн", _SUMMARY if i % 4 else "", inserted.isoformat(), posted,
+        )
+
+
+def build(n: int, path: str):
+    if os.path.exists(path):
+        os.remove(path)
+    repo = storage.JobRepository(path)
+    repo.init_schema()
+    with repo.transaction() as conn:
+        conn.executemany(
+            "INSERT INTO jobs (title, company, link, salary, summary, inserted_at, posted_on_telegram) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            _rows(n)
+        )
+        if repo.has_fts():
+            # insert_jobs індексує свої рядки сам; сирий INSERT — через rebuild
+            conn.execute("INSERT INTO jobs_fts (jobs_fts) VALUES ('rebuild')")
+    repo.close()
+
+
+def synthetic_db(n: int, workdir: str, cache_dir: str = CACHE_DIR) -> str:
+    """Шлях до робочої копії бази з n рядків у workdir (шаблон кешується в cache_dir)."""
+    os.makedirs(cache_dir, exist_ok=True)
+    template = os.path.join(cache_dir, f"jobs_{n}_v{_VERSION}.db")
+    if not os.path.exists(template):
+        build(n, template)
+        # WAL-файли шаблону не потрібні — зливаємо все в основний файл
+        conn = sqlite3.connect(template)
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.close()
+    path = os.path.join(workdir, f"jobs_{n}.db")
+    shutil.copyfile(template, path)
+    return path
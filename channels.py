@@ -0,0 +1,110 @@
+"""
+Канали Telegram, у які бот постить вакансії.
+
+Кожен канал — chat_id, список категорій work.ua (sources) і власний кулдаун.
+Налаштування беруться з TG_CHANNELS (JSON), наприклад:
+    [{"chat_id": "@junior_jobs", "sources": ["jobs-junior/"], "cooldown": 3600},
+     {"chat_id": "@python_jobs", "sources": ["jobs-python/"], "cooldown": 1800}]
+і синхронізуються в таблицю channels; там же зберігається last_post_time каналу.
+Без TG_CHANNELS працює один канал із TG_CHAT_ID — як і раніше.
+Вакансія публікується один раз: якщо категорія спільна для кількох каналів,
+її отримує той канал, чия черга дійде першою.
+"""
+import json
+import threading
+from datetime import timedelta
+from typing import Optional
+
+from job_queue import UnpostedQueue
+from storage import JobRepository, get_repo
+
+
+class Channel:
+    def __init__(self, chat_id: str, sources: list[str], cooldown: timedelta, repo: Optional[JobRepository] = None):
+        self.repo = repo or get_repo()
+        self.chat_id = chat_id
+        self.sources = list(sources)
+        self.cooldown = cooldown
+        self.queue = UnpostedQueue(self.repo, sources=self.sources)
+
+    @property
+    def last_post_time(self) -> Optional[str]:
+        row = self.repo.get_channel(self.chat_id)
+        return row['last_post_time'] if row else None
+
+    def mark_posted(self, when_iso: str):
+        self.repo.set_channel_last_post(self.chat_id, when_iso)
+
+    def __repr__(self):
+        return f"Channel({self.chat_id!r}, sources={self.sources}, cooldown={self.cooldown})"
+
+
+def parse_channels(raw: Optional[str], default_chat_id: Optional[str], default_sources: list[str],
+                   default_cooldown: timedelta) -> list[dict]:
+    """Конфіг каналів з TG_CHANNELS або один канал за замовчуванням з TG_CHAT_ID."""
+    if not raw:
+        if not default_chat_id:
+            return []
+        return [{'chat_id': default_chat_id, 'sources': list(default_sources),
+                 'cooldown': default_cooldown.total_seconds()}]
+    try:
+        items = json.loads(raw)
+    except ValueError as e:
+        raise SystemExit(f"TG_CHANNELS is not valid JSON: {e}")
+    configs = []
+    for item in items:
+        if not item.get('chat_id'):
+            raise SystemExit(f"TG_CHANNELS entry without chat_id: {item!r}")
+        sources = item.get('sources') or list(default_sources)
+        if isinstance(sources, str):
+            sources = [s.strip() for s in sources.split(',') if s.strip()]
+        configs.append({'chat_id': str(item['chat_id']), 'sources': sources,
+                        'cooldown': float(item.get('cooldown', default_cooldown.total_seconds()))})
+    return configs
+
+
+def load_channels(configs: list[dict], repo: Optional[JobRepository] = None,
+                  legacy_chat_id: Optional[str] = None, legacy_last_post: Optional[str] = None) -> list[Channel]:
+    """
+    Записати конфіг у таблицю channels і повернути канали з чергами.
+    legacy_* — глобальний last_post_time з meta (до появи каналів): переносимо його
+    у канал TG_CHAT_ID, щоб оновлення не зламало поточний кулдаун.
+    """
+    repo = repo or get_repo()
+    channels = []
+    for cfg in configs:
+        fresh = repo.get_channel(cfg['chat_id']) is None
+        repo.upsert_channel(cfg['chat_id'], cfg['sources'], cfg['cooldown'])
+        if fresh and legacy_last_post and cfg['chat_id'] == legacy_chat_id:
+            repo.set_channel_last_post(cfg['chat_id'], legacy_last_post)
+        channels.append(Channel(cfg['chat_id'], cfg['sources'], timedelta(seconds=cfg['cooldown']), repo))
+    return channels
+
+
+def all_sources(channels: list[Channel]) -> list[str]:
+    """Об'єднання категорій усіх каналів у порядку появи — їх і обходить краулер."""
+    seen = []
+    for channel in channels:
+        for source in channel.sources:
+            if source not in seen:
+                seen.append(source)
+    return seen
+
+
+class Claims:
+    """Вакансії, які зараз публікує якийсь канал: паралельні воркери не беруть одну й ту саму."""
+
+    def __init__(self):
+        self._ids = set()
+        self._lock = threading.Lock()
+
+    def claim(self, job_id: int) -> bool:
+        with self._lock:
+            if job_id in self._ids:
+                return False
+            self._ids.add(job_id)
+            return True
+
+    def release(self, job_id: int):
+        with self._lock:
+            self._ids.discard(job_id)
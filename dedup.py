@@ -0,0 +1,237 @@
+"""
+Майже-дублікати вакансій: та сама позиція, перевиставлена під новим посиланням.
+
+Дві стадії:
+  — картка перевіряється ще при вставці: та сама компанія (після нормалізації)
+    і майже та сама назва (схожість Жаккара множин слів >= DEDUP_THRESHOLD).
+    Дублікат одразу потрапляє в БД з posted_on_telegram = 2 і duplicate_of,
+    тож не стає в чергу і не витрачає ні liveness-запитів, ні опису, ні LLM.
+    Без компанії картку не перевіряємо: однакова назва в різних компаній — різні вакансії;
+  — опис (MinHash + LSH, minhash.py) перевіряється після його завантаження, але до
+    виклику LLM (build_summary, openai_batch, openai_async): так ловимо перевиставлення
+    з трохи зміненою назвою. Схожого опису мало — агенції ставлять той самий шаблон
+    під різні посади, тож оригінал має бути тієї ж компанії і з близькою назвою
+    (DEDUP_DESC_TITLE_THRESHOLD, м'якший за поріг картки).
+Пороги схожості налаштовуються через DEDUP_THRESHOLD, DEDUP_DESC_THRESHOLD і
+DEDUP_DESC_TITLE_THRESHOLD (1.0 — лише точні повтори; 0 у змінній — стадію вимкнено).
+
+Індекси будуються ліниво з jobs і далі оновлюються подіями репозиторію.
+"""
+import logging
+import math
+import os
+import threading
+from typing import Optional
+
+import metrics
+from desc_compactor import compact_description
+from minhash import LSHIndex, MinHasher, normalize, sig_from_bytes, sig_to_bytes, word_shingles
+from storage import JobRepository, get_repo
+
+logger = logging.getLogger(__name__)
+
+# назва в межах однієї компанії: «(remote)» чи місто до трьох слів дає 0.75, інший стек — 0.5
+DEDUP_THRESHOLD = float(os.getenv('DEDUP_THRESHOLD', '0.7'))
+DEDUP_DESC_THRESHOLD = float(os.getenv('DEDUP_DESC_THRESHOLD', '0.85'))
+# назва при схожому описі: «Junior Python Developer» проти «Python Developer» — 0.67, «Java» проти «Python» — 0.33
+DEDUP_DESC_TITLE_THRESHOLD = float(os.getenv('DEDUP_DESC_TITLE_THRESHOLD', '0.5'))
+
+
+class DuplicateVacancy(Exception):
+    """Опис вакансії майже повторює вже відому; вакансію знято з черги."""
+
+    def __init__(self, job_id: int, original_id: int, score: float):
+        super().__init__(f"job id={job_id} duplicates id={original_id} ({score:.2f})")
+        self.job_id = job_id
+        self.original_id = original_id
+        self.score = score
+
+
+def card_key(job: dict) -> tuple[str, frozenset]:
+    """(нормалізована компанія, множина слів назви) — те, що порівнює стадія картки."""
+    return normalize(job.get('company')), frozenset(word_shingles(job.get('title') or ''))
+
+
+class CardIndex:
+    """
+    Картки (компанія, слова назви) з інвертованим індексом (компанія, слово) -> ключі.
+    Кандидати — лише картки тієї ж компанії зі спільними рідкісними словами назви,
+    тож перевірка не перебирає всі вакансії великої компанії.
+    """
+
+    def __init__(self):
+        self._cards = {}      # key -> (компанія, слова назви)
+        self._postings = {}   # (компанія, слово) -> set(key)
+
+    def __len__(self) -> int:
+        return len(self._cards)
+
+    def get(self, key) -> Optional[tuple[str, frozenset]]:
+        return self._cards.get(key)
+
+    def add(self, key, company: str, words: frozenset):
+        self.remove(key)
+        self._cards[key] = (company, words)
+        for word in words:
+            self._postings.setdefault((company, word), set()).add(key)
+
+    def remove(self, key):
+        card = self._cards.pop(key, None)
+        if card is None:
+            return
+        company, words = card
+        for word in words:
+            keys = self._postings.get((company, word))
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[(company, word)]
+
+    def best_match(self, company: str, words: frozenset, threshold: float):
+        """(key, схожість Жаккара) найсхожішої картки компанії з схожістю >= threshold або None."""
+        # картка зі схожістю >= threshold містить щонайменше need слів з words, тобто пропускає
+        # не більше len - need — отже, має хоч одне з будь-яких len - need + 1 слів; беремо найрідкісніші
+        need = max(1, math.ceil(threshold * len(words) - 1e-9))
+        postings = [self._postings.get((company, w), ()) for w in words]
+        rarest = len(words) - need + 1
+        if rarest == 1:
+            candidates = min(postings, key=len)
+        else:
+            candidates = set().union(*sorted(postings, key=len)[:rarest])
+        best = None
+        for key in candidates:
+            other = self._cards[key][1]
+            score = len(words & other) / len(words | other)
+            # за рівної схожості — найстаріший оригінал (менший id), щоб результат не залежав від порядку set
+            if score >= threshold and (best is None or (score, best[0]) > (best[1], key)):
+                best = (key, score)
+        return best
+
+
+class DuplicateDetector:
+    def __init__(self, threshold: float = DEDUP_THRESHOLD, desc_threshold: float = DEDUP_DESC_THRESHOLD,
+                 desc_title_threshold: float = DEDUP_DESC_TITLE_THRESHOLD, repo: Optional[JobRepository] = None):
+        self.threshold = threshold
+        self.desc_threshold = desc_threshold
+        self.desc_title_threshold = desc_title_threshold
+        self.repo = repo or get_repo()
+        self._hasher = MinHasher()
+        self._cards = None   # CardIndex оригіналів: job id -> картка
+        self._pending = {}   # link -> картка оригіналів останньої annotate (щоб не рахувати вдруге при вставці)
+        self._descs = None   # LSHIndex: job id -> сигнатура опису
+        self._lock = threading.RLock()
+        self.repo.add_listener(self._on_change)
+
+    def _add_card(self, job_id: int, job: dict):
+        company, words = self._pending.pop(job['link'], None) or card_key(job)
+        if company and words:
+            self._cards.add(job_id, company, words)
+
+    def _ensure_index(self):
+        if self._cards is not None:
+            return
+        cards, descs = CardIndex(), LSHIndex()
+        self._cards = cards
+        for row in self.repo.dedup_rows():
+            self._add_card(row['id'], row)
+            if row['desc_sig']:
+                descs.add(row['id'], sig_from_bytes(row['desc_sig']))
+        self._descs = descs
+
+    def _on_change(self, event: str, payload: list):
+        with self._lock:
+            if self._cards is None:
+                return
+            if event in ('inserted', 'promoted'):
+                # insert_jobs повідомляє лише про оригінали; дублікати в індекс не йдуть.
+                # Повернутий у чергу дублікат приходить обома подіями — add ідемпотентний
+                ids = [p[0] for p in payload] if event == 'inserted' else payload
+                for row in self.repo.dedup_rows(ids):
+                    self._add_card(row['id'], row)
+            elif event == 'deleted':
+                for job_id in payload:
+                    self._cards.remove(job_id)
+                    self._descs.remove(job_id)
+
+    # --- картка: до вставки ---
+
+    def annotate(self, items: list[dict]) -> int:
+        """
+        Позначити дублікати: duplicate_of (id з БД) або duplicate_of_link (раніша вакансія
+        цієї ж пачки). Повертає кількість дублікатів.
+        """
+        if not self.threshold:
+            return 0
+        found = 0
+        with self._lock:
+            self._ensure_index()
+            self._pending = {}
+            batch = CardIndex()   # оригінали цієї пачки: link -> картка
+            for item in items:
+                company, words = card_key(item)
+                if not company or not words:
+                    continue
+                match = self._cards.best_match(company, words, self.threshold)
+                if match is not None:
+                    item['duplicate_of'] = match[0]
+                else:
+                    match = batch.best_match(company, words, self.threshold)
+                    if match is not None:
+                        item['duplicate_of_link'] = match[0]
+                    else:
+                        batch.add(item['link'], company, words)
+                        self._pending[item['link']] = (company, words)
+                        continue
+                found += 1
+                metrics.inc('duplicates_total', stage='card')
+                logger.info("dedup: %r at %s duplicates %s (%.2f)",
+                            item.get('title'), item.get('link'), match[0], match[1])
+        return found
+
+    # --- опис: до LLM ---
+
+    def _same_role(self, card: tuple[str, frozenset], other: Optional[tuple[str, frozenset]]) -> bool:
+        """Та сама компанія і близька назва — лише тоді схожий опис означає ту саму вакансію."""
+        if other is None or other[0] != card[0]:
+            return False
+        return len(card[1] & other[1]) / len(card[1] | other[1]) >= self.desc_title_threshold
+
+    def check_description(self, job_id: int, text: str) -> Optional[tuple[int, float]]:
+        """
+        (id оригіналу, схожість), якщо опис майже повторює опис вакансії тієї ж компанії з близькою
+        назвою — тоді вакансію вже знято з черги. Інакше сигнатура опису зберігається і повертається None.
+        """
+        if not self.desc_threshold or not text:
+            return None
+        # без «Про компанію» і контактів: інакше всі вакансії однієї компанії схожі між собою
+        sig = self._hasher.signature(compact_description(text).text)
+        with self._lock:
+            self._ensure_index()
+            # без картки (нема компанії чи назви) — як і на стадії картки, не перевіряємо
+            card = self._cards.get(job_id)
+            match = None
+            if card is not None:
+                match = next(((key, score) for key, score in self._descs.query(sig, self.desc_threshold)
+                              if key != job_id and self._same_role(card, self._cards.get(key))), None)
+            if match is None:
+                self.repo.save_desc_sig(job_id, sig_to_bytes(sig))
+                self._descs.add(job_id, sig)
+                return None
+        self.repo.mark_duplicate(job_id, match[0])
+        metrics.inc('duplicates_total', stage='description')
+        logger.info("dedup: description of job id=%s duplicates id=%s (%.2f)", job_id, match[0], match[1])
+        return match
+
+
+_detector = None
+_detector_lock = threading.Lock()
+
+
+def get_detector() -> DuplicateDetector:
+    """Спільний детектор поточного репозиторію (перестворюється після storage.use_database)."""
+    global _detector
+    repo = get_repo()
+    with _detector_lock:
+        if _detector is None or _detector.repo is not repo:
+            _detector = DuplicateDetector(repo=repo)
+        return _detector
@@ -0,0 +1,136 @@
+"""
+Стиснення опису вакансії перед відправкою в LLM.
+
+get_vacancy_description повертає весь текст блоку: разом з «Про компанію»,
+контактами HR і рядками, що повторюються. Тут ми:
+  — прибираємо дублікати рядків (після нормалізації пробілів і регістру);
+  — вирізаємо відомі шаблонні секції (про компанію, контакти, як відгукнутися)
+    і окремі контактні рядки (телефони, e-mail, посилання);
+  — обрізаємо текст до бюджету токенів за швидкою оцінкою без токенізатора.
+Результат ідемпотентний: повторне стиснення вже стиснутого тексту нічого не змінює.
+"""
+import math
+import os
+import re
+from typing import NamedTuple
+
+# бюджет вхідних токенів на опис (промпт і відповідь — окремо)
+TOKEN_BUDGET = int(os.getenv('DESC_TOKEN_BUDGET', '1200'))
+
+# заголовки секцій, які для короткого summary не потрібні
+_BOILERPLATE_HEADINGS = re.compile(
+    r"^(про (нас|компанію|компанію .{1,40})|хто ми|о компании|about (us|the company|company)|who we are"
+    r"|контакти|контактна інформація|контакты|contacts?|як (відгукнутися|подати резюме|з нами зв'язатися)"
+    r"|how to apply|надсилайте резюме.*)$",
+    re.IGNORECASE,
+)
+# заголовки змістовних секцій — на них шаблонна секція закінчується
+_CONTENT_HEADINGS = re.compile(
+    r"^(обов'язки|обов’язки|вимоги|ми пропонуємо|пропонуємо|умови( роботи)?|що ми пропонуємо|буде плюсом"
+    r"|requirements|responsibilities|we offer|nice to have|project|проєкт|про проєкт|задачі|завдання)$",
+    re.IGNORECASE,
+)
+_CONTACT_LINE = re.compile(r"([\w.+-]+@[\w-]+\.[\w.]+)|(https?://\S+)|(t\.me/\S+)", re.IGNORECASE)
+# кандидат у телефони; діапазон зарплати «25 000 - 40 000» виглядає так само — розрізняє _is_phone
+_NUMBER_RUN = re.compile(r"\+?\d[\d\s\-()]{8,}\d")
+_WS_RE = re.compile(r"\s+")
+
+
+class Compacted(NamedTuple):
+    text: str
+    tokens_before: int
+    tokens_after: int
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Груба оцінка кількості токенів: ~4 ASCII-символи або ~3 кириличні на токен.
+    Рахується за довжиною рядка і його UTF-8 представлення — без циклу по символах.
+    """
+    if not text:
+        return 0
+    n = len(text)
+    # символи поза ASCII в нашому тексті майже завжди двобайтові (кирилиця)
+    non_ascii = min(n, len(text.encode('utf-8')) - n)
+    return math.ceil((n - non_ascii) / 4 + non_ascii / 3)
+
+
+def _heading_text(line: str) -> str:
+    return line.rstrip(" :—-").strip()
+
+
+def _is_heading(line: str) -> bool:
+    text = _heading_text(line)
+    return bool(text) and len(text) <= 60 and (line.rstrip().endswith(":") or bool(_CONTENT_HEADINGS.match(text))
+                                               or bool(_BOILERPLATE_HEADINGS.match(text)))
+
+
+def _is_phone(number: str) -> bool:
+    """Український номер: +38…, 380… або 0XX…; 10–13 цифр. Зарплата з 0 чи + не починається."""
+    digits = re.sub(r"\D", "", number)
+    if not 10 <= len(digits) <= 13:
+        return False
+    return number.startswith("+") or digits.startswith(("0", "380"))
+
+
+def _is_contact_line(line: str) -> bool:
+    if _CONTACT_LINE.search(line):
+        return True
+    return any(_is_phone(m.group(0)) for m in _NUMBER_RUN.finditer(line))
+
+
+def _clean_lines(text: str) -> list[str]:
+    lines = []
+    seen = set()
+    skipping = False
+    for raw in text.splitlines():
+        line = _WS_RE.sub(" ", raw).strip()
+        if not line:
+            continue
+        if _is_heading(line):
+            heading = _heading_text(line)
+            skipping = bool(_BOILERPLATE_HEADINGS.match(heading))
+            if skipping:
+                continue
+        elif skipping:
+            continue
+        if _is_contact_line(line):
+            continue
+        key = line.casefold()
+        if key in seen:
+            continue
+        seen.add(key)
+        lines.append(line)
+    return lines
+
+
+def _truncate(lines: list[str], budget: int) -> list[str]:
+    out = []
+    used = 0
+    for line in lines:
+        cost = estimate_tokens(line) + 1  # +1 — перенос рядка
+        if used + cost <= budget:
+            out.append(line)
+            used += cost
+            continue
+        # останній рядок, що не влазить, ріжемо по межі слова
+        left = budget - used - 1
+        if left > 8:
+            chars = int(len(line) * left / cost)
+            cut = line[:chars].rsplit(" ", 1)[0]
+            if cut:
+                out.append(cut)
+        break
+    return out
+
+
+def compact_description(text: str, budget: int = TOKEN_BUDGET) -> Compacted:
+    """Стиснутий опис і оцінка токенів до/після."""
+    before = estimate_tokens(text)
+    if not text:
+        return Compacted("", 0, 0)
+    lines = _clean_lines(text)
+    if budget and budget > 0:
+        lines = _truncate(lines, budget)
+    compacted = "\n".join(lines)
+    return Compacted(compacted, before, estimate_tokens(compacted))
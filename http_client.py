@@ -0,0 +1,126 @@
+"""
+Спільний HTTP-клієнт для всіх вихідних запитів (work.ua, api.telegram.org).
+
+Один requests.Session на хост — keep-alive пул з'єднань, тож TLS-рукостискання
+робиться один раз, а не на кожну перевірку/опис. Однакові таймаути,
+gzip (і brotli, якщо встановлений пакет brotli), повтори з backoff, що
+поважають Retry-After, і лічильники запитів/латентності по хостах
+(ті самі дані йдуть і в metrics: http_request_duration_seconds, http_requests_total).
+"""
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import metrics
+
+try:
+    import brotli  # noqa: F401 — urllib3 сам розпаковує br, якщо модуль є
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)'
+DEFAULT_TIMEOUT = (5, 15)  # (connect, read), seconds
+POOL_SIZE = 8              # з'єднань на хост — не менше за кількість воркерів краулера/prefetcher
+
+# GET/HEAD ідемпотентні — повторюємо і на 5xx; POST (Telegram) — лише коли запит точно не дійшов
+# (помилка з'єднання) або сервер прямо попросив почекати (429 + Retry-After)
+_IDEMPOTENT_RETRY = dict(
+    total=3, connect=2, read=2, backoff_factor=0.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset(("GET", "HEAD")),
+    respect_retry_after_header=True, raise_on_status=False,
+)
+_POST_RETRY = dict(
+    total=3, connect=2, read=0, backoff_factor=1.0,
+    status_forcelist=(429,),
+    allowed_methods=frozenset(("GET", "HEAD", "POST")),
+    respect_retry_after_header=True, raise_on_status=False,
+)
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _make_session(retry_kwargs: dict) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE, max_retries=Retry(**retry_kwargs))
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({'User-Agent': USER_AGENT, 'Accept-Encoding': ACCEPT_ENCODING})
+    return session
+
+
+def session_for(url: str, method: str = "GET") -> requests.Session:
+    """Сесія для (хост, клас методу). POST живе в окремій сесії з обережнішими повторами."""
+    parts = urlsplit(url)
+    kind = "post" if method.upper() == "POST" else "idempotent"
+    key = (parts.scheme, parts.netloc, kind)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = _make_session(_POST_RETRY if kind == "post" else _IDEMPOTENT_RETRY)
+            _sessions[key] = session
+        return session
+
+
+def _record(host: str, method: str, status, elapsed: float, error: bool):
+    metrics.observe('http_request_duration_seconds', elapsed, host=host, method=method)
+    metrics.inc('http_requests_total', host=host, method=method, status=status or 'error')
+    with _stats_lock:
+        s = _stats.get(host)
+        if s is None:
+            s = _stats[host] = {'requests': 0, 'errors': 0, 'total_seconds': 0.0, 'max_seconds': 0.0}
+        s['requests'] += 1
+        s['errors'] += int(error)
+        s['total_seconds'] += elapsed
+        s['max_seconds'] = max(s['max_seconds'], elapsed)
+
+
+def request(method: str, url: str, **kwargs) -> requests.Response:
+    kwargs.setdefault('timeout', DEFAULT_TIMEOUT)
+    host = urlsplit(url).netloc
+    start = time.perf_counter()
+    error = True
+    status = None
+    try:
+        resp = session_for(url, method).request(method, url, **kwargs)
+        status = resp.status_code
+        error = resp.status_code >= 500 or resp.status_code == 429
+        return resp
+    finally:
+        _record(host, method, status, time.perf_counter() - start, error)
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def head(url: str, **kwargs) -> requests.Response:
+    return request("HEAD", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+
+def stats() -> dict:
+    """host -> {requests, errors, total_seconds, max_seconds, avg_seconds}."""
+    with _stats_lock:
+        out = {}
+        for host, s in _stats.items():
+            out[host] = dict(s, avg_seconds=s['total_seconds'] / s['requests'] if s['requests'] else 0.0)
+        return out
+
+
+def close():
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
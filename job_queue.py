@@ -0,0 +1,115 @@
+"""
+Інкрементальна черга неопублікованих вакансій.
+
+Замість SELECT * усієї таблиці щохвилини тримаємо в пам'яті лише впорядкований
+індекс (inserted_at, id). Він оновлюється подіями JobRepository (вставка,
+видалення, mark_jobs_posted), а зміни з інших процесів ловимо дешевою
+перевіркою PRAGMA data_version — тоді черга перечитується з часткового індексу
+idx_jobs_unposted. Власні коміти процесу (summary, перевірки, meta з інших
+потоків) теж змінюють data_version, тому їх відсіюємо лічильником
+JobRepository.local_changes. Деталі рядка (summary тощо) підвантажуються ліниво.
+Черга може бути обмежена категоріями (sources) — по одній на канал Telegram.
+"""
+import bisect
+import threading
+from typing import Iterable, Iterator, Optional
+
+from storage import JobRepository, get_repo
+
+
+class UnpostedQueue:
+    def __init__(self, repo: Optional[JobRepository] = None, sources: Optional[Iterable[str]] = None):
+        self.repo = repo or get_repo()
+        self.sources = set(sources) if sources else None  # None — усі категорії
+        self._lock = threading.Lock()
+        self._order = []      # відсортовані (inserted_at, id)
+        self._index = {}      # id -> inserted_at
+        self._data_version = None
+        self._local_changes = None
+        self.reloads = 0
+        self.repo.add_listener(self._on_change)
+
+    # --- синхронізація з БД ---
+
+    def _where(self) -> tuple[str, list]:
+        sql = "FROM jobs WHERE posted_on_telegram = 0"
+        if not self.sources:
+            return sql, []
+        return sql + f" AND source IN ({','.join('?' * len(self.sources))})", sorted(self.sources)
+
+    def _reload(self):
+        where, params = self._where()
+        rows = self.repo.conn().execute(
+            f"SELECT inserted_at, id {where} ORDER BY inserted_at ASC, id ASC", params).fetchall()
+        with self._lock:
+            self._order = [(r[0] or "", r[1]) for r in rows]
+            self._index = {job_id: ts for ts, job_id in self._order}
+        self.reloads += 1
+
+    def _out_of_sync(self) -> bool:
+        where, params = self._where()
+        count = self.repo.conn().execute(f"SELECT COUNT(*) {where}", params).fetchone()[0]
+        return count != len(self)
+
+    def refresh(self):
+        """Перечитати чергу, якщо базу змінив інший процес."""
+        version = self.repo.data_version()
+        local = self.repo.local_changes()
+        if version == self._data_version:
+            self._local_changes = local
+            return
+        if self._data_version is None or local == self._local_changes:
+            # перший виклик або комітив хтось поза процесом
+            self._reload()
+        elif self._out_of_sync():
+            # комітили і ми, і, можливо, інший процес: свої зміни черга вже знає з подій,
+            # тож перечитуємо, лише якщо кількість рядків розійшлась (COUNT по частковому індексу)
+            self._reload()
+        self._data_version, self._local_changes = version, local
+
+    def _on_change(self, event: str, payload: list):
+        with self._lock:
+            if event == 'inserted':
+                for job_id, ts, source in payload:
+                    if self.sources and source not in self.sources:
+                        continue
+                    if job_id not in self._index:
+                        self._index[job_id] = ts or ""
+                        bisect.insort(self._order, (ts or "", job_id))
+            elif event == 'removed':
+                for job_id in payload:
+                    ts = self._index.pop(job_id, None)
+                    if ts is None:
+                        continue
+                    i = bisect.bisect_left(self._order, (ts, job_id))
+                    if i < len(self._order) and self._order[i] == (ts, job_id):
+                        del self._order[i]
+
+    # --- читання ---
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._order)
+
+    def ids(self, limit: Optional[int] = None) -> list[int]:
+        with self._lock:
+            order = self._order if limit is None else self._order[:limit]
+            return [job_id for _, job_id in order]
+
+    def head(self, n: int = 1) -> list[dict]:
+        """Перші n вакансій з повними рядками."""
+        ids = self.ids(n)
+        rows = self.repo.get_jobs(ids)
+        return [rows[i] for i in ids if i in rows]
+
+    def iter_jobs(self, chunk: int = 5) -> Iterator[dict]:
+        """FIFO по черзі; рядки вантажимо пачками по `chunk`, бо зазвичай потрібен лише перший."""
+        ids = self.ids()
+        for i in range(0, len(ids), chunk):
+            part = ids[i:i + chunk]
+            rows = self.repo.get_jobs(part)
+            for job_id in part:
+                # рядок могли видалити між знімком id і підвантаженням
+                row = rows.get(job_id)
+                if row is not None and not row.get('posted_on_telegram'):
+                    yield row
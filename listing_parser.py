@@ -0,0 +1,96 @@
+"""
+Парсер карток вакансій зі сторінки списку work.ua.
+
+Замість повного дерева сторінки і перебору всіх <a> з "/jobs/" будуємо
+BeautifulSoup лише з контейнерів карток (SoupStrainer) і за один прохід
+дістаємо назву, посилання, компанію, зарплату і дату публікації.
+Якщо встановлено lxml — використовуємо його як швидший бекенд.
+bs4 і lxml імпортуються при першому парсингу: тік, у якому сторінка не
+змінилась (304), їх не вантажить.
+"""
+import re
+from urllib.parse import urljoin
+
+BASE = 'https://www.work.ua'
+
+# картка вакансії: <div class="card ... job-link ..." id="job-1234567">
+_CARD_RE = re.compile(r"\bjob-link\b")
+_JOB_HREF_RE = re.compile(r"^/(?:[a-z]{2}/)?jobs/\d+/?")
+_SALARY_RE = re.compile(r"\d[\d\s]*\s*(?:грн|uah|\$|usd|€|eur)", re.IGNORECASE)
+
+_backend = None  # (BeautifulSoup, парсер, strainer) — після першого виклику
+
+
+def _soup_backend():
+    global _backend
+    if _backend is None:
+        from bs4 import BeautifulSoup, SoupStrainer
+        try:
+            import lxml  # noqa: F401
+            parser = "lxml"
+        except ImportError:
+            parser = "html.parser"
+        _backend = (BeautifulSoup, parser, SoupStrainer("div", class_=_CARD_RE))
+    return _backend
+
+
+def _clean(text: str) -> str:
+    # str.split() без аргументів ріже і по нерозривних пробілах, якими work.ua розділяє тисячі
+    return " ".join(text.split())
+
+
+def _parse_card(card, base: str):
+    a = None
+    h2 = card.find("h2")
+    if h2 is not None:
+        a = h2.find("a", href=True)
+    if a is None:
+        a = card.find("a", href=_JOB_HREF_RE)
+    if a is None:
+        return None
+
+    # атрибут title на work.ua містить хвіст ", вакансія від ..." — беремо текст посилання
+    title = _clean(a.get_text() or a.get("title") or "")
+    salary = ""
+    company = ""
+    # зарплата і компанія — жирні span/b після заголовка; розрізняємо за валютою в тексті
+    for tag in card.find_all(["span", "b", "strong"]):
+        classes = tag.get("class") or []
+        if tag.name == "span" and not any(c.startswith("strong") for c in classes):
+            continue
+        text = _clean(tag.get_text())
+        if not text or text == title:
+            continue
+        if not salary and _SALARY_RE.search(text):
+            salary = text
+        elif not company and not _SALARY_RE.search(text):
+            company = text
+        if salary and company:
+            break
+
+    posted_at = ""
+    t = card.find("time")
+    if t is not None:
+        posted_at = t.get("datetime") or _clean(t.get_text())
+
+    return {
+        "link": urljoin(base, a["href"]),
+        "title": title,
+        "company": company,
+        "salary": salary,
+        "posted_at": posted_at,
+    }
+
+
+def parse_job_cards(html: str, base: str = BASE) -> list[dict]:
+    """Картки вакансій у порядку на сторінці, без дублів за посиланням."""
+    BeautifulSoup, parser, strainer = _soup_backend()
+    soup = BeautifulSoup(html, parser, parse_only=strainer)
+    jobs = []
+    seen = set()
+    for card in soup.find_all("div", class_=_CARD_RE):
+        job = _parse_card(card, base)
+        if job and job["link"] not in seen:
+            seen.add(job["link"])
+            jobs.append(job)
+    return jobs
@@ -0,0 +1,101 @@
+"""
+Перевірка актуальності вакансій.
+
+is_vacancy_active — одна перевірка: GET сторінки через vacancy_page (з кешем),
+тож опис для summary потім береться з тієї ж відповіді.
+LivenessPrefetcher — фоновий потік, який заздалегідь перевіряє наступні N
+неопублікованих вакансій через пул потоків і зберігає результат з checked_at,
+тож у слот постингу вибір кандидата — це одне читання з БД.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import metrics
+from storage import JobRepository, get_repo
+from vacancy_page import LIVENESS_MAX_AGE, fetch_vacancy_page
+
+logger = logging.getLogger(__name__)
+
+@metrics.timed('liveness')
+def is_vacancy_active(url: str):
+    """Повертає (active:bool, reason:str, status:int, snippet:str)."""
+    active, reason, status, snippet = _check_vacancy(url)
+    metrics.inc('liveness_checks_total', active=int(active))
+    return active, reason, status, snippet
+
+def _check_vacancy(url: str):
+    metrics.sampled(logger, logging.DEBUG, "[check-start] requesting: %s", url)
+    # один GET (умовний, якщо сторінка вже в кеші) — та сама відповідь потім дасть опис
+    page = fetch_vacancy_page(url, max_age=LIVENESS_MAX_AGE)
+    active, reason = page.liveness()
+    return active, reason, page.status, page.snippet
+
+def is_check_fresh(job: dict, ttl_seconds: float) -> bool:
+    """Чи є у рядка jobs результат перевірки, молодший за TTL."""
+    checked_at = job.get('checked_at')
+    if not checked_at or job.get('active') is None:
+        return False
+    try:
+        checked = datetime.fromisoformat(checked_at)
+    except ValueError:
+        return False
+    return datetime.utcnow() - checked < timedelta(seconds=ttl_seconds)
+
+
+class LivenessPrefetcher:
+    def __init__(self, batch: int = 10, ttl_seconds: float = 1800, workers: int = 4,
+                 interval: float = 60, sources: list[str] | None = None, repo: JobRepository | None = None):
+        self.batch = batch
+        self.ttl_seconds = ttl_seconds
+        self.workers = workers
+        self.interval = interval
+        self.sources = list(sources) if sources else None   # None — усі категорії
+        self.repo = repo or get_repo()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def _check(job: dict):
+        if not job['link']:
+            return False, "missing_link", None, ""
+        return is_vacancy_active(job['link'])
+
+    @metrics.timed('liveness_prefetch')
+    def run_once(self) -> int:
+        """Перевірити наступні `batch` вакансій з простроченим результатом. Повертає кількість перевірених."""
+        jobs = self.repo.jobs_to_check(self.batch, self.ttl_seconds, self.sources)
+        if not jobs:
+            return 0
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            results = list(pool.map(self._check, jobs))
+        # пишемо в БД з цього потоку — мережа паралельна, SQLite послідовний
+        for job, (active, reason, status, _snippet) in zip(jobs, results):
+            if active:
+                self.repo.save_check_result(job['id'], True, reason)
+            elif reason.startswith("request_error"):
+                # мережевий збій — не привід видаляти, просто запам'ятовуємо результат
+                self.repo.save_check_result(job['id'], False, reason)
+            else:
+                logger.info("[prefetch-delete] job id=%s deleted (reason=%s)", job['id'], reason)
+                self.repo.delete_job(job['id'])
+        return len(jobs)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                checked = self.run_once()
+                if checked:
+                    logger.info("liveness prefetch: checked %d jobs", checked)
+            except Exception:
+                logger.exception("liveness prefetch error:")
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="liveness-prefetch", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
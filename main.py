@@ -1,29 +1,49 @@
 # перевірка актуальності вакансії перед її обробкою, якщо вакансія не актуальна
 # видаляти її з бд і брати наступну. додати логування для перевірки надсилання опису в гпт і в тг
 
+import time
+_IMPORT_STARTED = time.perf_counter()  # для заміру холодного старту в --once
+
 from dotenv import load_dotenv
 load_dotenv()  # читає .env з поточної робочої директорії
 
+import argparse
 import os
+import hashlib
+import html
 import logging
-import time
-import requests
-import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from zoneinfo import ZoneInfo
 
 from parser_work_ua import (
-    fetch_and_store, delete_old_jobs, get_unposted_jobs, mark_jobs_posted,
-    init_db, set_meta, get_meta, save_job_summary, DB_PATH, HEADERS
+    fetch_and_store, mark_jobs_posted,
+    init_db, set_meta, get_meta, save_job_summary, START_PATH
+)
+import http_client
+import metrics
+from rate_limiter import limiter as telegram_limiter
+from storage import get_repo
+from job_queue import UnpostedQueue
+from channels import Channel, Claims, parse_channels, load_channels, all_sources
+from liveness import is_vacancy_active, is_check_fresh, LivenessPrefetcher
+from summary_pipeline import SummaryPipeline, build_summary
+from dedup import DuplicateVacancy
+from summary_cache import cache as summary_cache
+from tips_pool import TipsPool
+from retention import Retention, RETENTION_INTERVAL
+from search import SearchBot
+from scheduler import (
+    Clock, Scheduler, in_window, next_in_window, latest_daily_slot, next_daily_slot
 )
-from OpenAI_agent import create_vacancy_summary, summarize_description, format_for_telegram, create_useful_tips
-from desc_parser import get_vacancy_description
+from OpenAI_agent import API_KEY as OPENAI_API_KEY, format_for_telegram, create_useful_tips
 
 BOT_TOKEN = os.getenv('TG_BOT_TOKEN')
 CHAT_ID = os.getenv('TG_CHAT_ID')  # channel id like '@yourchannel' or numeric id
-if not BOT_TOKEN or not CHAT_ID:
-    raise SystemExit("Set TG_BOT_TOKEN and TG_CHAT_ID environment variables")
+# кілька каналів: JSON-список {chat_id, sources, cooldown} (див. channels.py); без нього — один CHAT_ID
+CHANNELS_CONFIG = os.getenv('TG_CHANNELS')
 
+TELEGRAM_API_URL = f'https://api.telegram.org/bot{BOT_TOKEN}'
 TELEGRAM_SEND_URL = f'https://api.telegram.org/bot{BOT_TOKEN}/sendMessage'
 TELEGRAM_SEND_PHOTO_URL = f'https://api.telegram.org/bot{BOT_TOKEN}/sendPhoto'
 # локальний файл зображення для поста (vacancy.jpg у корені проєкту)
@@ -33,45 +53,146 @@ TIP_PHOTO_PATH = os.path.join(os.path.dirname(__file__), 'tips.jpg')
 KYIV = ZoneInfo('Europe/Kyiv')
 # Нове вікно постингу: щогодини з 10:00 до 20:00 (10:00 <= hour < 20:00)
 POST_WINDOW = (10, 20)
-CHECK_INTERVAL = 60  # seconds
+CHECK_INTERVAL = 60  # seconds — затримка повтору після невдачі і період фонових перевірок
+CRAWL_INTERVAL = int(os.getenv('CRAWL_INTERVAL', '60'))  # seconds
+
+# Корисні поради: 10:30 і 18:30 за Києвом; пропущений слот наздоганяємо в межах вікна
+TIP_SCHEDULE = [(10, 30), (18, 30)]
+TIP_META_KEY = 'last_tip_sent'  # зберігаємо маркер останнього відправленого слоту
+TIPS_PER_POST = 3
+# пул порад: скільки тримати готовими і скільки генерувати за раз
+TIPS_POOL_MIN = int(os.getenv('TIPS_POOL_MIN', '12'))
+TIPS_BATCH = int(os.getenv('TIPS_BATCH', '6'))
 
 # Тестовий режим керується змінною середовища TG_TEST_MODE (1 = тест)
 TEST_MODE = os.getenv('TG_TEST_MODE', '0') == '1'
 # cooldown: 30s в тесті, 1 година в продакшні
 COOLDOWN = timedelta(seconds=30) if TEST_MODE else timedelta(hours=1)
 
-def in_allowed_window(dt_kyiv: datetime) -> bool:
-    if TEST_MODE:
-        return True
-    h = dt_kyiv.hour
-    return POST_WINDOW[0] <= h < POST_WINDOW[1]
+# Режим краулера (1 = обходити пагінацію); WORKUA_PATHS — категорії через кому, напр. "jobs-junior/,jobs-python/"
+CRAWL_MODE = os.getenv('CRAWL_MODE', '0') == '1'
+CRAWL_PATHS = [p.strip() for p in os.getenv('WORKUA_PATHS', '').split(',') if p.strip()] or None
+# рівень логування: INFO для продакшну, DEBUG для локальної налагодки
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+
+# скільки каналів постимо одночасно
+POST_WORKERS = int(os.getenv('POST_WORKERS', '4'))
 
-def send_to_telegram(text: str, photo_path: str | None = None) -> bool:
+# Фонова перевірка актуальності: скільки вакансій з голови черги тримати перевіреними
+# і скільки секунд результат вважається свіжим
+LIVENESS_BATCH = int(os.getenv('LIVENESS_BATCH', '10'))
+LIVENESS_TTL = int(os.getenv('LIVENESS_TTL', '1800'))
+
+# Скільки вакансій з голови черги тримати з готовим summary
+SUMMARY_AHEAD = int(os.getenv('SUMMARY_AHEAD', '5'))
+RETENTION_DAYS = 30
+RETENTION_META_KEY = 'retention_last_run'  # щоб --once і рестарти не запускали retention щотіку
+# команда /search у чаті з ботом (search.py); 0 — якщо getUpdates цього токена читає хтось інший
+SEARCH_BOT = os.getenv('SEARCH_BOT', '1') == '1'
+
+# годинник циклу; симуляція підміняє його віртуальним
+clock = Clock()
+tips_pool = TipsPool(per_post=TIPS_PER_POST, min_size=TIPS_POOL_MIN, batch=TIPS_BATCH, interval=CHECK_INTERVAL * 10)
+
+# 400-відповіді, у яких винен сам текст (розмітка, довжина), а не чат чи file_id
+_REJECTED_TEXT = ("can't parse entities", "too long")
+
+class MessageRejected(Exception):
+    """Telegram остаточно відхилив текст повідомлення — повтор з тим самим текстом не допоможе."""
+
+def _check_rejected(resp):
+    if resp.status_code != 400:
+        return
+    try:
+        description = resp.json().get('description') or ''
+    except ValueError:
+        return
+    if any(marker in description for marker in _REJECTED_TEXT):
+        raise MessageRejected(description)
+
+# path -> ((st_mtime_ns, st_size), sha256): щоб не хешувати зображення на кожен пост
+_digests = {}
+
+def _file_digest(path: str) -> str:
+    """sha256 файлу; перераховується, лише коли змінились mtime чи розмір."""
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _digests.get(path)
+    if cached and cached[0] == stamp:
+        return cached[1]
+    with open(path, 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    _digests[path] = (stamp, digest)
+    return digest
+
+def _photo_meta_key(photo_path: str) -> str:
+    return f"tg_file_id:{os.path.basename(photo_path)}"
+
+def _send_photo(text: str, photo_path: str, chat_id: str) -> bool:
+    """
+    sendPhoto з повторним використанням file_id: зображення вантажимо в Telegram один раз,
+    далі шлемо лише id з meta. Перезавантажуємо, якщо id відхилено або файл змінився.
     """
-    Надіслати повідомлення або фото з caption.
-    Якщо photo_path заданий і файл існує — викликає sendPhoto, інакше sendMessage.
+    logger = logging.getLogger(__name__)
+    data = {
+        'chat_id': chat_id,
+        'caption': text,
+        'parse_mode': 'HTML',
+        'disable_web_page_preview': True
+    }
+    key = _photo_meta_key(photo_path)
+    digest = _file_digest(photo_path)
+    stored = get_meta(key) or ''
+    stored_digest, _, file_id = stored.partition(':')
+    if file_id and stored_digest == digest:
+        telegram_limiter.acquire(chat_id)
+        resp = http_client.post(TELEGRAM_SEND_PHOTO_URL, data=dict(data, photo=file_id), timeout=15)
+        if resp.status_code == 200 and resp.json().get('ok', False):
+            return True
+        _check_rejected(resp)
+        if resp.status_code != 400:
+            return False
+        # 400 — id протух/невалідний: падаємо на звичайне завантаження
+        logger.info("Telegram rejected cached file_id for %s, re-uploading", os.path.basename(photo_path))
+
+    telegram_limiter.acquire(chat_id)
+    with open(photo_path, 'rb') as f:
+        resp = http_client.post(TELEGRAM_SEND_PHOTO_URL, data=data, files={'photo': f}, timeout=30)
+    _check_rejected(resp)
+    body = resp.json() if resp.status_code == 200 else {}
+    if not body.get('ok', False):
+        return False
+    sizes = (body.get('result') or {}).get('photo') or []
+    if sizes:
+        # найбільший розмір — останній у списку
+        set_meta(key, f"{digest}:{sizes[-1]['file_id']}")
+    return True
+
+@metrics.timed('telegram')
+def send_to_telegram(text: str, photo_path: str | None = None, chat_id: str | None = None) -> bool:
     """
+    Надіслати повідомлення або фото з caption у chat_id (за замовчуванням CHAT_ID).
+    Якщо photo_path заданий і файл існує — викликає sendPhoto (по file_id, коли він уже є), інакше sendMessage.
+    Кожен запит проходить через спільний token bucket (ліміти Telegram на чат і на бота).
+    MessageRejected — текст відхилено остаточно (400), інші збої — False.
+    """
+    chat_id = chat_id or CHAT_ID
     try:
         if photo_path and os.path.exists(photo_path):
-            with open(photo_path, 'rb') as f:
-                files = {'photo': f}
-                data = {
-                    'chat_id': CHAT_ID,
-                    'caption': text,
-                    'parse_mode': 'HTML',
-                    'disable_web_page_preview': True
-                }
-                resp = requests.post(TELEGRAM_SEND_PHOTO_URL, data=data, files=files, timeout=30)
-                return resp.status_code == 200 and resp.json().get('ok', False)
+            return _send_photo(text, photo_path, chat_id)
         else:
+            telegram_limiter.acquire(chat_id)
             payload = {
-                'chat_id': CHAT_ID,
+                'chat_id': chat_id,
                 'text': text,
                 'parse_mode': 'HTML',
                 'disable_web_page_preview': True
             }
-            resp = requests.post(TELEGRAM_SEND_URL, data=payload, timeout=15)
+            resp = http_client.post(TELEGRAM_SEND_URL, data=payload, timeout=15)
+            _check_rejected(resp)
             return resp.status_code == 200 and resp.json().get('ok', False)
+    except MessageRejected:
+        raise
     except Exception as e:
         logging.getLogger(__name__).warning("send_to_telegram error: %s", e)
         return False
@@ -93,204 +214,329 @@ def parse_iso_to_dt(s: str):
     # повертаємо у UTC як єдиний reference
     return dt.astimezone(timezone.utc)
 
-def is_vacancy_active(url: str):
-    """Повертає (active:bool, reason:str, status:int, snippet:str)."""
-    print(f"[check-start] requesting: {url}", flush=True)
+def delete_job(job_id: int):
+    logger = logging.getLogger(__name__)
     try:
-        # спроба HEAD, при потребі — GET
-        try:
-            resp = requests.head(url, headers=HEADERS, timeout=6, allow_redirects=True)
-            status = resp.status_code
-            if status == 200:
-                print(f"[check-head] {url} -> status={status}", flush=True)
-                return True, "ok_head", status, ""
-            if status in (405, 501):
-                raise Exception("HEAD fallback")
-        except Exception:
-            resp = requests.get(url, headers=HEADERS, timeout=8, allow_redirects=True)
-            status = resp.status_code
-            snippet = (resp.text or "")[:600].lower()
-            print(f"[check-get] {url} -> status={status}", flush=True)
-
-        if status in (404, 410):
-            return False, f"status_{status}", status, snippet if 'snippet' in locals() else ""
-
-        inactive_phrases = (
-            "вакансія неактуальна", "вакансію закрито", "вакансію видалено",
-            "вакансія закрита", "this vacancy is no longer available",
-            "job not found", "объявление удалено", "оголошення видалено",
-            "сторінку не знайдено", "такої сторінки не існує"
-        )
-        if 'snippet' in locals():
-            for p in inactive_phrases:
-                if p in snippet:
-                    return False, f"phrase:{p}", status, snippet
-
-        if status == 200:
-            return True, "ok", status, snippet if 'snippet' in locals() else ""
-
-        return False, f"status_{status}", status, snippet if 'snippet' in locals() else ""
+        get_repo().delete_job(job_id)
+        metrics.inc('jobs_deleted_total')
+        logger.debug("[db] deleted job id=%s", job_id)
     except Exception as e:
-        print(f"[check-error] request failed for {url}: {e}", flush=True)
-        return False, f"request_error:{e}", None, ""
+        logger.warning("[db] delete_job error: %s", e)
 
-def delete_job(job_id: int):
+def send_tips(logger, tag_key: str, tag: str, chat_ids: list[str]) -> bool:
+    """
+    Розіслати поради в усі канали; слот зараховуємо, якщо дійшло хоч в один.
+    Поради беремо з пулу (одне читання з БД); генеруємо на місці, лише якщо пул ще порожній.
+    """
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cur = conn.cursor()
-        cur.execute('DELETE FROM jobs WHERE id = ?', (job_id,))
-        conn.commit()
-        conn.close()
-        print(f"[db] deleted job id={job_id}", flush=True)
+        pooled = tips_pool.take()
+        if pooled:
+            tips_text = "\n".join(t['text'] for t in pooled)
+        else:
+            logger.info("Tips pool is empty, generating tips in the slot")
+            tips_text = create_useful_tips(num_tips=TIPS_PER_POST, locale="uk")
+        tips_message = f"<b>Корисні поради</b>\n\n{html.escape(tips_text)}\n\n#junior #tips"
+        ok_tip = False
+        for chat_id in chat_ids:
+            sent = send_to_telegram(tips_message, photo_path=TIP_PHOTO_PATH, chat_id=chat_id)
+            logger.info("Tip send result for %s: %s", chat_id, sent)
+            ok_tip = ok_tip or sent
+        if ok_tip:
+            set_meta(tag_key, tag)
+            if pooled:
+                tips_pool.mark_posted([t['id'] for t in pooled])
+            else:
+                tips_pool.remember(tips_text.splitlines())
+        return ok_tip
     except Exception as e:
-        print("[db] delete_job error:", e, flush=True)
+        logger.warning("Failed to generate/send tips: %s", e)
+        return False
+
+def next_post_time(channel: Channel, now_utc: datetime) -> datetime:
+    """Коли канал може публікувати наступну вакансію: кінець його кулдауну, зсунутий у вікно постингу."""
+    last_post_iso = channel.last_post_time
+    last_post_dt = parse_iso_to_dt(last_post_iso) if last_post_iso else None
+    due = now_utc if last_post_dt is None else max(now_utc, last_post_dt + channel.cooldown)
+    if TEST_MODE:
+        return due
+    return next_in_window(due, POST_WINDOW, KYIV)
+
+@metrics.timed('pick_candidate')
+def pick_candidate(logger, queue: UnpostedQueue, claims: Claims | None = None):
+    """
+    Ідемо FIFO по unposted: перевіряємо першу; якщо недоступна — видаляємо і йдемо далі.
+    claims — вакансії, які вже взяли інші канали; повернутий кандидат лишається за нами
+    (після публікації його треба звільнити через claims.release).
+    """
+    queue.refresh()
+    # статистика кешу summary і стиснення описів — це запити до БД, тож вони лише в gauges /metrics
+    logger.info("unposted count: %d", len(queue))
+    logger.debug("http stats: %s", http_client.stats())
+    for job in queue.iter_jobs():
+        jid = job.get('id')
+        if claims is not None and not claims.claim(jid):
+            continue
+        ok = False
+        try:
+            ok = _check_candidate(logger, job)
+        finally:
+            if not ok and claims is not None:
+                claims.release(jid)
+        if ok:
+            return job
+    return None
+
+def _check_candidate(logger, job: dict) -> bool:
+    """True — вакансія доступна і годиться для публікації; недоступну видаляємо."""
+    jid = job.get('id')
+    link = job.get('link')
+    metrics.sampled(logger, logging.DEBUG, "[check-candidate] id=%s title=%r link=%s", jid, job.get('title'), link)
+    if not link:
+        logger.info("[delete] job id=%s missing link", jid)
+        delete_job(jid)
+        return False
+
+    # свіжий позитивний результат від prefetcher — мережа не потрібна
+    if job.get('active') == 1 and is_check_fresh(job, LIVENESS_TTL):
+        return True
+
+    active, reason, status, snippet = is_vacancy_active(link)
+    metrics.sampled(logger, logging.DEBUG, "[result] job id=%s active=%s reason=%s status=%s", jid, active, reason, status)
+    if not active:
+        logger.info("[delete] job id=%s deleted (reason=%s)", jid, reason)
+        delete_job(jid)
+        return False
+
+    # знайшли доступну вакансію — запам'ятовуємо результат і беремо як кандидата
+    get_repo().save_check_result(jid, True, reason)
+    return True
+
+def post_vacancy(logger, candidate: dict, channel: Channel) -> bool:
+    logger.info("[%s] Selected candidate id=%s title=%r", channel.chat_id, candidate['id'], candidate['title'])
+
+    summary = candidate.get('summary') or ''
+    if not summary:
+        # SummaryPipeline ще не встиг підготувати опис — робимо це тут, як раніше
+        try:
+            summary = build_summary(candidate['link'], candidate['id'])
+        except DuplicateVacancy:
+            raise
+        except Exception:
+            summary = "Короткий опис недоступний через помилку сервісу."
+        try:
+            save_job_summary(candidate['id'], summary)
+        except Exception:
+            pass
+
+    # ensure we include company in the telegram message (company may be empty)
+    message = format_for_telegram(
+        candidate['title'],
+        candidate.get('company', ''),
+        candidate.get('salary', ''),
+        candidate.get('link', ''),
+        summary
+    )
+    logger.info("Preparing to send message to Telegram (summary length=%d)", len(summary or ""))
+    ok = False
+    try:
+        ok = send_to_telegram(message, photo_path=PHOTO_PATH, chat_id=channel.chat_id)
+        logger.info("send_to_telegram returned: %s", ok)
+    except MessageRejected:
+        raise
+    except Exception as e:
+        logger.warning("send_to_telegram raised: %s", e)
+        ok = False
+
+    if ok:
+        mark_jobs_posted([candidate['id']])
+        metrics.inc('posts_total', chat=channel.chat_id)
+        channel.mark_posted(clock.now().isoformat())
+        logger.info("[%s] Marked posted and updated last_post_time", channel.chat_id)
+    return ok
+
+def setup_channels() -> list[Channel]:
+    """Канали з TG_CHANNELS (або один TG_CHAT_ID з категоріями WORKUA_PATHS) — у таблиці channels."""
+    configs = parse_channels(CHANNELS_CONFIG, CHAT_ID, CRAWL_PATHS or [START_PATH], COOLDOWN)
+    channels = load_channels(configs, legacy_chat_id=CHAT_ID, legacy_last_post=get_meta('last_post_time'))
+    if not channels:
+        raise SystemExit("TG_CHANNELS has no channels")
+    return channels
+
+def build_scheduler(logger, channels: list[Channel]) -> Scheduler:
+    sched = Scheduler(clock)
+    sources = all_sources(channels)
+    claims = Claims()
+    retention = Retention(days=RETENTION_DAYS)
+    # один пул на всі канали: повільний канал (перевірка, summary, upload) не тримає інших
+    pool = ThreadPoolExecutor(max_workers=max(1, min(POST_WORKERS, len(channels))), thread_name_prefix='post')
+    metrics.gauge('unposted_queue_depth', lambda: {(('chat', ch.chat_id),): len(ch.queue) for ch in channels},
+                  help="Unposted vacancies per channel queue")
+
+    def crawl_job(now: datetime) -> datetime:
+        new = fetch_and_store(crawl=CRAWL_MODE, paths=sources)
+        logger.info("fetch_and_store -> new inserted: %d", len(new))
+        if new:
+            # черги могли бути порожніми — будимо постинг, якщо час якогось каналу вже настав
+            due = min(next_post_time(ch, now) for ch in channels)
+            nd = sched.next_due_of('post')
+            if nd is None or nd > due:
+                sched.reschedule('post', due)
+        return now + timedelta(seconds=CRAWL_INTERVAL)
+
+    def post_channel(channel: Channel, now: datetime) -> datetime:
+        with metrics.timed('post', chat=channel.chat_id):
+            return _post_channel(channel, now)
+
+    def _post_channel(channel: Channel, now: datetime) -> datetime:
+        due = next_post_time(channel, now)
+        if due > now:
+            logger.info("[%s] Cooldown/window not passed, next post at %s", channel.chat_id, due.isoformat())
+            return due
+        candidate = pick_candidate(logger, channel.queue, claims)
+        if not candidate:
+            logger.debug("[%s] No available candidate found (all checked entries were deleted or unavailable)", channel.chat_id)
+            # прокинемось після наступного crawl, який і так нас розбудить при нових вакансіях
+            return clock.now() + timedelta(seconds=CRAWL_INTERVAL)
+        try:
+            if not post_vacancy(logger, candidate, channel):
+                return clock.now() + timedelta(seconds=CHECK_INTERVAL)
+        except DuplicateVacancy as e:
+            # вакансію вже знято з черги — одразу беремо наступну
+            logger.info("[%s] %s, picking next candidate", channel.chat_id, e)
+            return clock.now()
+        except MessageRejected as e:
+            # інакше вакансія лишилась би в голові черги й повторювалась щотіку, зупинивши канал
+            logger.warning("[%s] Telegram rejected job id=%s (%s), deleting it", channel.chat_id, candidate['id'], e)
+            metrics.inc('telegram_rejected_total', chat=channel.chat_id)
+            delete_job(candidate['id'])
+            return clock.now()
+        finally:
+            claims.release(candidate['id'])
+        return next_post_time(channel, clock.now())
+
+    def post_job(now: datetime) -> datetime:
+        # усі канали, чий час настав, постять паралельно; наступний запуск — найближчий з їхніх
+        futures = [pool.submit(post_channel, ch, now) for ch in channels]
+        nxt = []
+        for ch, fut in zip(channels, futures):
+            try:
+                nxt.append(fut.result())
+            except Exception:
+                logger.exception("[%s] post failed:", ch.chat_id)
+                nxt.append(clock.now() + timedelta(seconds=CHECK_INTERVAL))
+        return min(nxt)
+
+    def retention_job(now: datetime) -> datetime:
+        last = get_meta(RETENTION_META_KEY)
+        due = parse_iso_to_dt(last) + timedelta(seconds=RETENTION_INTERVAL) if last else now
+        if due > now:
+            return due
+        retention.run_once(now.replace(tzinfo=None))
+        set_meta(RETENTION_META_KEY, now.isoformat())
+        return now + timedelta(seconds=RETENTION_INTERVAL)
+
+    def tips_job(now: datetime) -> datetime:
+        # наздоганяємо останній слот дня, якщо його пропустили (повільний crawl, рестарт)
+        slot = latest_daily_slot(now, TIP_SCHEDULE, KYIV)
+        if slot is not None and (TEST_MODE or in_window(now, POST_WINDOW, KYIV)):
+            slot_tag = f"{slot.date().isoformat()}T{slot.hour:02d}:{slot.minute:02d}"
+            if get_meta(TIP_META_KEY) != slot_tag:
+                logger.info("Tip slot %s due (now %s), generating tips...", slot_tag, now.astimezone(KYIV).strftime('%H:%M'))
+                if not send_tips(logger, TIP_META_KEY, slot_tag, [ch.chat_id for ch in channels]):
+                    return clock.now() + timedelta(seconds=CHECK_INTERVAL)
+        return next_daily_slot(now, TIP_SCHEDULE, KYIV)
+
+    sched.add('crawl', crawl_job)
+    sched.add('post', post_job)
+    sched.add('tips', tips_job)
+    sched.add('retention', retention_job)
+    return sched
+
+def check_config():
+    if not BOT_TOKEN or not (CHAT_ID or CHANNELS_CONFIG):
+        raise SystemExit("Set TG_BOT_TOKEN and TG_CHAT_ID (or TG_CHANNELS) environment variables")
+    # summary для постів і поради генеруються в кожному режимі — без ключа бот нічого не опублікує
+    if not OPENAI_API_KEY:
+        raise SystemExit("Set OPENAI_API_KEY environment variable")
+
+def _setup_logging():
+    logging.basicConfig(level=getattr(logging, LOG_LEVEL, logging.INFO), format="%(asctime)s %(levelname)s %(name)s %(message)s")
+
+def run_once() -> int:
+    """
+    Один тік планувальника і вихід — для cron / serverless замість постійного контейнера:
+    crawl, пост (якщо кулдаун каналу минув), порада (якщо настав слот), retention (раз на інтервал)
+    і відповіді на накопичені /search. Фонові потоки (prefetcher, summary, пул порад, /metrics,
+    long polling) не запускаються; SDK OpenAI і bs4 імпортуються лише тоді, коли тік справді
+    генерує summary/поради чи парсить сторінку.
+    """
+    check_config()
+    init_db()
+    _setup_logging()
+    logger = logging.getLogger(__name__)
+    started = time.perf_counter()
+    channels = setup_channels()
+    ran = build_scheduler(logger, channels).run_pending()
+    if SEARCH_BOT:
+        # без long polling: відповідаємо на /search, що накопичились з минулого тіку
+        try:
+            SearchBot(TELEGRAM_API_URL).poll_once(timeout=0)
+        except Exception:
+            logger.exception("search bot: getUpdates error:")
+    if metrics.METRICS_TABLE:
+        metrics.MetricsWriter().flush()
+    logger.info("--once: %d jobs, import %.0f ms, tick %.0f ms", ran,
+                (started - _IMPORT_STARTED) * 1000, (time.perf_counter() - started) * 1000)
+    return 0
 
 def main_loop():
+    check_config()
     init_db()
-    # логування: INFO для продакшну, DEBUG для локальної налагодки
-    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    _setup_logging()
     logger = logging.getLogger(__name__)
     logger.info("Starting main_loop, TEST_MODE = %s", TEST_MODE)
 
+    metrics.gauge('summary_cache', lambda: {(('stat', k),): v for k, v in summary_cache.stats().items()},
+                  help="Summary cache hits/misses/entries")
+    metrics.gauge('description_tokens', lambda: {(('stat', k),): v for k, v in get_repo().desc_token_stats().items()},
+                  help="Description tokens before/after compaction, summed over compacted jobs")
+    metrics.gauge('telegram_rate_limit_wait_seconds', lambda: telegram_limiter.waited,
+                  help="Total time spent waiting for Telegram send tokens")
+    metrics.gauge('db_size_bytes', lambda: get_repo().db_size(), help="Size of the jobs database file")
+    metrics.serve()
+    if metrics.METRICS_TABLE:
+        metrics.MetricsWriter().start()
+
+    channels = setup_channels()
+    logger.info("Channels: %s", channels)
+
+    # фонові перевірки і summary — лише для категорій, які справді обслуговують канали
+    sources = all_sources(channels)
+    prefetcher = LivenessPrefetcher(batch=LIVENESS_BATCH, ttl_seconds=LIVENESS_TTL, interval=CHECK_INTERVAL,
+                                    sources=sources)
+    prefetcher.start()
+
+    window_hours = 24 if TEST_MODE else POST_WINDOW[1] - POST_WINDOW[0]
+    posts_per_day = sum(window_hours * 3600 / ch.cooldown.total_seconds() for ch in channels)
+    summaries = SummaryPipeline(ahead=SUMMARY_AHEAD, posts_per_day=posts_per_day,
+                                retention_days=RETENTION_DAYS, interval=CHECK_INTERVAL, sources=sources)
+    summaries.start()
+    tips_pool.start()
+    if SEARCH_BOT:
+        SearchBot(TELEGRAM_API_URL).start()
+
     # -- quick test send for Useful tips when TEST_MODE=1 --
     if TEST_MODE:
-        TIP_META_KEY = 'last_tip_sent_test'
-        sent_marker = get_meta(TIP_META_KEY)
-        today_tag = f"TEST:{datetime.now(KYIV).date().isoformat()}"
-        if sent_marker != today_tag:
-            try:
-                tips_text = create_useful_tips(num_tips=3, locale="uk")
-                tips_message = f"<b>Корисні поради</b>\n\n{tips_text}\n\n#junior #tips"
-                ok_tip = send_to_telegram(tips_message, photo_path=TIP_PHOTO_PATH)
-                logger.info("Test tip send result: %s", ok_tip)
-                if ok_tip:
-                    set_meta(TIP_META_KEY, today_tag)
-            except Exception as e:
-                logger.warning("Failed to generate/send test tips: %s", e)
+        today_tag = f"TEST:{clock.now().astimezone(KYIV).date().isoformat()}"
+        if get_meta('last_tip_sent_test') != today_tag:
+            send_tips(logger, 'last_tip_sent_test', today_tag, [ch.chat_id for ch in channels])
     # -- end test send --
 
-    while True:
-        try:
-            new = fetch_and_store()
-            logger.info("fetch_and_store -> new inserted: %d", len(new))
-            delete_old_jobs(days=30)
-
-            unposted = get_unposted_jobs()
-            logger.info("unposted count: %d", len(unposted))
-            if not unposted:
-                time.sleep(CHECK_INTERVAL)
-                continue
-
-            # --- нова логіка: перевіряємо послідовно лише перші записи і видаляємо недоступні ---
-            last_post_iso = get_meta('last_post_time')
-            logger.debug("last_post_time (meta): %s", last_post_iso)
-            last_post_dt = parse_iso_to_dt(last_post_iso) if last_post_iso else None
-            now_utc = datetime.now(timezone.utc)
-
-            # перевіряємо чи зараз дозволений інтервал за Києвом
-            now_kyiv = datetime.now(KYIV)
-            if not in_allowed_window(now_kyiv):
-                logger.info("Outside posting window, skipping post")
-                time.sleep(CHECK_INTERVAL)
-                continue
-
-            # --- Scheduled tips: 10:30 and 18:30 Kyiv ---
-            TIP_SCHEDULE = [(10, 30), (18, 30)]
-            TIP_META_KEY = 'last_tip_sent'  # зберігаємо маркер останнього відправленого слоту
-            if (now_kyiv.hour, now_kyiv.minute) in TIP_SCHEDULE:
-                slot_tag = f"{now_kyiv.date().isoformat()}T{now_kyiv.hour:02d}:{now_kyiv.minute:02d}"
-                last_tip = get_meta(TIP_META_KEY)
-                if last_tip != slot_tag:
-                    logger.info("Tip slot matched %s, generating tips...", slot_tag)
-                    try:
-                        tips_text = create_useful_tips(num_tips=3, locale="uk")
-                        tips_message = f"<b>Корисні поради</b>\n\n{tips_text}\n\n#junior #tips"
-                        ok_tip = send_to_telegram(tips_message, photo_path=TIP_PHOTO_PATH)
-                        logger.info("Tip send result: %s", ok_tip)
-                        if ok_tip:
-                            set_meta(TIP_META_KEY, slot_tag)
-                    except Exception as e:
-                        logger.warning("Failed to generate/send tips: %s", e)
-                        # не блокуємо подальшу логіку вакансій
-
-            # end scheduled tips
-
-            # перевірка кулдауну (TEST_MODE впливає на COOLDOWN)
-            if last_post_dt is not None and (now_utc - last_post_dt) < COOLDOWN:
-                logger.info("Cooldown not passed, skipping post")
-                time.sleep(CHECK_INTERVAL)
-                continue
-
-            # Ідемо FIFO по unposted: перевіряємо першу; якщо недоступна — видаляємо і йдемо далі
-            candidate = None
-            for job in unposted:
-                jid = job.get('id')
-                link = job.get('link')
-                logger.debug("[check-candidate] id=%s title=%r link=%s", jid, job.get('title'), link)
-                if not link:
-                    logger.info("[delete] job id=%s missing link", jid)
-                    delete_job(jid)
-                    continue
-
-                active, reason, status, snippet = is_vacancy_active(link)
-                logger.debug("[result] job id=%s active=%s reason=%s status=%s", jid, active, reason, status)
-                if not active:
-                    logger.info("[delete] job id=%s deleted (reason=%s)", jid, reason)
-                    delete_job(jid)
-                    continue
-
-                # знайшли доступну вакансію — беремо її як кандидата та ламаємо цикл
-                candidate = job
-                break
-
-            if not candidate:
-                logger.debug("No available candidate found (all checked entries were deleted or unavailable)")
-                time.sleep(CHECK_INTERVAL)
-                continue
-
-            logger.info("Selected candidate id=%s title=%r", candidate['id'], candidate['title'])
-
-            summary = candidate.get('summary') or ''
-            if not summary:
-                try:
-                    desc = get_vacancy_description(candidate['link'])
-                    if desc:
-                        summary = summarize_description(desc)
-                    else:
-                        summary = "Опис вакансії недоступний."
-                except Exception:
-                    summary = "Короткий опис недоступний через помилку сервісу."
-                try:
-                    save_job_summary(candidate['id'], summary)
-                except Exception:
-                    pass
-
-            # ensure we include company in the telegram message (company may be empty)
-            message = format_for_telegram(
-                candidate['title'],
-                candidate.get('company', ''),
-                candidate.get('salary', ''),
-                candidate.get('link', ''),
-                summary
-            )
-            logger.info("Preparing to send message to Telegram (summary length=%d)", len(summary or ""))
-            ok = False
-            try:
-                ok = send_to_telegram(message, photo_path=PHOTO_PATH)
-                logger.info("send_to_telegram returned: %s", ok)
-            except Exception as e:
-                logger.warning("send_to_telegram raised: %s", e)
-                ok = False
-
-            if ok:
-                mark_jobs_posted([candidate['id']])
-                set_meta('last_post_time', datetime.now(timezone.utc).isoformat())
-                logger.info("Marked posted and updated last_post_time")
-
-        except Exception as e:
-            logger.exception("main loop exception:")
-            time.sleep(10)
-        time.sleep(CHECK_INTERVAL)
+    build_scheduler(logger, channels).run_forever()
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Telegram-бот вакансій work.ua")
+    parser.add_argument('--once', action='store_true', help="один тік (crawl, пост, порада) і вихід — для cron")
+    if parser.parse_args().once:
+        raise SystemExit(run_once())
     main_loop()
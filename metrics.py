@@ -0,0 +1,248 @@
+"""
+Метрики процесу: лічильники, гістограми латентності і gauges.
+
+Кожна стадія циклу (crawl, запис у БД, liveness, опис, OpenAI, Telegram)
+обгортається в timed(stage) — так видно, звідки взявся повільний цикл.
+HTTP-запити http_client рахуються окремо по хостах.
+
+Назовні метрики віддаються у текстовому форматі Prometheus (serve(), за
+замовчуванням 127.0.0.1:9108/metrics), а MetricsWriter за бажання
+(METRICS_TABLE=1) періодично пише знімок у таблицю metrics.
+Залежностей немає — формат простий, prometheus_client не потрібен.
+
+sampled() — дешеве логування «по одному рядку з N» для гарячих шляхів:
+рівень перевіряється до форматування, тож вимкнений DEBUG нічого не коштує.
+"""
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+PREFIX = 'vacancy_bot'
+METRICS_ADDR = os.getenv('METRICS_ADDR', '127.0.0.1')
+METRICS_PORT = int(os.getenv('METRICS_PORT', '9108'))  # 0 — не піднімати endpoint
+METRICS_TABLE = os.getenv('METRICS_TABLE', '0') == '1'
+METRICS_FLUSH_INTERVAL = int(os.getenv('METRICS_FLUSH_INTERVAL', '300'))  # seconds
+METRICS_TABLE_DAYS = 7
+LOG_SAMPLE_RATE = float(os.getenv('LOG_SAMPLE_RATE', '0.1'))
+
+# межі бакетів у секундах: від запиту до SQLite до повного crawl
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _key(labels: dict) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _fmt_labels(labels: tuple, extra: tuple = ()) -> str:
+    items = labels + extra
+    if not items:
+        return ""
+    body = ",".join('%s="%s"' % (k, v.replace('\\', '\\\\').replace('"', '\\"')) for k, v in items)
+    return "{" + body + "}"
+
+
+class Registry:
+    def __init__(self, prefix: str = PREFIX, buckets: tuple = DEFAULT_BUCKETS):
+        self.prefix = prefix
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counters = {}   # name -> {labels: value}
+        self._hists = {}      # name -> {labels: [counts по бакетах, sum, count]}
+        self._gauges = {}     # name -> fn() -> float | {labels dict as tuple: float}
+        self._help = {}
+
+    # --- запис ---
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        key = _key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, seconds: float, **labels):
+        key = _key(labels)
+        with self._lock:
+            series = self._hists.setdefault(name, {})
+            h = series.get(key)
+            if h is None:
+                h = series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    h[0][i] += 1
+                    break
+            h[1] += seconds
+            h[2] += 1
+
+    def gauge(self, name: str, fn: Callable[[], object], help: str = ""):
+        """fn() -> число або {tuple((label, value), ...): число}; рахується під час scrape."""
+        with self._lock:
+            self._gauges[name] = fn
+            if help:
+                self._help[name] = help
+
+    @contextmanager
+    def timed(self, stage: str, **labels):
+        """Латентність стадії в stage_duration_seconds; виняток — ще й у stage_errors_total."""
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.inc('stage_errors_total', stage=stage, **labels)
+            raise
+        finally:
+            self.observe('stage_duration_seconds', time.perf_counter() - start, stage=stage, **labels)
+
+    # --- читання ---
+
+    def _gauge_values(self) -> dict:
+        with self._lock:
+            gauges = dict(self._gauges)
+        out = {}
+        for name, fn in gauges.items():
+            try:
+                value = fn()
+            except Exception as e:
+                logger.debug("gauge %s failed: %s", name, e)
+                continue
+            if isinstance(value, dict):
+                out[name] = {tuple(k): float(v) for k, v in value.items()}
+            elif value is not None:
+                out[name] = {(): float(value)}
+        return out
+
+    def snapshot(self) -> list[tuple[str, tuple, float]]:
+        """Плоский знімок (name, labels, value): лічильники, sum/count гістограм і gauges."""
+        rows = []
+        with self._lock:
+            for name, series in self._counters.items():
+                rows.extend((name, labels, value) for labels, value in series.items())
+            for name, series in self._hists.items():
+                for labels, (_, total, count) in series.items():
+                    rows.append((name + '_sum', labels, total))
+                    rows.append((name + '_count', labels, float(count)))
+        for name, series in self._gauge_values().items():
+            rows.extend((name, labels, value) for labels, value in series.items())
+        return rows
+
+    def render(self) -> str:
+        """Текстовий формат Prometheus 0.0.4."""
+        p = self.prefix
+        lines = []
+        with self._lock:
+            counters = {n: dict(s) for n, s in self._counters.items()}
+            hists = {n: {k: (list(v[0]), v[1], v[2]) for k, v in s.items()} for n, s in self._hists.items()}
+        for name, series in sorted(counters.items()):
+            lines.append(f"# TYPE {p}_{name} counter")
+            for labels, value in series.items():
+                lines.append(f"{p}_{name}{_fmt_labels(labels)} {value:g}")
+        for name, series in sorted(hists.items()):
+            lines.append(f"# TYPE {p}_{name} histogram")
+            for labels, (counts, total, count) in series.items():
+                cumulative = 0
+                for bound, n in zip(self.buckets, counts):
+                    cumulative += n
+                    lines.append(f"{p}_{name}_bucket{_fmt_labels(labels, (('le', f'{bound:g}'),))} {cumulative}")
+                lines.append(f"{p}_{name}_bucket{_fmt_labels(labels, (('le', '+Inf'),))} {count}")
+                lines.append(f"{p}_{name}_sum{_fmt_labels(labels)} {total:.6f}")
+                lines.append(f"{p}_{name}_count{_fmt_labels(labels)} {count}")
+        for name, series in sorted(self._gauge_values().items()):
+            if name in self._help:
+                lines.append(f"# HELP {p}_{name} {self._help[name]}")
+            lines.append(f"# TYPE {p}_{name} gauge")
+            for labels, value in series.items():
+                lines.append(f"{p}_{name}{_fmt_labels(labels)} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+inc = registry.inc
+observe = registry.observe
+gauge = registry.gauge
+timed = registry.timed
+
+
+# --- HTTP endpoint ---
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve(port: int = METRICS_PORT, addr: str = METRICS_ADDR) -> Optional[ThreadingHTTPServer]:
+    """Підняти /metrics у фоновому потоці. port=0 — вимкнено."""
+    if not port:
+        return None
+    try:
+        server = ThreadingHTTPServer((addr, port), _MetricsHandler)
+    except OSError as e:
+        logger.warning("metrics endpoint %s:%s not started: %s", addr, port, e)
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    logger.info("metrics endpoint on http://%s:%s/metrics", addr, port)
+    return server
+
+
+# --- таблиця metrics ---
+
+class MetricsWriter:
+    """Раз на interval секунд пише знімок у таблицю metrics і прибирає записи, старші за keep_days."""
+
+    def __init__(self, interval: float = METRICS_FLUSH_INTERVAL, keep_days: int = METRICS_TABLE_DAYS, repo=None):
+        self.interval = interval
+        self.keep_days = keep_days
+        self._repo = repo
+        self._stop = threading.Event()
+        self._thread = None
+
+    def flush(self):
+        from storage import get_repo
+        repo = self._repo or get_repo()
+        now = datetime.utcnow()
+        rows = [(name, ",".join(f"{k}={v}" for k, v in labels), value) for name, labels, value in registry.snapshot()]
+        repo.write_metrics(now.isoformat(), rows, keep_after=(now - timedelta(days=self.keep_days)).isoformat())
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("metrics flush failed:")
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="metrics-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+# --- логування ---
+
+def sampled(log: logging.Logger, level: int, msg: str, *args, rate: float = None):
+    """log.log(level, ...) для частки rate викликів (за замовчуванням LOG_SAMPLE_RATE)."""
+    if not log.isEnabledFor(level):
+        return
+    if random.random() < (LOG_SAMPLE_RATE if rate is None else rate):
+        log.log(level, msg, *args)
@@ -0,0 +1,142 @@
+"""
+MinHash + LSH для пошуку майже-дублікатів тексту.
+
+Текст нормалізується і ріжеться на символьні шинґли (k-грами). Сигнатура —
+мінімуми num_perm універсальних хеш-функцій по шинґлах; частка однакових
+позицій двох сигнатур оцінює схожість Жаккара множин шинґлів.
+LSHIndex ділить сигнатуру на bands смуг: тексти, що збіглися хоча б в одній
+смузі, стають кандидатами, і лише для них рахується оцінка схожості —
+тож перевірка нового тексту не залежить від розміру історії.
+
+Використовується для пулу порад (tips_pool.py) і описів вакансій (dedup.py).
+"""
+import hashlib
+import random
+import re
+import struct
+from typing import Hashable, Iterable, Optional
+
+NUM_PERM = 64
+BANDS = 16          # 16 смуг по 4 рядки: кандидат з імовірністю ~50% уже при схожості ~0.5
+SHINGLE_SIZE = 4
+SEED = 1
+
+_MERSENNE = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def normalize(text: str) -> str:
+    """Нижній регістр, лише слова через пробіл (маркери списку, пунктуація й емодзі не враховуються)."""
+    return " ".join(_WORD_RE.findall((text or "").lower()))
+
+
+def shingles(text: str, k: int = SHINGLE_SIZE) -> set[str]:
+    norm = normalize(text)
+    if len(norm) <= k:
+        return {norm} if norm else set()
+    return {norm[i:i + k] for i in range(len(norm) - k + 1)}
+
+
+def word_shingles(text: str) -> set[str]:
+    """Множина нормалізованих слів — для коротких текстів (назва вакансії), де символьні шинґли надто шумні."""
+    return set(normalize(text).split())
+
+
+def _hash32(s: str) -> int:
+    return int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little")
+
+
+class MinHasher:
+    def __init__(self, num_perm: int = NUM_PERM, k: int = SHINGLE_SIZE, seed: int = SEED):
+        self.num_perm = num_perm
+        self.k = k
+        rnd = random.Random(seed)
+        # однакові seed — однакові сигнатури між запусками (сигнатури зберігаються в БД)
+        self._perms = [(rnd.randrange(1, _MERSENNE), rnd.randrange(0, _MERSENNE)) for _ in range(num_perm)]
+
+    def signature(self, text: str) -> tuple[int, ...]:
+        hashes = [_hash32(s) for s in shingles(text, self.k)]
+        if not hashes:
+            return (_MAX_HASH,) * self.num_perm
+        return tuple(
+            min(((a * h + b) % _MERSENNE) & _MAX_HASH for h in hashes)
+            for a, b in self._perms
+        )
+
+
+def similarity(sig1: tuple[int, ...], sig2: tuple[int, ...]) -> float:
+    """Оцінка схожості Жаккара за двома сигнатурами однакової довжини."""
+    if not sig1 or len(sig1) != len(sig2):
+        return 0.0
+    return sum(1 for a, b in zip(sig1, sig2) if a == b) / len(sig1)
+
+
+def sig_to_bytes(sig: tuple[int, ...]) -> bytes:
+    return struct.pack(f"<{len(sig)}I", *sig)
+
+
+def sig_from_bytes(data: bytes) -> tuple[int, ...]:
+    return struct.unpack(f"<{len(data) // 4}I", data)
+
+
+class LSHIndex:
+    def __init__(self, num_perm: int = NUM_PERM, bands: int = BANDS):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._buckets = {}   # (смуга, значення смуги) -> set(keys)
+        self._sigs = {}      # key -> сигнатура
+
+    def _band_keys(self, sig: tuple[int, ...]) -> list[tuple]:
+        r = self.rows
+        return [(i, sig[i * r:(i + 1) * r]) for i in range(self.bands)]
+
+    def __len__(self) -> int:
+        return len(self._sigs)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._sigs
+
+    def add(self, key: Hashable, sig: tuple[int, ...]):
+        if key in self._sigs:
+            self.remove(key)
+        self._sigs[key] = sig
+        for band in self._band_keys(sig):
+            self._buckets.setdefault(band, set()).add(key)
+
+    def remove(self, key: Hashable):
+        sig = self._sigs.pop(key, None)
+        if sig is None:
+            return
+        for band in self._band_keys(sig):
+            bucket = self._buckets.get(band)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band]
+
+    def candidates(self, sig: tuple[int, ...]) -> set:
+        out = set()
+        for band in self._band_keys(sig):
+            out.update(self._buckets.get(band, ()))
+        return out
+
+    def query(self, sig: tuple[int, ...], threshold: float) -> list[tuple[Hashable, float]]:
+        """Ключі зі схожістю >= threshold, від найсхожішого."""
+        found = []
+        for key in self.candidates(sig):
+            score = similarity(sig, self._sigs[key])
+            if score >= threshold:
+                found.append((key, score))
+        found.sort(key=lambda x: -x[1])
+        return found
+
+    def best_match(self, sig: tuple[int, ...], threshold: float,
+                   exclude: Iterable[Hashable] = ()) -> Optional[tuple[Hashable, float]]:
+        exclude = set(exclude)
+        for key, score in self.query(sig, threshold):
+            if key not in exclude:
+                return key, score
+        return None
@@ -0,0 +1,336 @@
+"""
+Асинхронний рушій викликів OpenAI для пакетної роботи (беклог summary, поради).
+
+Синхронний _call_openai робить один запит за раз і при 429 просто спить з
+фіксованим множником. Тут:
+  — AsyncOpenAI з вимкненими вбудованими повторами (ними керуємо самі);
+  — AdaptiveRateController: семафор на кількість одночасних запитів, що
+    зменшується вдвічі на 429 і поступово росте на успіхах (AIMD), і спільна
+    пауза до Retry-After / x-ratelimit-reset-requests, коли ліміт вичерпано;
+  — backoff з повним джитером і таймаут на кожен виклик.
+Стиснення опису, кеш і промпти — спільні з OpenAI_agent.
+
+Заповнити summary для черги без Batch API:
+    python openai_async.py --limit 500 --concurrency 16
+"""
+from dotenv import load_dotenv
+load_dotenv()
+
+import argparse
+import asyncio
+import logging
+import random
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Optional
+
+from openai import (
+    APIConnectionError, APIStatusError, APITimeoutError, AsyncOpenAI, InternalServerError, RateLimitError
+)
+
+import metrics
+from OpenAI_agent import (
+    API_KEY, DEFAULT_TIMEOUT, MODEL, build_summary_prompt, build_tips_prompt, extract_tips, merge_tips,
+    output_text, prepare_summary_input
+)
+from dedup import DuplicateVacancy
+from storage import get_repo
+from summary_cache import cache as summary_cache
+from summary_pipeline import NO_DESCRIPTION, load_description
+
+logger = logging.getLogger(__name__)
+
+MAX_CONCURRENCY = 8
+MAX_RETRIES = 5
+BASE_DELAY = 0.5   # seconds, перша затримка backoff
+MAX_DELAY = 30.0   # seconds, стеля backoff
+# якщо сервер каже, що запитів у вікні лишилось стільки або менше — чекаємо reset
+LOW_REMAINING = 1
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_UNITS = {'ms': 0.001, 's': 1.0, 'm': 60.0, 'h': 3600.0}
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """'1.5' / '20ms' / '6m0s' (формат x-ratelimit-reset-*) → секунди."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_RE.findall(value)
+    if not parts:
+        return None
+    return sum(float(n) * _UNITS[unit] for n, unit in parts)
+
+
+def retry_after(headers) -> Optional[float]:
+    """Скільки чекати за заголовками відповіді (retry-after-ms, retry-after, x-ratelimit-reset-requests)."""
+    if headers is None:
+        return None
+    ms = headers.get('retry-after-ms')
+    if ms:
+        try:
+            return float(ms) / 1000
+        except ValueError:
+            pass
+    for name in ('retry-after', 'x-ratelimit-reset-requests'):
+        seconds = parse_duration(headers.get(name))
+        if seconds is not None:
+            return seconds
+    return None
+
+
+def backoff_delay(attempt: int, base: float = BASE_DELAY, cap: float = MAX_DELAY) -> float:
+    """Експоненційний backoff з повним джитером: U(0, min(cap, base * 2^(attempt-1)))."""
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+class AdaptiveRateController:
+    """
+    Обмеження одночасних запитів, яке підлаштовується під ліміти акаунта.
+
+    limit — поточна дозволена кількість запитів у польоті (від min до max).
+    429 ділить її навпіл і ставить усіх на паузу до Retry-After; кожна успішна
+    відповідь додає 1/limit (≈ +1 за «вікно» запитів). Якщо заголовки кажуть,
+    що запити у вікні закінчились, пауза ставиться ще до 429.
+    """
+
+    def __init__(self, max_concurrency: int = MAX_CONCURRENCY, min_concurrency: int = 1):
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.limit = float(max_concurrency)
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self._cond = None
+
+    def _condition(self) -> asyncio.Condition:
+        # Condition прив'язується до циклу подій — створюємо всередині нього
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        return self._cond
+
+    async def acquire(self):
+        loop = asyncio.get_running_loop()
+        cond = self._condition()
+        while True:
+            delay = self.paused_until - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            async with cond:
+                if self.in_flight < max(self.min_concurrency, int(self.limit)) and loop.time() >= self.paused_until:
+                    self.in_flight += 1
+                    return
+                await cond.wait()
+
+    async def release(self):
+        cond = self._condition()
+        async with cond:
+            self.in_flight -= 1
+            cond.notify_all()
+
+    def pause(self, seconds: float):
+        until = asyncio.get_running_loop().time() + seconds
+        self.paused_until = max(self.paused_until, until)
+
+    def on_success(self, headers=None):
+        self.limit = min(self.max_concurrency, self.limit + 1.0 / max(self.limit, 1.0))
+        if headers is None:
+            return
+        remaining = headers.get('x-ratelimit-remaining-requests')
+        try:
+            remaining = int(remaining) if remaining is not None else None
+        except ValueError:
+            remaining = None
+        if remaining is not None and remaining <= LOW_REMAINING:
+            reset = parse_duration(headers.get('x-ratelimit-reset-requests'))
+            if reset:
+                self.pause(reset)
+
+    def on_rate_limited(self, wait: float):
+        self.limit = max(float(self.min_concurrency), self.limit / 2)
+        self.pause(wait)
+
+
+class AsyncOpenAIEngine:
+    def __init__(self, client: Optional[AsyncOpenAI] = None, max_concurrency: int = MAX_CONCURRENCY,
+                 max_retries: int = MAX_RETRIES, timeout: float = DEFAULT_TIMEOUT,
+                 base_delay: float = BASE_DELAY, max_delay: float = MAX_DELAY):
+        # max_retries=0 — повтори SDK не знають про наш контролер і лише подвоїли б очікування
+        self.client = client or AsyncOpenAI(api_key=API_KEY, max_retries=0)
+        self.rate = AdaptiveRateController(max_concurrency)
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.stats = {'calls': 0, 'retries': 0, 'rate_limited': 0, 'timeouts': 0, 'errors': 0}
+
+    async def call(self, prompt: str, timeout: Optional[float] = None, temperature: float = 0.7,
+                   top_p: float = 0.9, max_output_tokens: int = 300) -> str:
+        timeout = timeout or self.timeout
+        for attempt in range(1, self.max_retries + 1):
+            delay = None
+            await self.rate.acquire()
+            start = time.perf_counter()
+            try:
+                self.stats['calls'] += 1
+                raw = await asyncio.wait_for(
+                    self.client.responses.with_raw_response.create(
+                        model=MODEL, input=prompt, temperature=temperature, top_p=top_p,
+                        max_output_tokens=max_output_tokens, timeout=timeout,
+                    ),
+                    timeout=timeout,
+                )
+                self.rate.on_success(raw.headers)
+                metrics.observe('stage_duration_seconds', time.perf_counter() - start, stage='openai_async')
+                return output_text(raw.parse())
+            except RateLimitError as e:
+                self.stats['rate_limited'] += 1
+                metrics.inc('openai_errors_total', kind='rate_limited')
+                delay = retry_after(e.response.headers) or backoff_delay(attempt, self.base_delay, self.max_delay)
+                self.rate.on_rate_limited(delay)
+                error = e
+            except (APITimeoutError, asyncio.TimeoutError) as e:
+                self.stats['timeouts'] += 1
+                metrics.inc('openai_errors_total', kind='timeout')
+                error = e
+            except (APIConnectionError, InternalServerError) as e:
+                self.stats['errors'] += 1
+                metrics.inc('openai_errors_total', kind='server')
+                error = e
+            except APIStatusError:
+                # 4xx окрім 429 — повтор не допоможе
+                self.stats['errors'] += 1
+                metrics.inc('openai_errors_total', kind='client')
+                raise
+            finally:
+                await self.rate.release()
+            if attempt == self.max_retries:
+                raise error
+            self.stats['retries'] += 1
+            await asyncio.sleep(delay if delay is not None else backoff_delay(attempt, self.base_delay, self.max_delay))
+
+    # --- операції агента ---
+
+    async def summarize_description(self, text: str, job_id: Optional[int] = None) -> str:
+        if not text:
+            return ""
+        # кеш і оцінка токенів — SQLite: в окремому потоці, щоб блокування БД не зупиняли цикл подій
+        text, key, cached = await asyncio.to_thread(prepare_summary_input, text, job_id)
+        if cached:
+            return cached
+        summary = await self.call(build_summary_prompt(text))
+        await asyncio.to_thread(summary_cache.put, key, summary)
+        return summary
+
+    async def create_useful_tips(self, num_tips: int = 3, locale: str = "uk") -> str:
+        prompt = build_tips_prompt(num_tips, locale)
+        raw = await self.call(prompt, temperature=0.85, top_p=0.95, max_output_tokens=256)
+        tips = extract_tips(raw, num_tips)
+        if len(set(tips)) < len(tips):
+            alt = await self.call(prompt, temperature=0.95, top_p=1.0, max_output_tokens=256)
+            tips = merge_tips(tips, alt, num_tips)
+        return "\n".join(tips[:num_tips])
+
+    async def summarize_many(self, items: Iterable[tuple[int, str]],
+                             on_result: Optional[Callable[[int, object], None]] = None) -> dict:
+        """
+        (job_id, опис) → {job_id: summary або виняток}. Паралельність обмежує контролер.
+        on_result(job_id, результат) викликається в окремому потоці щойно виклик завершився —
+        тож збій посеред черги не губить уже готові summary.
+        """
+        items = list(items)
+
+        async def one(job_id, text):
+            try:
+                result = await self.summarize_description(text, job_id)
+            except Exception as e:
+                result = e
+            if on_result is not None:
+                try:
+                    await asyncio.to_thread(on_result, job_id, result)
+                except Exception:
+                    logger.exception("on_result failed for job id=%s:", job_id)
+            return job_id, result
+        return dict(await asyncio.gather(*(one(job_id, text) for job_id, text in items)))
+
+    async def aclose(self):
+        await self.client.close()
+
+
+def summarize_texts(items: Iterable[tuple[int, str]], max_concurrency: int = MAX_CONCURRENCY,
+                    client: Optional[AsyncOpenAI] = None,
+                    on_result: Optional[Callable[[int, object], None]] = None) -> dict:
+    """Синхронна обгортка для коду без циклу подій: summarize_many в окремому asyncio.run."""
+    async def run():
+        engine = AsyncOpenAIEngine(client=client, max_concurrency=max_concurrency)
+        try:
+            return await engine.summarize_many(items, on_result)
+        finally:
+            if client is None:
+                await engine.aclose()
+    return asyncio.run(run())
+
+
+def _load(job: dict):
+    """(job, опис або виняток): DuplicateVacancy — опис повторює іншу вакансію, LLM не потрібен."""
+    try:
+        return job, load_description(job['link'], job['id'])
+    except DuplicateVacancy as e:
+        return job, e
+    except Exception as e:
+        logger.warning("description fetch failed for job id=%s: %s", job['id'], e)
+        return job, e
+
+
+def summarize_backlog(limit: int = 500, max_concurrency: int = MAX_CONCURRENCY, workers: int = 4) -> dict:
+    """Заповнити summary для перших `limit` неопублікованих вакансій паралельними викликами."""
+    repo = get_repo()
+    stats = {"jobs": 0, "ok": 0, "no_description": 0, "duplicates": 0, "failed": 0}
+    jobs = [j for j in repo.jobs_without_summary(limit) if j['link']]
+    stats["jobs"] = len(jobs)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        loaded = list(pool.map(_load, jobs))
+    items = []
+    for job, text in loaded:
+        if isinstance(text, DuplicateVacancy):
+            logger.info("backlog: skipped %s", text)
+            stats["duplicates"] += 1
+        elif isinstance(text, Exception):
+            stats["failed"] += 1
+        elif not text:
+            repo.save_job_summary(job['id'], NO_DESCRIPTION)
+            stats["no_description"] += 1
+        else:
+            items.append((job['id'], text))
+
+    def save(job_id: int, result):
+        # зберігаємо одразу: падіння посеред черги не має губити вже оплачені виклики
+        if not isinstance(result, Exception):
+            repo.save_job_summary(job_id, result)
+
+    for job_id, result in summarize_texts(items, max_concurrency, on_result=save).items():
+        if isinstance(result, Exception):
+            logger.warning("summary failed for job id=%s: %s", job_id, result)
+            stats["failed"] += 1
+        else:
+            stats["ok"] += 1
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Заповнити summary для черги паралельними async-викликами OpenAI")
+    parser.add_argument('--limit', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=MAX_CONCURRENCY)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    get_repo().init_schema()
+    print(summarize_backlog(limit=args.limit, max_concurrency=args.concurrency))
+
+
+if __name__ == '__main__':
+    main()
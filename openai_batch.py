@@ -0,0 +1,214 @@
+"""
+Пакетне заповнення summary через OpenAI Batch API.
+
+Для бекфілу після простою: збираємо всі вакансії без summary в один JSONL,
+відправляємо батч, чекаємо завершення і записуємо результати через
+save_job_summary. Те, що батч не зміг обробити, доробляємо паралельними
+async-викликами (openai_async.summarize_texts).
+
+Запуск:
+    python openai_batch.py --limit 500
+
+Для локальної перевірки достатньо підставити клієнт з base_url на заглушку
+(OPENAI_BASE_URL або run_batch_summaries(client=OpenAI(base_url=...))).
+"""
+from dotenv import load_dotenv
+load_dotenv()  # до імпорту OpenAI_agent, який читає OPENAI_API_KEY
+
+import argparse
+import io
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dedup import DuplicateVacancy
+from desc_compactor import compact_description
+from OpenAI_agent import (
+    get_client, MODEL, SUMMARY_PROMPT_VERSION,
+    build_summary_prompt
+)
+from openai_async import summarize_texts
+from parser_work_ua import init_db, save_job_summary
+from storage import get_repo
+from summary_cache import cache as summary_cache, make_key
+from summary_pipeline import NO_DESCRIPTION, load_description
+
+logger = logging.getLogger(__name__)
+
+ENDPOINT = "/v1/responses"
+COMPLETION_WINDOW = "24h"
+POLL_INTERVAL = 30  # seconds
+TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+def build_batch_jsonl(items) -> str:
+    """items: (job_id, description). Кожен рядок — окремий запит до /v1/responses."""
+    lines = []
+    for job_id, text in items:
+        lines.append(json.dumps({
+            "custom_id": f"job-{job_id}",
+            "method": "POST",
+            "url": ENDPOINT,
+            "body": {
+                "model": MODEL,
+                "input": build_summary_prompt(text),
+                "temperature": 0.7,
+                "top_p": 0.9,
+                "max_output_tokens": 300,
+            },
+        }, ensure_ascii=False))
+    return "\n".join(lines) + "\n"
+
+
+def _extract_output_text(body: dict) -> str:
+    if body.get("output_text"):
+        return body["output_text"].strip()
+    out = ""
+    for item in body.get("output") or []:
+        for c in item.get("content") or []:
+            if isinstance(c, dict) and c.get("type") == "output_text":
+                out += c.get("text", "")
+    return out.strip()
+
+
+def parse_batch_output(text: str) -> dict:
+    """custom_id -> summary (рядки з помилками пропускаються)."""
+    results = {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        try:
+            rec = json.loads(line)
+        except ValueError:
+            continue
+        resp = rec.get("response") or {}
+        if rec.get("error") or resp.get("status_code") != 200:
+            continue
+        summary = _extract_output_text(resp.get("body") or {})
+        if summary:
+            results[rec.get("custom_id")] = summary
+    return results
+
+
+def submit_batch(client, jsonl: str) -> str:
+    upload = client.files.create(file=("summaries.jsonl", io.BytesIO(jsonl.encode("utf-8"))), purpose="batch")
+    batch = client.batches.create(input_file_id=upload.id, endpoint=ENDPOINT, completion_window=COMPLETION_WINDOW)
+    logger.info("batch submitted: id=%s file=%s", batch.id, upload.id)
+    return batch.id
+
+
+def wait_for_batch(client, batch_id: str, poll_interval: float = POLL_INTERVAL, timeout: float = 24 * 3600):
+    deadline = time.monotonic() + timeout
+    while True:
+        batch = client.batches.retrieve(batch_id)
+        if batch.status in TERMINAL_STATUSES:
+            return batch
+        if time.monotonic() > deadline:
+            logger.warning("batch %s still %s after %ss, giving up", batch_id, batch.status, timeout)
+            return batch
+        time.sleep(poll_interval)
+
+
+def _load_description(job: dict):
+    """
+    (job, опис, опис стиснутий desc_compactor) — оцінка токенів пишеться в jobs.
+    Замість опису може повернутись виняток: DuplicateVacancy — опис повторює іншу вакансію.
+    """
+    try:
+        raw = load_description(job['link'], job['id'])
+    except DuplicateVacancy as e:
+        return job, e, None
+    except Exception as e:
+        logger.warning("description fetch failed for job id=%s: %s", job['id'], e)
+        return job, e, None
+    if not raw:
+        return job, raw, raw
+    compacted = compact_description(raw)
+    get_repo().save_desc_tokens(job['id'], compacted.tokens_before, compacted.tokens_after)
+    return job, raw, compacted.text or raw
+
+
+def run_batch_summaries(limit: int = 1000, client=None, poll_interval: float = POLL_INTERVAL,
+                        timeout: float = 24 * 3600, workers: int = 4) -> dict:
+    client = client or get_client()
+    repo = get_repo()
+    stats = {"jobs": 0, "cached": 0, "duplicates": 0, "batched": 0, "batch_ok": 0, "fallback_ok": 0,
+             "failed": 0}
+
+    jobs = [j for j in repo.jobs_without_summary(limit) if j['link']]
+    stats["jobs"] = len(jobs)
+    if not jobs:
+        return stats
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        loaded = list(pool.map(_load_description, jobs))
+
+    pending = {}  # custom_id -> (job, стиснутий опис, вихідний опис)
+    for job, raw, text in loaded:
+        if isinstance(raw, DuplicateVacancy):
+            logger.info("batch: skipped %s", raw)
+            stats["duplicates"] += 1
+            continue
+        if isinstance(raw, Exception):
+            stats["failed"] += 1
+            continue
+        if not raw:
+            save_job_summary(job['id'], NO_DESCRIPTION)
+            continue
+        cached = summary_cache.get(make_key(text, MODEL, SUMMARY_PROMPT_VERSION))
+        if cached:
+            save_job_summary(job['id'], cached)
+            stats["cached"] += 1
+            continue
+        pending[f"job-{job['id']}"] = (job, text, raw)
+
+    results = {}
+    if pending:
+        stats["batched"] = len(pending)
+        try:
+            batch_id = submit_batch(client, build_batch_jsonl((job['id'], text) for job, text, _ in pending.values()))
+            batch = wait_for_batch(client, batch_id, poll_interval=poll_interval, timeout=timeout)
+            if batch.status == "completed" and batch.output_file_id:
+                results = parse_batch_output(client.files.content(batch.output_file_id).text)
+            else:
+                logger.warning("batch %s finished with status=%s", batch_id, batch.status)
+        except Exception as e:
+            logger.warning("batch submission failed, falling back to async calls: %s", e)
+
+    fallback = []
+    for custom_id, (job, text, raw) in pending.items():
+        summary = results.get(custom_id)
+        if summary:
+            summary_cache.put(make_key(text, MODEL, SUMMARY_PROMPT_VERSION), summary)
+            save_job_summary(job['id'], summary)
+            stats["batch_ok"] += 1
+            continue
+        # вихідний опис: summarize_texts сам стисне його й запише оцінку токенів — стиснутий
+        # текст стиснувся б удруге і затер desc_tokens_before
+        fallback.append((job['id'], raw))
+
+    # не вдалося в батчі — паралельні async-виклики з адаптивним лімітом (openai_async)
+    if fallback:
+        def save(job_id: int, result):
+            if not isinstance(result, Exception):
+                save_job_summary(job_id, result)
+
+        for job_id, result in summarize_texts(fallback, on_result=save).items():
+            if isinstance(result, Exception):
+                logger.warning("fallback failed for job id=%s: %s", job_id, result)
+                stats["failed"] += 1
+            else:
+                stats["fallback_ok"] += 1
+    return stats
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Заповнити summary для черги через OpenAI Batch API")
+    parser.add_argument('--limit', type=int, default=1000)
+    parser.add_argument('--poll-interval', type=float, default=POLL_INTERVAL)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    init_db()
+    print(run_batch_summaries(limit=args.limit, poll_interval=args.poll_interval))
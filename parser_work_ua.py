@@ -1,158 +1,271 @@
-import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin
-import sqlite3
-from datetime import datetime, timedelta
+from urllib.parse import urljoin, urlsplit
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import http_client
+import metrics
+from dedup import get_detector
+from listing_parser import parse_job_cards
+from storage import DEFAULT_SOURCE, get_repo
+
+logger = logging.getLogger(__name__)
 
 BASE = 'https://www.work.ua'
-START_PATH = 'jobs-junior/'
+START_PATH = DEFAULT_SOURCE
 URL = urljoin(BASE, START_PATH)
 
 HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)'
+    'User-Agent': http_client.USER_AGENT
 }
 
-DB_PATH = 'jobs.db'
+# Режим краулера: обходимо кілька сторінок пагінації (і, за потреби, кілька категорій)
+CRAWL_PATHS = [START_PATH]
+CRAWL_MAX_PAGES = 10       # верхня межа сторінок на одну категорію
+CRAWL_WORKERS = 4          # розмір пулу потоків
+PER_HOST_LIMIT = 2         # не більше N одночасних запитів до одного хоста
+
+_host_limits = {}
+_host_limits_lock = threading.Lock()
 
-def get_conn():
-    conn = sqlite3.connect(DB_PATH, detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES)
-    conn.row_factory = sqlite3.Row
-    return conn
+# скільки циклів fetch_and_store у цьому процесі закінчились без парсингу/БД (сумарно — meta listing_short_circuits)
+short_circuits = 0
 
 def init_db():
-    import sqlite3
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    # створюємо таблицю, якщо нема (підлаштуй поля під вашу схему)
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS jobs (
-        id INTEGER PRIMARY KEY,
-        title TEXT,
-        company TEXT,
-        link TEXT,
-        salary TEXT,
-        summary TEXT DEFAULT '',
-        inserted_at TEXT,
-        posted_on_telegram INTEGER DEFAULT 0
-    )
-    """)
-    # створюємо унікальний індекс по link (якщо в БД вже нема дублів)
-    cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_link ON jobs(link);")
-    # таблиця meta
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS meta (
-        key TEXT PRIMARY KEY,
-        value TEXT
-    )
-    """)
-    conn.commit()
-    conn.close()
+    get_repo().init_schema()
 
 def set_meta(key: str, value: str):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
-    conn.commit()
-    conn.close()
+    get_repo().set_meta(key, value)
 
 def get_meta(key: str):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute('SELECT value FROM meta WHERE key = ?', (key,))
-    row = cur.fetchone()
-    conn.close()
-    return row['value'] if row else None
+    return get_repo().get_meta(key)
 
 def delete_old_jobs(days: int = 30):
-    cutoff = datetime.utcnow() - timedelta(days=days)
-    cutoff_iso = cutoff.isoformat()
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute('DELETE FROM jobs WHERE inserted_at < ?', (cutoff_iso,))
-    conn.commit()
-    conn.close()
-
-def fetch_and_store():
-    import requests
-    import sqlite3
-    from bs4 import BeautifulSoup
-    from urllib.parse import urljoin
-    from datetime import datetime
+    return get_repo().delete_old_jobs(days)
 
-    print("[debug] fetch_and_store starting")
-    try:
-        r = requests.get(URL, headers=HEADERS, timeout=12)
-    except Exception as e:
-        print("[debug] request error:", e)
-        return []
+def _host_semaphore(url: str) -> threading.BoundedSemaphore:
+    host = urlsplit(url).netloc
+    with _host_limits_lock:
+        sem = _host_limits.get(host)
+        if sem is None:
+            sem = threading.BoundedSemaphore(PER_HOST_LIMIT)
+            _host_limits[host] = sem
+        return sem
 
-    if r.status_code != 200:
-        print("[debug] bad status:", r.status_code)
-        return []
+def page_url(path: str, page: int) -> str:
+    url = urljoin(BASE, path)
+    return url if page <= 1 else f"{url}?page={page}"
+
+def parse_listing(html: str):
+    """
+    Повертає список вакансій {link, title, company, salary, posted_at} зі сторінки списку, без дублів.
+    Якщо карток не знайдено (змінилась верстка) — старий fallback по всіх <a> з "/jobs/".
+    """
+    jobs = parse_job_cards(html, BASE)
+    if jobs:
+        return jobs
 
-    soup = BeautifulSoup(r.text, "html.parser")
-    found = []
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, "html.parser")
+    uniq = []
+    seen = set()
     for a in soup.find_all("a", href=True):
         href = a["href"]
         if "/jobs/" in href and href.rstrip("/") != "/jobs":
             full = urljoin(BASE, href)
-            title = (a.get_text() or "").strip()
-            found.append((full, title))
+            if full not in seen:
+                seen.add(full)
+                uniq.append({"link": full, "title": (a.get_text() or "").strip(),
+                             "company": "", "salary": "", "posted_at": ""})
+    return uniq
 
-    print(f"[debug] parsed {len(found)} candidate links (raw)")
-    # унікалізуємо по посиланню
-    uniq = []
-    seen = set()
-    for u, t in found:
-        if u not in seen:
-            seen.add(u)
-            uniq.append((u, t))
-    print(f"[debug] unique links to consider: {len(uniq)}")
-
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    inserted = []
-    for link, title in uniq:
-        now = datetime.utcnow().isoformat()
+def _listing_keys(url: str) -> dict:
+    return {k: f"listing_{k}:{url}" for k in ('etag', 'last_modified', 'body_digest', 'links_digest')}
+
+def _digest(data) -> str:
+    return hashlib.sha1(data if isinstance(data, bytes) else data.encode('utf-8')).hexdigest()
+
+@metrics.timed('listing_page')
+def fetch_listing_page(url: str, conditional: bool = True):
+    """
+    Завантажити і розпарсити одну сторінку списку. None — помилка або не 200/304.
+
+    Повертає dict {url, items, unchanged, meta}. unchanged=True, коли сервер відповів 304
+    або вміст/набір посилань не змінився з минулого разу — тоді items порожній, а парсинг
+    і робота з БД пропускаються. meta — валідатори, які треба зберегти після успішного запису.
+    """
+    keys = _listing_keys(url)
+    repo = get_repo()
+    stored = {k: repo.get_meta(key) for k, key in keys.items()} if conditional else {}
+    headers = dict(HEADERS)
+    if stored.get('etag'):
+        headers['If-None-Match'] = stored['etag']
+    if stored.get('last_modified'):
+        headers['If-Modified-Since'] = stored['last_modified']
+
+    with _host_semaphore(url):
         try:
-            # підлаштуй поля під вашу схему (company, salary тощо)
-            cur.execute(
-                "INSERT OR IGNORE INTO jobs (title, company, link, salary, summary, inserted_at, posted_on_telegram) VALUES (?, ?, ?, ?, ?, ?, 0)",
-                (title, "", link, "", "", now)
-            )
-            conn.commit()
-            # дізнаємось чи вставилось
-            cur2 = conn.execute("SELECT id FROM jobs WHERE link = ?", (link,))
-            row = cur2.fetchone()
-            if row:
-                inserted.append(link)
-                print("[debug] ensured in DB:", link)
+            r = http_client.get(url, headers=headers, timeout=12)
         except Exception as e:
-            print("[debug] SQL error for", link, ":", e)
-    conn.close()
-    print(f"[debug] fetch_and_store done, inserted/ensured: {len(inserted)}")
+            logger.warning("listing request error: %s %s", url, e)
+            return None
+    if r.status_code == 304:
+        return {'url': url, 'items': [], 'unchanged': True, 'meta': {}}
+    if r.status_code != 200:
+        logger.warning("listing bad status: %s %s", url, r.status_code)
+        return None
+
+    meta = {}
+    if r.headers.get('ETag'):
+        meta[keys['etag']] = r.headers['ETag']
+    if r.headers.get('Last-Modified'):
+        meta[keys['last_modified']] = r.headers['Last-Modified']
+
+    # байт-в-байт та сама сторінка — навіть не парсимо
+    body_digest = _digest(r.content)
+    if conditional and body_digest == stored.get('body_digest'):
+        return {'url': url, 'items': [], 'unchanged': True, 'meta': meta}
+    meta[keys['body_digest']] = body_digest
+
+    items = parse_listing(r.text)
+    # сторінка змінилась косметично (банери, лічильники), а набір вакансій той самий
+    links_digest = _digest("\n".join(sorted(job['link'] for job in items)))
+    if conditional and items and links_digest == stored.get('links_digest'):
+        return {'url': url, 'items': [], 'unchanged': True, 'meta': meta}
+    meta[keys['links_digest']] = links_digest
+    return {'url': url, 'items': items, 'unchanged': False, 'meta': meta}
+
+def crawl_listing(paths=None, max_pages: int = CRAWL_MAX_PAGES, workers: int = CRAWL_WORKERS):
+    """
+    Обійти пагінацію для кожного шляху з paths через пул потоків.
+    Спершу лише перша сторінка (у більшості циклів вона незмінна або вся відома),
+    далі хвилями по `workers` штук; зупиняємось на першій сторінці, де всі посилання
+    вже є в jobs (або сторінка незмінна/порожня/помилкова).
+    Повертає (нові вакансії у порядку сторінок, список завантажених сторінок).
+    """
+    paths = paths or CRAWL_PATHS
+    results = []
+    pages = []
+    seen = set()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # стан по кожній категорії: наступна сторінка і чи ще йдемо далі
+        next_page = {p: 1 for p in paths}
+        active = list(paths)
+        while active:
+            wave = []
+            for path in active:
+                start = next_page[path]
+                stop = min(start + (1 if start == 1 else workers), max_pages + 1)
+                for page in range(start, stop):
+                    wave.append((path, page, pool.submit(fetch_listing_page, page_url(path, page))))
+                next_page[path] = stop
+
+            finished = set()
+            for path, page, fut in wave:
+                if path in finished:
+                    fut.cancel()
+                    continue
+                result = fut.result()
+                if result is None:
+                    logger.debug("crawl %s page=%s: failed, stop", path, page)
+                    finished.add(path)
+                    continue
+                pages.append(result)
+                if result['unchanged']:
+                    logger.debug("crawl %s page=%s: unchanged, stop", path, page)
+                    finished.add(path)
+                    continue
+                items = result['items']
+                if not items:
+                    logger.debug("crawl %s page=%s: empty, stop", path, page)
+                    finished.add(path)
+                    continue
+                links = [job['link'] for job in items]
+                known = get_repo().known_links(links)
+                for job in items:
+                    if job['link'] not in seen and job['link'] not in known:
+                        seen.add(job['link'])
+                        job['source'] = path
+                        results.append(job)
+                if len(known) == len(links):
+                    logger.debug("crawl %s page=%s: all %d links known, stop", path, page, len(links))
+                    finished.add(path)
+
+            active = [p for p in active if p not in finished and next_page[p] <= max_pages]
+    return results, pages
+
+@metrics.timed('crawl')
+def fetch_and_store(crawl: bool = False, paths=None, max_pages: int = CRAWL_MAX_PAGES):
+    """
+    За замовчуванням — лише перша сторінка URL (або перша сторінка кожної категорії з paths).
+    crawl=True — обхід пагінації (і категорій з paths) через crawl_listing.
+    Кожна вакансія позначається категорією (source), з якої її взято.
+    Якщо всі завантажені сторінки незмінні (304 або той самий digest) — цикл
+    закінчується без парсингу і запису в БД, а лічильник listing_short_circuits росте.
+    """
+    global short_circuits
+    logger.debug("fetch_and_store starting")
+    if crawl:
+        uniq, pages = crawl_listing(paths, max_pages=max_pages)
+    elif paths and list(paths) != [START_PATH]:
+        # кілька категорій (каналів) — по першій сторінці кожної, паралельно
+        uniq, pages = crawl_listing(paths, max_pages=1)
+    else:
+        page = fetch_listing_page(URL)
+        if page is None:
+            return []
+        uniq, pages = page['items'], [page]
+        for job in uniq:
+            job['source'] = START_PATH
+
+    if pages and all(p['unchanged'] for p in pages):
+        short_circuits += 1
+        repo = get_repo()
+        repo.set_meta('listing_short_circuits', str(int(repo.get_meta('listing_short_circuits') or 0) + 1))
+        for p in pages:
+            for key, value in p['meta'].items():
+                repo.set_meta(key, value)
+        metrics.inc('listing_short_circuits_total')
+        logger.debug("listing unchanged, short-circuited (this process: %d)", short_circuits)
+        return []
+    logger.debug("unique links to consider: %d", len(uniq))
+
+    try:
+        inserted = store_jobs(uniq)
+    except Exception as e:
+        logger.warning("SQL error in store_jobs: %s", e)
+        return []
+    # валідатори зберігаємо лише після успішного запису, інакше наступний 304 сховав би ці вакансії
+    for p in pages:
+        for key, value in p['meta'].items():
+            set_meta(key, value)
+    metrics.inc('jobs_inserted_total', len(inserted))
+    logger.debug("fetch_and_store done, new inserted: %d", len(inserted))
     return inserted
 
+@metrics.timed('db_store')
+def store_jobs(items):
+    """
+    Записати пачку вакансій (dict з parse_listing) однією транзакцією; повертає лише нові посилання.
+    Майже-дублікати вже відомих вакансій записуються позначеними і в результат не потрапляють.
+    """
+    repo = get_repo()
+    known = repo.known_links([job['link'] for job in items])
+    fresh = [job for job in items if job['link'] not in known]
+    if not fresh:
+        return []
+    get_detector().annotate(fresh)
+    return repo.insert_jobs(fresh)
+
 def get_unposted_jobs():
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute('SELECT * FROM jobs WHERE posted_on_telegram = 0 ORDER BY inserted_at ASC')
-    rows = [dict(r) for r in cur.fetchall()]
-    conn.close()
-    return rows
+    return get_repo().get_unposted_jobs()
 
 def mark_jobs_posted(job_ids):
-    if not job_ids:
-        return
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.executemany('UPDATE jobs SET posted_on_telegram = 1 WHERE id = ?', [(jid,) for jid in job_ids])
-    conn.commit()
-    conn.close()
+    get_repo().mark_jobs_posted(job_ids)
 
 def save_job_summary(job_id: int, summary: str):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute('UPDATE jobs SET summary = ? WHERE id = ?', (summary, job_id))
-    conn.commit()
-    conn.close()
\ No newline at end of file
+    get_repo().save_job_summary(job_id, summary)
+
+def delete_job(job_id: int):
+    get_repo().delete_job(job_id)
@@ -0,0 +1,79 @@
+"""
+Token bucket для відправки в Telegram.
+
+Telegram обмежує бота приблизно 30 повідомленнями на секунду сумарно і ~20 на
+хвилину в одну групу/канал. TelegramRateLimiter тримає один глобальний бакет і
+по бакету на chat_id; acquire(chat_id) блокує потік, доки токени є в обох.
+Годинник і sleep інжектуються, щоб лімітер працював і на віртуальному часі.
+"""
+import threading
+import time
+from typing import Callable
+
+GLOBAL_RATE = 30.0           # повідомлень/сек на бота
+PER_CHAT_RATE = 20.0 / 60.0  # повідомлень/сек в один чат (ліміт для груп і каналів)
+PER_CHAT_BURST = 3
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float, monotonic: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._monotonic = monotonic
+        self._updated = monotonic()
+
+    def _refill(self):
+        now = self._monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, tokens: float = 1.0) -> float:
+        """Скільки секунд чекати, доки в бакеті буде `tokens` (0 — вже є). Не списує."""
+        self._refill()
+        missing = tokens - self._tokens
+        return 0.0 if missing <= 0 else missing / self.rate
+
+    def take(self, tokens: float = 1.0):
+        self._refill()
+        self._tokens -= tokens
+
+
+class TelegramRateLimiter:
+    def __init__(self, global_rate: float = GLOBAL_RATE, per_chat_rate: float = PER_CHAT_RATE,
+                 per_chat_burst: float = PER_CHAT_BURST,
+                 monotonic: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self._monotonic = monotonic
+        self._sleep = sleep
+        self._per_chat_rate = per_chat_rate
+        self._per_chat_burst = per_chat_burst
+        self._global = TokenBucket(global_rate, global_rate, monotonic)
+        self._chats = {}
+        self._lock = threading.Lock()
+        self.waited = 0.0  # сумарний час очікування, для статистики
+
+    def _chat_bucket(self, chat_id) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            bucket = TokenBucket(self._per_chat_rate, self._per_chat_burst, self._monotonic)
+            self._chats[chat_id] = bucket
+        return bucket
+
+    def acquire(self, chat_id):
+        """Заблокуватись, доки можна надіслати одне повідомлення в chat_id."""
+        while True:
+            with self._lock:
+                chat = self._chat_bucket(chat_id)
+                # токени списуємо лише разом з обох бакетів, інакше чекаючий чат «з'їдав» би глобальні
+                wait = max(self._global.wait_time(), chat.wait_time())
+                if wait <= 0:
+                    self._global.take()
+                    chat.take()
+                    return
+                self.waited += wait
+            self._sleep(wait)
+
+
+# спільний лімітер процесу: усі канали шлються через одного бота
+limiter = TelegramRateLimiter()
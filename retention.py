@@ -0,0 +1,119 @@
+"""
+Зберігання вакансій: гаряча БД лише за останні RETENTION_DAYS, решта — в архіві.
+
+Раніше кожен цикл crawl робив DELETE за inserted_at без індексу, а видалене
+просто зникало, і файл jobs.db не зменшувався. Тепер задача планувальника
+раз на RETENTION_INTERVAL:
+  — вибирає прострочені рядки пачками по BATCH (індекс idx_jobs_inserted);
+  — дописує їх у gzip JSONL архів за місяцем вставки (archive/jobs-2024-05.jsonl.gz);
+  — лише після запису на диск видаляє пачку з jobs;
+  — віддає ОС звільнені сторінки (auto_vacuum=INCREMENTAL) і обрізає WAL.
+Збій між записом і видаленням дасть повтор рядка в архіві, але не втрату — при
+аналізі дублікати відсікаються за id.
+
+Кожна пачка дописується окремим gzip-членом; gzip.open читає такий файл як один потік:
+    for job in read_archive('archive/jobs-2024-05.jsonl.gz'): ...
+
+Разовий запуск: python retention.py --days 30
+"""
+import argparse
+import gzip
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Iterator, Optional
+
+import metrics
+from storage import JobRepository, get_repo
+
+logger = logging.getLogger(__name__)
+
+RETENTION_DAYS = 30
+RETENTION_INTERVAL = int(os.getenv('RETENTION_INTERVAL', str(6 * 3600)))  # seconds
+ARCHIVE_DIR = os.getenv('ARCHIVE_DIR', 'archive')
+BATCH = 500
+
+
+def archive_path(inserted_at: str, archive_dir: str = ARCHIVE_DIR) -> str:
+    month = (inserted_at or '')[:7] or 'unknown'
+    return os.path.join(archive_dir, f"jobs-{month}.jsonl.gz")
+
+
+def read_archive(path: str) -> Iterator[dict]:
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+class Retention:
+    def __init__(self, days: int = RETENTION_DAYS, archive_dir: Optional[str] = ARCHIVE_DIR, batch: int = BATCH,
+                 repo: Optional[JobRepository] = None):
+        self.days = days
+        self.archive_dir = archive_dir   # None — видаляти без архіву
+        self.batch = batch
+        self._repo = repo
+        self._vacuum_ready = False
+
+    @property
+    def repo(self) -> JobRepository:
+        return self._repo or get_repo()
+
+    def _archive(self, rows: list[dict]):
+        by_file = {}
+        for row in rows:
+            by_file.setdefault(archive_path(row['inserted_at'], self.archive_dir), []).append(row)
+        os.makedirs(self.archive_dir, exist_ok=True)
+        for path, part in by_file.items():
+            with open(path, 'ab') as raw:
+                with gzip.GzipFile(fileobj=raw, mode='wb') as gz:
+                    for row in part:
+                        gz.write(json.dumps(row, ensure_ascii=False).encode('utf-8') + b"\n")
+                raw.flush()
+                os.fsync(raw.fileno())
+
+    @metrics.timed('retention')
+    def run_once(self, now: Optional[datetime] = None) -> dict:
+        """Архівувати й видалити все, що старше days. Повертає {'archived', 'freed_pages', 'db_bytes'}."""
+        repo = self.repo
+        if not self._vacuum_ready:
+            if repo.enable_incremental_vacuum():
+                logger.info("retention: switched %s to auto_vacuum=INCREMENTAL (one-time VACUUM)", repo.path)
+            self._vacuum_ready = True
+        cutoff = ((now or datetime.utcnow()) - timedelta(days=self.days)).isoformat()
+        archived = 0
+        while True:
+            rows = repo.expired_jobs(cutoff, self.batch)
+            if not rows:
+                break
+            if self.archive_dir:
+                self._archive(rows)
+            repo.delete_jobs([r['id'] for r in rows])
+            archived += len(rows)
+            if len(rows) < self.batch:
+                break
+        if archived:
+            # видалення лишають у FTS5 «надгробки» — зливаємо сегменти до повернення сторінок ОС
+            repo.optimize_search_index()
+        freed = repo.incremental_vacuum() if archived else 0
+        stats = {'archived': archived, 'freed_pages': freed, 'db_bytes': repo.db_size()}
+        metrics.inc('jobs_archived_total', archived)
+        if archived:
+            logger.info("retention: archived %d jobs older than %s, freed %d pages, db size %d bytes",
+                        archived, cutoff, freed, stats['db_bytes'])
+        return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Архівувати і видалити вакансії, старші за --days")
+    parser.add_argument('--days', type=int, default=RETENTION_DAYS)
+    parser.add_argument('--archive-dir', default=ARCHIVE_DIR)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    get_repo().init_schema()
+    print(Retention(days=args.days, archive_dir=args.archive_dir).run_once())
+
+
+if __name__ == '__main__':
+    main()
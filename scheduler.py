@@ -0,0 +1,207 @@
+"""
+Подієвий планувальник замість 60-секундного опитування.
+
+Кожна задача — функція job(now) -> datetime, яка виконує роботу і повертає
+момент наступного запуску. Scheduler спить рівно до найближчої події
+(heapq за часом), тож між подіями немає холостих пробуджень і звернень до БД.
+Годинник інжектується (Clock), щоб цикл можна було ганяти на віртуальному часі.
+"""
+import heapq
+import itertools
+import logging
+import threading
+import time
+from datetime import datetime, time as dtime, timedelta, timezone, tzinfo
+from typing import Callable, Iterable, Optional
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+RETRY_AFTER_ERROR = timedelta(seconds=10)
+
+
+class Clock:
+    """Системний годинник: now() у UTC і переривний sleep()."""
+
+    def __init__(self):
+        self._wakeup = threading.Event()
+
+    def now(self) -> datetime:
+        return datetime.now(timezone.utc)
+
+    def sleep(self, seconds: float):
+        if seconds > 0:
+            self._wakeup.wait(seconds)
+        self._wakeup.clear()
+
+    def wake(self):
+        """Перервати поточний sleep() (наприклад, коли іншу задачу перенесли на раніше)."""
+        self._wakeup.set()
+
+
+class VirtualClock(Clock):
+    """
+    Віртуальний час для симуляції (benchmarks/simulate.py): sleep() не чекає, а лише
+    зсуває now(). monotonic/sleep підходять і для TelegramRateLimiter.
+    """
+
+    def __init__(self, start: datetime):
+        super().__init__()
+        self._now = start
+        self._lock = threading.Lock()
+
+    def now(self) -> datetime:
+        return self._now
+
+    def sleep(self, seconds: float):
+        if seconds > 0:
+            with self._lock:
+                self._now += timedelta(seconds=seconds)
+
+    def wake(self):
+        pass
+
+    def monotonic(self) -> float:
+        return self._now.timestamp()
+
+
+class Scheduler:
+    def __init__(self, clock: Optional[Clock] = None):
+        self.clock = clock or Clock()
+        self._heap = []
+        self._jobs = {}
+        self._jobs_seq = {}  # name -> seq актуального запису в купі
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._stopped = False
+
+    def add(self, name: str, func: Callable[[datetime], Optional[datetime]], first_run: Optional[datetime] = None):
+        self._jobs[name] = func
+        self.reschedule(name, first_run or self.clock.now())
+
+    def reschedule(self, name: str, when: datetime):
+        """Перенести задачу на `when`. Попередні записи для неї в купі стають неактуальними."""
+        with self._lock:
+            seq = next(self._counter)
+            self._jobs_seq[name] = seq
+            heapq.heappush(self._heap, (when, seq, name))
+        self.clock.wake()
+
+    def next_due_of(self, name: str) -> Optional[datetime]:
+        """Запланований час задачі `name` (None — зараз виконується або не додана)."""
+        with self._lock:
+            seq = self._jobs_seq.get(name)
+            for when, s, n in self._heap:
+                if n == name and s == seq:
+                    return when
+            return None
+
+    def next_due(self) -> Optional[tuple[datetime, str]]:
+        with self._lock:
+            return self._peek()
+
+    def _peek(self) -> Optional[tuple[datetime, str]]:
+        while self._heap:
+            when, seq, name = self._heap[0]
+            if self._jobs_seq.get(name) == seq:
+                return when, name
+            heapq.heappop(self._heap)  # застарілий запис після reschedule
+        return None
+
+    def _pop_due(self, now: datetime) -> Optional[str]:
+        with self._lock:
+            due = self._peek()
+            if due is None or due[0] > now:
+                return None
+            heapq.heappop(self._heap)
+            self._jobs_seq.pop(due[1], None)
+            return due[1]
+
+    def run_pending(self) -> int:
+        """Виконати всі задачі, час яких настав. Повертає кількість виконаних."""
+        ran = 0
+        while True:
+            name = self._pop_due(self.clock.now())
+            if name is None:
+                return ran
+            now = self.clock.now()
+            start = time.perf_counter()
+            try:
+                nxt = self._jobs[name](now)
+            except Exception:
+                logger.exception("scheduled job %s failed:", name)
+                metrics.inc('scheduler_job_errors_total', job=name)
+                nxt = now + RETRY_AFTER_ERROR
+            metrics.observe('scheduler_job_duration_seconds', time.perf_counter() - start, job=name)
+            ran += 1
+            # задача могла сама перепланувати себе через reschedule — тоді не чіпаємо
+            with self._lock:
+                already = name in self._jobs_seq
+            if nxt is not None and not already:
+                self.reschedule(name, nxt)
+
+    def run_forever(self):
+        while not self._stopped:
+            self.run_pending()
+            due = self.next_due()
+            if due is None:
+                return
+            delay = (due[0] - self.clock.now()).total_seconds()
+            logger.debug("next event %s in %.1fs", due[1], delay)
+            self.clock.sleep(delay)
+
+    def run_until(self, until: datetime):
+        """Як run_forever, але лише до моменту until — для прогону на VirtualClock."""
+        while not self._stopped:
+            self.run_pending()
+            due = self.next_due()
+            now = self.clock.now()
+            if due is None or due[0] > until:
+                self.clock.sleep((until - now).total_seconds())
+                return
+            self.clock.sleep((due[0] - now).total_seconds())
+
+    def stop(self):
+        self._stopped = True
+        self.clock.wake()
+
+
+# --- календарні хелпери (вікно постингу, щоденні слоти) ---
+
+def in_window(dt: datetime, window: tuple[int, int], tz: tzinfo) -> bool:
+    h = dt.astimezone(tz).hour
+    return window[0] <= h < window[1]
+
+
+def next_in_window(dt: datetime, window: tuple[int, int], tz: tzinfo) -> datetime:
+    """dt, якщо він у вікні [start, end) годин за tz, інакше — найближчий початок вікна."""
+    if in_window(dt, window, tz):
+        return dt
+    local = dt.astimezone(tz)
+    start = datetime.combine(local.date(), dtime(window[0]), tzinfo=tz)
+    if local >= start:
+        start = datetime.combine(local.date() + timedelta(days=1), dtime(window[0]), tzinfo=tz)
+    return start.astimezone(timezone.utc)
+
+
+def _slot_times(day, slots: Iterable[tuple[int, int]], tz: tzinfo) -> list[datetime]:
+    return [datetime.combine(day, dtime(h, m), tzinfo=tz) for h, m in slots]
+
+
+def latest_daily_slot(now: datetime, slots: Iterable[tuple[int, int]], tz: tzinfo) -> Optional[datetime]:
+    """Останній слот сьогодні (за tz), що вже настав, або None."""
+    local = now.astimezone(tz)
+    past = [s for s in _slot_times(local.date(), slots, tz) if s <= local]
+    return max(past) if past else None
+
+
+def next_daily_slot(now: datetime, slots: Iterable[tuple[int, int]], tz: tzinfo) -> datetime:
+    """Найближчий слот строго після now."""
+    slots = list(slots)
+    local = now.astimezone(tz)
+    for day in (local.date(), local.date() + timedelta(days=1)):
+        future = [s for s in _slot_times(day, slots, tz) if s > local]
+        if future:
+            return min(future).astimezone(timezone.utc)
+    raise ValueError("empty slot list")
@@ -0,0 +1,223 @@
+"""
+Пошук по збережених вакансіях: команда /search у чаті з ботом.
+
+    /search python київ      — перша сторінка результатів
+    ◀️ / ▶️ під відповіддю     — гортання (повідомлення редагується на місці)
+
+Запит розбивається на слова, кожне шукається як префікс ("пайт"* знайде «пайтон»),
+усі слова мають збігтися. Ранжування і сам пошук — FTS5-індекс jobs_fts
+(storage.JobRepository._ensure_fts), тож відповідь не залежить від розміру
+таблиці так, як LIKE-сканування; без FTS5 у SQLite працює LIKE-запасний шлях.
+
+Оновлення бот отримує long polling'ом getUpdates в окремому потоці (SearchBot);
+зсув останнього обробленого оновлення зберігається в meta, тож після рестарту
+запити не обробляються повторно. У --once один короткий прохід за тік.
+"""
+import hashlib
+import html
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+import http_client
+import metrics
+from rate_limiter import limiter as telegram_limiter
+from storage import JobRepository, get_repo
+
+logger = logging.getLogger(__name__)
+
+SEARCH_PAGE_SIZE = int(os.getenv('SEARCH_PAGE_SIZE', '5'))
+POLL_TIMEOUT = 25        # seconds — long polling getUpdates
+MAX_TERMS = 8            # слова понад це відкидаємо: довгий запит однаково нічого не знайде
+OFFSET_META_KEY = 'search_update_offset'
+_CALLBACK_PREFIX = 'search:'
+_MAX_QUERIES = 1000      # скільки запитів пам'ятаємо для кнопок гортання
+
+_WORD_RE = re.compile(r"\w+")
+
+
+class SearchPage(NamedTuple):
+    query: str
+    page: int
+    results: list
+    has_more: bool
+
+
+def query_terms(text: str) -> list[str]:
+    return _WORD_RE.findall(text.lower())[:MAX_TERMS]
+
+
+def match_expression(terms: list[str]) -> str:
+    """Слова користувача -> FTS5-вираз: кожне в лапках (жодного синтаксису FTS з вводу) і як префікс."""
+    return " ".join(f'"{t}"*' for t in terms)
+
+
+def search(query: str, page: int = 1, per_page: int = SEARCH_PAGE_SIZE,
+           repo: Optional[JobRepository] = None) -> SearchPage:
+    repo = repo or get_repo()
+    terms = query_terms(query)
+    if not terms:
+        return SearchPage(query, page, [], False)
+    offset = (page - 1) * per_page
+    # беремо на один рядок більше — так знаємо, чи є наступна сторінка, без COUNT(*)
+    with metrics.timed('search', backend='fts' if repo.has_fts() else 'like'):
+        if repo.has_fts():
+            rows = repo.search_jobs(match_expression(terms), per_page + 1, offset)
+        else:
+            rows = repo.search_jobs_like(terms, per_page + 1, offset)
+    return SearchPage(query, page, rows[:per_page], len(rows) > per_page)
+
+
+def format_page(result: SearchPage, per_page: int = SEARCH_PAGE_SIZE) -> str:
+    query = html.escape(result.query)
+    if not result.results:
+        if result.page > 1:
+            return f"🔎 За запитом «{query}» більше нічого немає."
+        return f"🔎 За запитом «{query}» нічого не знайдено."
+    lines = [f"🔎 <b>{query}</b> — сторінка {result.page}", ""]
+    first = (result.page - 1) * per_page + 1
+    for i, job in enumerate(result.results, start=first):
+        title = html.escape(job['title'] or 'Без назви')
+        line = f"{i}. <a href=\"{html.escape(job['link'] or '', quote=True)}\">{title}</a>"
+        details = [html.escape(v) for v in (job['company'], job['salary']) if v]
+        if details:
+            line += " — " + ", ".join(details)
+        lines.append(line)
+    return "\n".join(lines)
+
+
+class SearchBot:
+    """Обробник /search: getUpdates -> пошук -> sendMessage / editMessageText."""
+
+    def __init__(self, api_url: str, per_page: int = SEARCH_PAGE_SIZE, poll_timeout: int = POLL_TIMEOUT,
+                 repo: Optional[JobRepository] = None):
+        self.api_url = api_url
+        self.per_page = per_page
+        self.poll_timeout = poll_timeout
+        self._repo = repo
+        self._queries = OrderedDict()   # короткий ключ -> текст запиту (callback_data обмежена 64 байтами)
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def repo(self) -> JobRepository:
+        return self._repo or get_repo()
+
+    def _call(self, method: str, **payload) -> dict:
+        resp = http_client.post(f"{self.api_url}/{method}", json=payload, timeout=15)
+        body = resp.json()
+        if not body.get('ok'):
+            logger.warning("search bot: %s failed: %s", method, body.get('description'))
+        return body
+
+    # --- кнопки гортання ---
+
+    def _remember(self, query: str) -> str:
+        key = hashlib.sha1(query.encode('utf-8')).hexdigest()[:12]
+        self._queries.pop(key, None)
+        self._queries[key] = query
+        while len(self._queries) > _MAX_QUERIES:
+            self._queries.popitem(last=False)
+        return key
+
+    def _keyboard(self, result: SearchPage) -> Optional[dict]:
+        key = self._remember(result.query)
+        buttons = []
+        if result.page > 1:
+            buttons.append({'text': '◀️', 'callback_data': f"{_CALLBACK_PREFIX}{key}:{result.page - 1}"})
+        if result.has_more:
+            buttons.append({'text': '▶️', 'callback_data': f"{_CALLBACK_PREFIX}{key}:{result.page + 1}"})
+        return {'inline_keyboard': [buttons]} if buttons else None
+
+    def _render(self, query: str, page: int) -> dict:
+        result = search(query, page, self.per_page, self.repo)
+        payload = {'text': format_page(result, self.per_page), 'parse_mode': 'HTML',
+                   'disable_web_page_preview': True}
+        keyboard = self._keyboard(result)
+        if keyboard:
+            payload['reply_markup'] = keyboard
+        return payload
+
+    # --- оновлення ---
+
+    def handle_update(self, update: dict):
+        if 'callback_query' in update:
+            self._handle_callback(update['callback_query'])
+            return
+        message = update.get('message') or {}
+        text = (message.get('text') or '').strip()
+        command, _, query = text.partition(' ')
+        # у групах команда приходить як /search@назва_бота
+        if command.split('@', 1)[0] != '/search':
+            return
+        chat_id = message['chat']['id']
+        query = query.strip()
+        if not query_terms(query):
+            payload = {'text': "Напишіть, що шукати: /search python junior"}
+        else:
+            payload = self._render(query, 1)
+        metrics.inc('search_requests_total', kind='command')
+        telegram_limiter.acquire(chat_id)
+        self._call('sendMessage', chat_id=chat_id, reply_to_message_id=message.get('message_id'), **payload)
+
+    def _handle_callback(self, callback: dict):
+        data = callback.get('data') or ''
+        if not data.startswith(_CALLBACK_PREFIX):
+            return
+        key, _, page = data[len(_CALLBACK_PREFIX):].partition(':')
+        query = self._queries.get(key)
+        message = callback.get('message')
+        if query is None or message is None or not page.isdigit():
+            # бот перезапускався — пам'ять запитів порожня
+            self._call('answerCallbackQuery', callback_query_id=callback['id'],
+                       text="Запит застарів, повторіть /search")
+            return
+        metrics.inc('search_requests_total', kind='page')
+        chat_id = message['chat']['id']
+        telegram_limiter.acquire(chat_id)
+        self._call('editMessageText', chat_id=chat_id, message_id=message['message_id'],
+                   **self._render(query, int(page)))
+        self._call('answerCallbackQuery', callback_query_id=callback['id'])
+
+    def poll_once(self, timeout: Optional[int] = None) -> int:
+        """Забрати й обробити нові оновлення. Повертає їх кількість."""
+        timeout = self.poll_timeout if timeout is None else timeout
+        offset = int(self.repo.get_meta(OFFSET_META_KEY) or 0)
+        resp = http_client.post(
+            f"{self.api_url}/getUpdates",
+            json={'offset': offset, 'timeout': timeout, 'allowed_updates': ['message', 'callback_query']},
+            # read-таймаут довший за long polling: Telegram тримає запит до timeout секунд
+            timeout=(5, timeout + 10)
+        )
+        body = resp.json()
+        if not body.get('ok'):
+            # 409 — для токена встановлено webhook або getUpdates читає інший процес
+            raise RuntimeError(f"getUpdates failed: {body.get('description')}")
+        updates = body['result']
+        for update in updates:
+            try:
+                self.handle_update(update)
+            except Exception:
+                logger.exception("search bot: update %s failed:", update.get('update_id'))
+            # зсув зберігаємо і після помилки: одне «отруйне» оновлення не має блокувати решту
+            self.repo.set_meta(OFFSET_META_KEY, str(update['update_id'] + 1))
+        return len(updates)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+            except Exception:
+                logger.exception("search bot: getUpdates error:")
+                self._stop.wait(5)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="search-bot", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
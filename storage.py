@@ -0,0 +1,683 @@
+"""
+Спільний шар доступу до SQLite.
+
+JobRepository тримає одне довгоживуче з'єднання на потік (threading.local),
+вмикає WAL і кешує підготовлені запити (cached_statements), тож цикл
+не платить за connect/close на кожну операцію.
+"""
+import os
+import sqlite3
+import threading
+import weakref
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator, Optional
+
+DB_PATH = os.getenv('JOBS_DB_PATH', 'jobs.db')
+
+# категорія work.ua, з якої бот збирав вакансії до появи кількох джерел
+DEFAULT_SOURCE = 'jobs-junior/'
+
+# SQLite за замовчуванням обмежує кількість параметрів у запиті — ріжемо IN (...) на шматки
+_IN_CHUNK = 500
+
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",   # у WAL безпечно: fsync лише на checkpoint
+    "PRAGMA cache_size=-8000",     # ~8 MB page cache на з'єднання
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+)
+
+
+def _source_filter(sources: Optional[Iterable[str]]) -> tuple[str, list]:
+    """' AND source IN (...)' і параметри для категорій каналів; None чи порожньо — без фільтра."""
+    sources = sorted(set(sources)) if sources else []
+    if not sources:
+        return "", []
+    return f" AND source IN ({','.join('?' * len(sources))})", sources
+
+
+class _Connection(sqlite3.Connection):
+    """Звичайне з'єднання; підклас лише для weakref — репозиторій рахує зміни своїх з'єднань."""
+
+
+class JobRepository:
+    def __init__(self, path: str = DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._conns = weakref.WeakSet()   # з'єднання всіх потоків цього процесу (для local_changes)
+        self._closed_changes = 0
+        self._conns_lock = threading.Lock()
+        self._watcher = None              # окреме з'єднання лише для PRAGMA data_version
+        self._listeners = []
+        self._fts = None   # чи є jobs_fts; визначається в init_schema або при першому пошуку
+
+    # --- з'єднання і транзакції ---
+
+    def conn(self) -> sqlite3.Connection:
+        """З'єднання поточного потоку (створюється при першому зверненні)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # isolation_level=None — autocommit; транзакції відкриваємо явно через transaction()
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, cached_statements=256,
+                                   factory=_Connection)
+            conn.row_factory = sqlite3.Row
+            for pragma in _PRAGMAS:
+                conn.execute(pragma)
+            self._local.conn = conn
+            with self._conns_lock:
+                self._conns.add(conn)
+        return conn
+
+    def close(self):
+        """Закрити з'єднання поточного потоку."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            with self._conns_lock:
+                self._closed_changes += conn.total_changes
+                self._conns.discard(conn)
+            conn.close()
+            self._local.conn = None
+
+    @contextmanager
+    def transaction(self, immediate: bool = False) -> Iterator[sqlite3.Connection]:
+        conn = self.conn()
+        conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    # --- підписники на зміни черги (job_queue.UnpostedQueue) ---
+
+    def add_listener(self, fn):
+        """
+        fn(event, payload): ('inserted', [(id, inserted_at, source), ...]) — вакансія стала в чергу
+        (нова або дублікат, повернутий після видалення оригіналу), ('removed', [id, ...]) —
+        вакансія вийшла з черги (опублікована, дублікат або видалена), ('deleted', [id, ...]),
+        коли рядок справді видалено з jobs, і ('promoted', [id, ...]) — дублікат став оригіналом.
+        """
+        self._listeners.append(fn)
+
+    def _notify(self, event: str, payload: list):
+        if not payload:
+            return
+        for fn in self._listeners:
+            fn(event, payload)
+
+    # --- схема ---
+
+    def init_schema(self):
+        with self.transaction() as conn:
+            # створюємо таблицю, якщо нема (підлаштуй поля під вашу схему)
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY,
+                title TEXT,
+                company TEXT,
+                link TEXT,
+                salary TEXT,
+                summary TEXT DEFAULT '',
+                inserted_at TEXT,
+                posted_on_telegram INTEGER DEFAULT 0
+            )
+            """)
+            # створюємо унікальний індекс по link (якщо в БД вже нема дублів)
+            conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_link ON jobs(link)")
+            # холодний старт черги: лише неопубліковані, одразу у порядку FIFO
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_jobs_unposted ON jobs(posted_on_telegram, inserted_at) "
+                "WHERE posted_on_telegram = 0"
+            )
+            # пошук прострочених рядків для retention.py без повного сканування
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_inserted ON jobs(inserted_at)")
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+            """)
+            # результат фонової перевірки актуальності (liveness.py)
+            self._ensure_column(conn, 'jobs', 'active', "INTEGER")
+            self._ensure_column(conn, 'jobs', 'checked_at', "TEXT")
+            self._ensure_column(conn, 'jobs', 'check_reason', "TEXT")
+            # дата публікації з картки на сторінці списку
+            self._ensure_column(conn, 'jobs', 'posted_at', "TEXT DEFAULT ''")
+            # оцінка вхідних токенів опису до/після desc_compactor
+            self._ensure_column(conn, 'jobs', 'desc_tokens_before', "INTEGER")
+            self._ensure_column(conn, 'jobs', 'desc_tokens_after', "INTEGER")
+            # майже-дублікати (dedup.py): MinHash-сигнатура опису і посилання на оригінал.
+            # Дублікат отримує posted_on_telegram = 2 — так він випадає з усіх черг без зміни запитів
+            self._ensure_column(conn, 'jobs', 'desc_sig', "BLOB")
+            self._ensure_column(conn, 'jobs', 'duplicate_of', "INTEGER")
+            # категорія work.ua, з якої прийшла вакансія; старі рядки отримують DEFAULT_SOURCE
+            self._ensure_column(conn, 'jobs', 'source', f"TEXT DEFAULT '{DEFAULT_SOURCE}'")
+            # канали Telegram: які категорії в них постяться і власний кулдаун
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS channels (
+                chat_id TEXT PRIMARY KEY,
+                sources TEXT NOT NULL,
+                cooldown_seconds INTEGER NOT NULL,
+                last_post_time TEXT
+            )
+            """)
+            # кеш summary за хешем нормалізованого опису (summary_cache.py)
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS summary_cache (
+                key TEXT PRIMARY KEY,
+                summary TEXT NOT NULL,
+                created_at TEXT,
+                last_used_at TEXT,
+                hits INTEGER DEFAULT 0
+            )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_summary_cache_used ON summary_cache(last_used_at)")
+            # пул заздалегідь згенерованих порад (tips_pool.py); posted_at — коли порада пішла в канал
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS tips (
+                id INTEGER PRIMARY KEY,
+                text TEXT NOT NULL,
+                signature BLOB,
+                created_at TEXT,
+                posted_at TEXT
+            )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_tips_pending ON tips(posted_at, id) WHERE posted_at IS NULL")
+            # знімки метрик (metrics.MetricsWriter, якщо METRICS_TABLE=1)
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS metrics (
+                ts TEXT NOT NULL,
+                name TEXT NOT NULL,
+                labels TEXT DEFAULT '',
+                value REAL
+            )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_metrics_ts ON metrics(ts)")
+            # повнотекстовий пошук для /search (search.py)
+            self._fts = self._ensure_fts(conn)
+
+    def _ensure_fts(self, conn: sqlite3.Connection) -> bool:
+        """
+        FTS5-індекс jobs_fts(title, company, summary) із зовнішнім вмістом: текст лежить лише в jobs,
+        а зміни й видалення індексують тригери — тож save_job_summary, mark_duplicate, видалення
+        і retention тримають його актуальним без змін у них; нові рядки індексує insert_jobs. Дублікати
+        (posted_on_telegram = 2) в індекс не потрапляють. Повертає False, якщо SQLite зібраний без FTS5.
+        """
+        exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'jobs_fts'").fetchone()
+        if not exists:
+            try:
+                # unicode61 без діакритики: регістр і наголоси не важать; prefix — швидкі запити «pyth*»
+                conn.execute(
+                    "CREATE VIRTUAL TABLE jobs_fts USING fts5(title, company, summary, content='jobs', "
+                    "content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+                )
+            except sqlite3.OperationalError:
+                return False
+        # вставку індексує сам insert_jobs одним INSERT ... SELECT: тригер на кожен рядок
+        # коштував ~25 мкс і в кілька разів сповільнював масовий запис
+        conn.execute("DROP TRIGGER IF EXISTS jobs_fts_ai")
+        conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS jobs_fts_ad AFTER DELETE ON jobs WHEN old.posted_on_telegram IS NOT 2 BEGIN
+            INSERT INTO jobs_fts (jobs_fts, rowid, title, company, summary)
+            VALUES ('delete', old.id, old.title, old.company, old.summary);
+        END
+        """)
+        # mark_jobs_posted (0 -> 1) індекс не чіпає: переіндексуємо лише зміну тексту або статусу дубліката
+        conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS jobs_fts_au AFTER UPDATE OF title, company, summary, posted_on_telegram ON jobs
+        WHEN old.title IS NOT new.title OR old.company IS NOT new.company OR old.summary IS NOT new.summary
+            OR (old.posted_on_telegram IS 2) != (new.posted_on_telegram IS 2)
+        BEGIN
+            INSERT INTO jobs_fts (jobs_fts, rowid, title, company, summary)
+            SELECT 'delete', old.id, old.title, old.company, old.summary WHERE old.posted_on_telegram IS NOT 2;
+            INSERT INTO jobs_fts (rowid, title, company, summary)
+            SELECT new.id, new.title, new.company, new.summary WHERE new.posted_on_telegram IS NOT 2;
+        END
+        """)
+        if not exists:
+            # база з часів до пошуку: індексуємо вже збережені вакансії один раз
+            conn.execute(
+                "INSERT INTO jobs_fts (rowid, title, company, summary) "
+                "SELECT id, title, company, summary FROM jobs WHERE posted_on_telegram IS NOT 2"
+            )
+        return True
+
+    def _ensure_column(self, conn: sqlite3.Connection, table: str, col: str, definition: str):
+        cols = [r[1] for r in conn.execute(f"PRAGMA table_info({table})")]
+        if col not in cols:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {col} {definition}")
+
+    # --- meta ---
+
+    def get_meta(self, key: str) -> Optional[str]:
+        row = self.conn().execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row['value'] if row else None
+
+    def set_meta(self, key: str, value: str):
+        self.conn().execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+
+    # --- jobs ---
+
+    def known_links(self, links: Iterable[str]) -> set[str]:
+        links = list(links)
+        known = set()
+        conn = self.conn()
+        for i in range(0, len(links), _IN_CHUNK):
+            chunk = links[i:i + _IN_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            cur = conn.execute(f"SELECT link FROM jobs WHERE link IN ({placeholders})", chunk)
+            known.update(r[0] for r in cur)
+        return known
+
+    def insert_jobs(self, items: Iterable[dict]) -> list[str]:
+        """
+        Записати пачку вакансій {link, title, company, salary, posted_at, source} однією транзакцією.
+        Необов'язкові ключі від dedup.DuplicateDetector.annotate: duplicate_of (id оригіналу)
+        або duplicate_of_link (оригінал з цієї ж пачки) — такі рядки одразу позначаються дублікатами.
+        Повертає лише ті посилання, які справді були вставлені (нові) і не є дублікатами.
+        """
+        now = datetime.utcnow().isoformat()
+        rows = [
+            (job.get('title', ''), job.get('company', ''), job['link'], job.get('salary', ''),
+             "", now, job.get('posted_at', ''), job.get('source') or DEFAULT_SOURCE,
+             2 if job.get('duplicate_of') or job.get('duplicate_of_link') else 0,
+             job.get('duplicate_of'), job.get('duplicate_of_link'))
+            for job in items
+        ]
+        if not rows:
+            return []
+        # IMMEDIATE — одразу беремо write-lock, щоб ніхто не вставив рядки між MAX(id) та INSERT
+        with self.transaction(immediate=True) as conn:
+            before = conn.execute("SELECT COALESCE(MAX(id), 0) FROM jobs").fetchone()[0]
+            # оригінал з тієї ж пачки вставлено раніше в executemany — підзапит його вже бачить
+            conn.executemany(
+                "INSERT OR IGNORE INTO jobs (title, company, link, salary, summary, inserted_at, posted_at, source, "
+                "posted_on_telegram, duplicate_of) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, COALESCE(?, (SELECT id FROM jobs WHERE link = ?)))",
+                rows
+            )
+            if self.has_fts():
+                self._index_inserted(conn, before)
+            # нові рядки отримують id > MAX(id) на момент початку транзакції
+            new = conn.execute(
+                "SELECT id, link, inserted_at, source FROM jobs WHERE id > ? AND posted_on_telegram = 0 ORDER BY id",
+                (before,)
+            ).fetchall()
+        self._notify('inserted', [(r['id'], r['inserted_at'], r['source']) for r in new])
+        return [r['link'] for r in new]
+
+    def get_unposted_jobs(self) -> list[dict]:
+        cur = self.conn().execute('SELECT * FROM jobs WHERE posted_on_telegram = 0 ORDER BY inserted_at ASC')
+        return [dict(r) for r in cur.fetchall()]
+
+    def peek_unposted(self, limit: int, sources: Optional[Iterable[str]] = None) -> list[dict]:
+        """
+        Голова черги без важких колонок: id, link, inserted_at і чи є summary.
+        sources — категорії, які обслуговують канали (як у UnpostedQueue); None — усі.
+        """
+        where, params = _source_filter(sources)
+        cur = self.conn().execute(
+            "SELECT id, link, inserted_at, COALESCE(summary, '') != '' AS has_summary "
+            f"FROM jobs WHERE posted_on_telegram = 0{where} ORDER BY inserted_at ASC LIMIT ?",
+            (*params, limit)
+        )
+        return [dict(r) for r in cur.fetchall()]
+
+    def jobs_without_summary(self, limit: int) -> list[dict]:
+        cur = self.conn().execute(
+            "SELECT id, link FROM jobs WHERE posted_on_telegram = 0 AND COALESCE(summary, '') = '' "
+            "ORDER BY inserted_at ASC LIMIT ?",
+            (limit,)
+        )
+        return [dict(r) for r in cur.fetchall()]
+
+    def mark_jobs_posted(self, job_ids: Iterable[int]):
+        params = [(jid,) for jid in job_ids]
+        if not params:
+            return
+        with self.transaction() as conn:
+            conn.executemany('UPDATE jobs SET posted_on_telegram = 1 WHERE id = ?', params)
+        self._notify('removed', [p[0] for p in params])
+
+    def save_job_summary(self, job_id: int, summary: str):
+        self.conn().execute('UPDATE jobs SET summary = ? WHERE id = ?', (summary, job_id))
+
+    def save_desc_tokens(self, job_id: int, before: int, after: int):
+        self.conn().execute(
+            'UPDATE jobs SET desc_tokens_before = ?, desc_tokens_after = ? WHERE id = ?', (before, after, job_id)
+        )
+
+    def desc_token_stats(self) -> dict:
+        """Сумарно по вакансіях, де опис стискали: скільки токенів було і скільки пішло в LLM."""
+        row = self.conn().execute(
+            'SELECT COUNT(*), COALESCE(SUM(desc_tokens_before), 0), COALESCE(SUM(desc_tokens_after), 0) '
+            'FROM jobs WHERE desc_tokens_before IS NOT NULL'
+        ).fetchone()
+        jobs, before, after = row[0], row[1], row[2]
+        return {'jobs': jobs, 'tokens_before': before, 'tokens_after': after,
+                'saved_ratio': round(1 - after / before, 3) if before else 0.0}
+
+    def jobs_to_check(self, limit: int, ttl_seconds: float, sources: Optional[Iterable[str]] = None) -> list[dict]:
+        """
+        Перші `limit` неопублікованих вакансій (FIFO), у яких перевірка відсутня або старша за TTL.
+        sources — як у peek_unposted: вакансії категорій без каналу не перевіряємо.
+        """
+        cutoff_iso = (datetime.utcnow() - timedelta(seconds=ttl_seconds)).isoformat()
+        where, params = _source_filter(sources)
+        cur = self.conn().execute(
+            'SELECT id, link FROM jobs WHERE posted_on_telegram = 0 AND (checked_at IS NULL OR checked_at < ?)'
+            f'{where} ORDER BY inserted_at ASC LIMIT ?',
+            (cutoff_iso, *params, limit)
+        )
+        return [dict(r) for r in cur.fetchall()]
+
+    def save_check_result(self, job_id: int, active: bool, reason: str):
+        self.conn().execute(
+            'UPDATE jobs SET active = ?, check_reason = ?, checked_at = ? WHERE id = ?',
+            (1 if active else 0, reason, datetime.utcnow().isoformat(), job_id)
+        )
+
+    def delete_job(self, job_id: int):
+        self.delete_jobs([job_id])
+
+    def delete_old_jobs(self, days: int = 30) -> int:
+        cutoff_iso = (datetime.utcnow() - timedelta(days=days)).isoformat()
+        ids = [r[0] for r in self.conn().execute('SELECT id FROM jobs WHERE inserted_at < ?', (cutoff_iso,))]
+        return self.delete_jobs(ids)
+
+    # --- зберігання (retention.py) ---
+
+    def expired_jobs(self, cutoff_iso: str, limit: int) -> list[dict]:
+        """Найстаріші limit рядків, вставлених до cutoff_iso (без MinHash-сигнатур — їх не архівуємо)."""
+        cur = self.conn().execute(
+            "SELECT id, title, company, link, salary, summary, inserted_at, posted_at, posted_on_telegram, source, "
+            "active, checked_at, check_reason, duplicate_of, desc_tokens_before, desc_tokens_after "
+            "FROM jobs WHERE inserted_at < ? ORDER BY inserted_at LIMIT ?",
+            (cutoff_iso, limit)
+        )
+        return [dict(r) for r in cur]
+
+    def delete_jobs(self, job_ids: list[int]) -> int:
+        if not job_ids:
+            return 0
+        with self.transaction() as conn:
+            promoted = self._promote_duplicates(conn, job_ids)
+            for i in range(0, len(job_ids), _IN_CHUNK):
+                chunk = job_ids[i:i + _IN_CHUNK]
+                conn.execute(f"DELETE FROM jobs WHERE id IN ({','.join('?' * len(chunk))})", chunk)
+        self._notify('removed', job_ids)
+        self._notify('deleted', job_ids)
+        self._notify('promoted', [p[0] for p in promoted])
+        self._notify('inserted', [p[:3] for p in promoted if p[3] == 0])
+        return len(job_ids)
+
+    def _promote_duplicates(self, conn: sqlite3.Connection, job_ids: list[int]) -> list[tuple]:
+        """
+        Перед видаленням оригіналів: їхній найстаріший дублікат, що лишається в БД, стає оригіналом
+        і успадковує стан (0 — знову в черзі, з повторною перевіркою актуальності; 1 — уже опубліковано),
+        решта дублікатів переводиться на нього. Так перевиставлена вакансія не губиться, коли
+        закривається старе посилання. Повертає [(id, inserted_at, source, posted_on_telegram)] підвищених.
+        """
+        deleting = set(job_ids)
+        originals, duplicates = {}, {}
+        for i in range(0, len(job_ids), _IN_CHUNK):
+            chunk = job_ids[i:i + _IN_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            for r in conn.execute(f"SELECT id, posted_on_telegram, duplicate_of FROM jobs WHERE id IN ({placeholders})",
+                                  chunk):
+                originals[r['id']] = r
+            cur = conn.execute(
+                "SELECT id, duplicate_of, inserted_at, source FROM jobs "
+                f"WHERE posted_on_telegram = 2 AND duplicate_of IN ({placeholders}) ORDER BY id",
+                chunk
+            )
+            for r in cur:
+                if r['id'] not in deleting:
+                    duplicates.setdefault(r['duplicate_of'], []).append(r)
+        promoted = []
+        for original_id, rows in duplicates.items():
+            original = originals[original_id]
+            if original['posted_on_telegram'] == 2:
+                # видаляється сам дублікат — його дублікати переходять до його оригіналу
+                conn.execute("UPDATE jobs SET duplicate_of = ? WHERE duplicate_of = ? AND posted_on_telegram = 2",
+                             (original['duplicate_of'], original_id))
+                continue
+            head = rows[0]
+            state = original['posted_on_telegram'] or 0
+            conn.execute(
+                "UPDATE jobs SET posted_on_telegram = ?, duplicate_of = NULL, checked_at = NULL WHERE id = ?",
+                (state, head['id'])
+            )
+            conn.execute("UPDATE jobs SET duplicate_of = ? WHERE duplicate_of = ? AND posted_on_telegram = 2",
+                         (head['id'], original_id))
+            promoted.append((head['id'], head['inserted_at'], head['source'], state))
+        return promoted
+
+    def enable_incremental_vacuum(self) -> bool:
+        """
+        Перевести файл у auto_vacuum=INCREMENTAL. Для вже наявної БД це потребує
+        одного повного VACUUM — повертає True, якщо його довелося зробити.
+        """
+        conn = self.conn()
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+            return False
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("VACUUM")
+        return True
+
+    def incremental_vacuum(self, pages: int = 0) -> int:
+        """Повернути ОС вільні сторінки (0 — усі) і обрізати WAL. Повертає кількість звільнених сторінок."""
+        conn = self.conn()
+        before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        # прагма звільняє по сторінці на кожен крок, а execute() для запиту без колонок робить лише один —
+        # executescript проганяє її до кінця
+        conn.executescript(f"PRAGMA incremental_vacuum({int(pages)});")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+        return before - conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+    def db_size(self) -> int:
+        """Розмір основного файлу БД у байтах (page_count * page_size)."""
+        conn = self.conn()
+        return conn.execute("PRAGMA page_count").fetchone()[0] * conn.execute("PRAGMA page_size").fetchone()[0]
+
+    def get_jobs(self, job_ids: list[int]) -> dict[int, dict]:
+        """Повні рядки за id (лінива підвантажка деталей для черги)."""
+        out = {}
+        conn = self.conn()
+        for i in range(0, len(job_ids), _IN_CHUNK):
+            chunk = job_ids[i:i + _IN_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            for r in conn.execute(f"SELECT * FROM jobs WHERE id IN ({placeholders})", chunk):
+                out[r['id']] = dict(r)
+        return out
+
+    # --- майже-дублікати (dedup.py) ---
+
+    def dedup_rows(self, job_ids: Optional[list[int]] = None) -> list[dict]:
+        """Оригінали (не дублікати) з карткою і сигнатурою опису: усі або лише job_ids."""
+        sql = "SELECT id, link, title, company, desc_sig FROM jobs WHERE posted_on_telegram != 2"
+        if job_ids is None:
+            return [dict(r) for r in self.conn().execute(sql)]
+        out = []
+        for i in range(0, len(job_ids), _IN_CHUNK):
+            chunk = job_ids[i:i + _IN_CHUNK]
+            cur = self.conn().execute(sql + f" AND id IN ({','.join('?' * len(chunk))})", chunk)
+            out.extend(dict(r) for r in cur)
+        return out
+
+    def save_desc_sig(self, job_id: int, sig: bytes):
+        self.conn().execute("UPDATE jobs SET desc_sig = ? WHERE id = ?", (sig, job_id))
+
+    def mark_duplicate(self, job_id: int, original_id: int):
+        """Зняти вакансію з черги як дублікат original_id (posted_on_telegram = 2)."""
+        self.conn().execute(
+            "UPDATE jobs SET posted_on_telegram = 2, duplicate_of = ? WHERE id = ? AND posted_on_telegram = 0",
+            (original_id, job_id)
+        )
+        self._notify('removed', [job_id])
+
+    # --- пошук (search.py) ---
+
+    def has_fts(self) -> bool:
+        if self._fts is None:
+            row = self.conn().execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'jobs_fts'").fetchone()
+            self._fts = row is not None
+        return self._fts
+
+    def search_jobs(self, match: str, limit: int, offset: int = 0) -> list[dict]:
+        """
+        Вакансії за FTS5-виразом match, найрелевантніші першими: bm25 з вагами
+        назва > компанія > summary, за рівної оцінки — новіші.
+        """
+        # сторінку ранжуємо в самому індексі, а до jobs ідемо лише за її рядками:
+        # JOIN до сортування коштував би пошуку в jobs на кожен збіг
+        cur = self.conn().execute(
+            "SELECT j.id, j.title, j.company, j.salary, j.link, j.inserted_at FROM ("
+            "  SELECT rowid, bm25(jobs_fts, 10.0, 5.0, 1.0) AS score FROM jobs_fts WHERE jobs_fts MATCH ? "
+            "  ORDER BY score, rowid DESC LIMIT ? OFFSET ?"
+            ") f JOIN jobs j ON j.id = f.rowid ORDER BY f.score, f.rowid DESC",
+            (match, limit, offset)
+        )
+        return [dict(r) for r in cur.fetchall()]
+
+    @staticmethod
+    def _index_inserted(conn: sqlite3.Connection, after_id: int):
+        """Додати в jobs_fts рядки з id > after_id (крім дублікатів) — у транзакції вставки."""
+        conn.execute(
+            "INSERT INTO jobs_fts (rowid, title, company, summary) "
+            "SELECT id, title, company, summary FROM jobs WHERE id > ? AND posted_on_telegram IS NOT 2",
+            (after_id,)
+        )
+
+    def optimize_search_index(self):
+        """Злити сегменти jobs_fts в один (після масового видалення в retention)."""
+        if self.has_fts():
+            self.conn().execute("INSERT INTO jobs_fts (jobs_fts) VALUES ('optimize')")
+
+    def search_jobs_like(self, terms: list[str], limit: int, offset: int = 0) -> list[dict]:
+        """Те саме через LIKE (повне сканування, без ранжування) — для SQLite без FTS5 і для бенчмарку."""
+        where, params = ["posted_on_telegram != 2"], []
+        for term in terms:
+            where.append("(title LIKE ? OR company LIKE ? OR summary LIKE ?)")
+            params.extend([f"%{term}%"] * 3)
+        cur = self.conn().execute(
+            "SELECT id, title, company, salary, link, inserted_at FROM jobs "
+            f"WHERE {' AND '.join(where)} ORDER BY id DESC LIMIT ? OFFSET ?",
+            params + [limit, offset]
+        )
+        return [dict(r) for r in cur.fetchall()]
+
+    # --- канали ---
+
+    def upsert_channel(self, chat_id: str, sources: list[str], cooldown_seconds: int):
+        """Записати налаштування каналу з конфігу; last_post_time існуючого рядка не чіпаємо."""
+        self.conn().execute(
+            "INSERT INTO channels (chat_id, sources, cooldown_seconds) VALUES (?, ?, ?) "
+            "ON CONFLICT(chat_id) DO UPDATE SET sources = excluded.sources, cooldown_seconds = excluded.cooldown_seconds",
+            (chat_id, ",".join(sources), int(cooldown_seconds))
+        )
+
+    def get_channel(self, chat_id: str) -> Optional[dict]:
+        row = self.conn().execute("SELECT * FROM channels WHERE chat_id = ?", (chat_id,)).fetchone()
+        if row is None:
+            return None
+        channel = dict(row)
+        channel['sources'] = [s for s in channel['sources'].split(",") if s]
+        return channel
+
+    def set_channel_last_post(self, chat_id: str, when_iso: str):
+        self.conn().execute("UPDATE channels SET last_post_time = ? WHERE chat_id = ?", (when_iso, chat_id))
+
+    # --- пул порад ---
+
+    def add_tips(self, rows: list[tuple[str, bytes]], posted: bool = False) -> list[int]:
+        """Додати поради (text, signature); posted=True — одразу як уже опубліковані (історія)."""
+        now = datetime.utcnow().isoformat()
+        ids = []
+        with self.transaction() as conn:
+            for text, signature in rows:
+                cur = conn.execute(
+                    "INSERT INTO tips (text, signature, created_at, posted_at) VALUES (?, ?, ?, ?)",
+                    (text, signature, now, now if posted else None)
+                )
+                ids.append(cur.lastrowid)
+        return ids
+
+    def pending_tips(self, limit: int) -> list[dict]:
+        cur = self.conn().execute(
+            "SELECT id, text FROM tips WHERE posted_at IS NULL ORDER BY id LIMIT ?", (limit,)
+        )
+        return [dict(r) for r in cur.fetchall()]
+
+    def count_pending_tips(self) -> int:
+        return self.conn().execute("SELECT COUNT(*) FROM tips WHERE posted_at IS NULL").fetchone()[0]
+
+    def mark_tips_posted(self, tip_ids: Iterable[int]):
+        now = datetime.utcnow().isoformat()
+        with self.transaction() as conn:
+            conn.executemany("UPDATE tips SET posted_at = ? WHERE id = ?", [(now, tid) for tid in tip_ids])
+
+    def tip_signatures(self) -> list[tuple[int, bytes]]:
+        cur = self.conn().execute("SELECT id, signature FROM tips WHERE signature IS NOT NULL")
+        return [(r[0], r[1]) for r in cur.fetchall()]
+
+    # --- метрики ---
+
+    def write_metrics(self, ts: str, rows: list[tuple[str, str, float]], keep_after: Optional[str] = None):
+        """Записати знімок (name, labels, value) з міткою ts; keep_after — прибрати старіші записи."""
+        with self.transaction() as conn:
+            conn.executemany("INSERT INTO metrics (ts, name, labels, value) VALUES (?, ?, ?, ?)",
+                             [(ts, name, labels, value) for name, labels, value in rows])
+            if keep_after:
+                conn.execute("DELETE FROM metrics WHERE ts < ?", (keep_after,))
+
+    def data_version(self) -> int:
+        """
+        PRAGMA data_version окремого з'єднання, яке нічого не пише: змінюється після кожного коміту
+        будь-якого іншого з'єднання — і цього процесу, і чужих (див. local_changes).
+        Одне з'єднання на всі потоки, тож значення можна порівнювати незалежно від потоку.
+        """
+        with self._conns_lock:
+            if self._watcher is None:
+                self._watcher = sqlite3.connect(self.path, timeout=30, isolation_level=None,
+                                                check_same_thread=False)
+            return self._watcher.execute("PRAGMA data_version").fetchone()[0]
+
+    def local_changes(self) -> int:
+        """
+        Скільки рядків змінили з'єднання цього процесу (усі потоки). Якщо data_version змінилась,
+        а це число ні — базу змінив інший процес.
+        """
+        with self._conns_lock:
+            total = self._closed_changes
+            for conn in list(self._conns):
+                try:
+                    total += conn.total_changes
+                except sqlite3.ProgrammingError:
+                    pass   # з'єднання закрили в обхід close()
+        return total
+
+
+_repo: Optional[JobRepository] = None
+_repo_lock = threading.Lock()
+
+
+def get_repo() -> JobRepository:
+    """Спільний репозиторій процесу для DB_PATH."""
+    global _repo
+    with _repo_lock:
+        if _repo is None:
+            _repo = JobRepository(DB_PATH)
+        return _repo
+
+
+def use_database(path: str) -> JobRepository:
+    """Перемкнути спільний репозиторій на інший файл (бенчмарки, локальні прогони)."""
+    global _repo, DB_PATH
+    with _repo_lock:
+        DB_PATH = path
+        _repo = JobRepository(path)
+        return _repo
@@ -0,0 +1,92 @@
+"""
+Кеш summary, адресований вмістом.
+
+work.ua часто перевидає той самий текст вакансії під новим URL. Ключ кешу —
+sha256 від нормалізованого опису + моделі + версії промпту, тож однаковий
+текст не йде в OpenAI вдруге. Записи витісняються за віком і кількістю.
+"""
+import hashlib
+import re
+import threading
+from datetime import datetime, timedelta
+from typing import Optional
+
+from storage import JobRepository, get_repo
+
+MAX_ENTRIES = 5000
+MAX_AGE_DAYS = 90
+
+_WS_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    return _WS_RE.sub(" ", text).strip().lower()
+
+
+def make_key(text: str, model: str, prompt_version: str) -> str:
+    payload = f"{model}\n{prompt_version}\n{normalize_text(text)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SummaryCache:
+    def __init__(self, max_entries: int = MAX_ENTRIES, max_age_days: int = MAX_AGE_DAYS,
+                 repo: JobRepository | None = None):
+        self.max_entries = max_entries
+        self.max_age_days = max_age_days
+        self._repo = repo
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def repo(self) -> JobRepository:
+        return self._repo or get_repo()
+
+    def get(self, key: str) -> Optional[str]:
+        conn = self.repo.conn()
+        row = conn.execute('SELECT summary FROM summary_cache WHERE key = ?', (key,)).fetchone()
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        conn.execute(
+            'UPDATE summary_cache SET hits = hits + 1, last_used_at = ? WHERE key = ?',
+            (datetime.utcnow().isoformat(), key)
+        )
+        return row['summary']
+
+    def put(self, key: str, summary: str):
+        if not summary:
+            return
+        now = datetime.utcnow().isoformat()
+        with self.repo.transaction() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO summary_cache (key, summary, created_at, last_used_at, hits) VALUES (?, ?, ?, ?, 0)',
+                (key, summary, now, now)
+            )
+            self._evict(conn)
+
+    def _evict(self, conn):
+        cutoff_iso = (datetime.utcnow() - timedelta(days=self.max_age_days)).isoformat()
+        conn.execute('DELETE FROM summary_cache WHERE last_used_at < ?', (cutoff_iso,))
+        conn.execute(
+            'DELETE FROM summary_cache WHERE key IN '
+            '(SELECT key FROM summary_cache ORDER BY last_used_at DESC LIMIT -1 OFFSET ?)',
+            (self.max_entries,)
+        )
+
+    def stats(self) -> dict:
+        row = self.repo.conn().execute('SELECT COUNT(*), COALESCE(SUM(hits), 0) FROM summary_cache').fetchone()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'entries': row[0],
+                'hits_total': row[1],
+            }
+
+
+cache = SummaryCache()
@@ -0,0 +1,136 @@
+"""
+Стадія заздалегідь підготовлених описів.
+
+SummaryPipeline у фоні заповнює jobs.summary для наступних K вакансій черги,
+тож у слот постингу лишається тільки format_for_telegram + відправка.
+Черга обмежена (queue.Queue(maxsize)), а планувальник не бере вакансії, які
+не встигнуть дійти до публікації раніше, ніж їх прибере retention.py.
+"""
+import logging
+import queue
+import threading
+from datetime import datetime, timedelta
+
+import metrics
+from dedup import DuplicateVacancy, get_detector
+from desc_parser import get_vacancy_description
+from OpenAI_agent import summarize_description
+from storage import JobRepository, get_repo
+
+logger = logging.getLogger(__name__)
+
+NO_DESCRIPTION = "Опис вакансії недоступний."
+
+
+def load_description(link: str, job_id: int | None = None) -> str:
+    """
+    Опис вакансії для LLM. Якщо він майже повторює опис іншої вакансії — DuplicateVacancy
+    (вакансію вже знято з черги). Спільне для build_summary, openai_batch і openai_async.
+    """
+    desc = get_vacancy_description(link)
+    if desc and job_id is not None:
+        match = get_detector().check_description(job_id, desc)
+        if match is not None:
+            raise DuplicateVacancy(job_id, *match)
+    return desc
+
+
+@metrics.timed('summary')
+def build_summary(link: str, job_id: int | None = None) -> str:
+    """
+    Опис вакансії → короткий summary. Винятки сервісів прокидаються далі.
+    Якщо опис майже повторює опис іншої вакансії — DuplicateVacancy ще до виклику LLM.
+    """
+    desc = load_description(link, job_id)
+    if not desc:
+        return NO_DESCRIPTION
+    return summarize_description(desc, job_id=job_id)
+
+
+class SummaryPipeline:
+    def __init__(self, ahead: int = 5, posts_per_day: float = 10, retention_days: int = 30,
+                 workers: int = 1, interval: float = 60, sources: list[str] | None = None,
+                 repo: JobRepository | None = None):
+        # більше, ніж встигнемо опублікувати за час зберігання, готувати немає сенсу
+        self.ahead = max(0, min(ahead, int(posts_per_day * retention_days)))
+        self.posts_per_day = posts_per_day
+        self.retention_days = retention_days
+        self.workers = workers
+        self.interval = interval
+        # категорії каналів: голова глобальної черги може складатись із вакансій, яких ніхто не опублікує
+        self.sources = list(sources) if sources else None
+        self.repo = repo or get_repo()
+        self._queue = queue.Queue(maxsize=max(1, self.ahead))
+        self._in_flight = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def plan(self) -> list[dict]:
+        """Вакансії з голови черги без summary, які встигнуть вийти до видалення."""
+        now = datetime.utcnow()
+        planned = []
+        for position, job in enumerate(self.repo.peek_unposted(self.ahead, self.sources)):
+            if job['has_summary'] or not job['link']:
+                continue
+            try:
+                expires = datetime.fromisoformat(job['inserted_at']) + timedelta(days=self.retention_days)
+            except (TypeError, ValueError):
+                continue
+            # при posts_per_day публікацій на добу вакансія на позиції N вийде приблизно за N / posts_per_day діб
+            eta = now + timedelta(days=position / self.posts_per_day) if self.posts_per_day else None
+            if eta is None or eta >= expires:
+                continue
+            planned.append(job)
+        return planned
+
+    def _produce(self):
+        while not self._stop.is_set():
+            try:
+                for job in self.plan():
+                    with self._lock:
+                        if job['id'] in self._in_flight:
+                            continue
+                        self._in_flight.add(job['id'])
+                    # блокується, поки воркери не звільнять місце — це і є backpressure
+                    while not self._stop.is_set():
+                        try:
+                            self._queue.put(job, timeout=1)
+                            break
+                        except queue.Full:
+                            continue
+            except Exception:
+                logger.exception("summary pipeline planning error:")
+            self._stop.wait(self.interval)
+
+    def _work(self):
+        while not self._stop.is_set():
+            try:
+                job = self._queue.get(timeout=1)
+            except queue.Empty:
+                continue
+            try:
+                summary = build_summary(job['link'], job['id'])
+                self.repo.save_job_summary(job['id'], summary)
+                logger.info("summary pipeline: prepared job id=%s (len=%d)", job['id'], len(summary))
+            except DuplicateVacancy as e:
+                logger.info("summary pipeline: skipped %s", e)
+            except Exception as e:
+                # не зберігаємо заглушку — спробуємо ще раз у наступному циклі
+                logger.warning("summary pipeline: job id=%s failed: %s", job['id'], e)
+            finally:
+                with self._lock:
+                    self._in_flight.discard(job['id'])
+                self._queue.task_done()
+
+    def start(self):
+        if self._threads or not self.ahead:
+            return
+        self._threads.append(threading.Thread(target=self._produce, name="summary-plan", daemon=True))
+        for i in range(self.workers):
+            self._threads.append(threading.Thread(target=self._work, name=f"summary-worker-{i}", daemon=True))
+        for t in self._threads:
+            t.start()
+
+    def stop(self):
+        self._stop.set()
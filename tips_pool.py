@@ -0,0 +1,146 @@
+"""
+Пул заздалегідь згенерованих порад для слотів 10:30 / 18:30.
+
+Фоновий потік тримає в таблиці tips щонайменше min_size неопублікованих порад:
+коли їх менше — генерує пачку через create_useful_tips і відкидає ті, що майже
+повторюють будь-яку пораду з історії (MinHash + LSH, minhash.py).
+Слот постингу лише читає per_post порад з БД і позначає їх опублікованими —
+виклики LLM більше не стоять на шляху публікації.
+"""
+import logging
+import threading
+from typing import Callable, Iterable, Optional
+
+import metrics
+from minhash import LSHIndex, MinHasher, sig_from_bytes, sig_to_bytes
+from storage import JobRepository, get_repo
+
+logger = logging.getLogger(__name__)
+
+PER_POST = 3
+BATCH = 6
+DUPLICATE_THRESHOLD = 0.5  # оцінка схожості Жаккара по символьних шинґлах
+MAX_ATTEMPTS = 3           # додаткових генерацій за один refill, якщо модель повторюється
+
+
+def split_tips(raw: str) -> list[str]:
+    return [line.strip() for line in (raw or "").splitlines() if line.strip()]
+
+
+class TipsPool:
+    def __init__(self, per_post: int = PER_POST, min_size: Optional[int] = None, batch: int = BATCH,
+                 threshold: float = DUPLICATE_THRESHOLD, interval: float = 600,
+                 generate: Optional[Callable[[int], str]] = None, repo: Optional[JobRepository] = None):
+        self.per_post = per_post
+        self.min_size = min_size if min_size is not None else per_post * 4
+        self.batch = batch
+        self.threshold = threshold
+        self.interval = interval
+        self._generate = generate
+        self._repo = repo
+        self._hasher = MinHasher()
+        self._index = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.rejected = 0
+
+    @property
+    def repo(self) -> JobRepository:
+        return self._repo or get_repo()
+
+    def _generate_raw(self, n: int) -> str:
+        if self._generate is not None:
+            return self._generate(n)
+        from OpenAI_agent import create_useful_tips
+        return create_useful_tips(num_tips=n, locale="uk")
+
+    def _ensure_index(self) -> LSHIndex:
+        if self._index is None:
+            index = LSHIndex()
+            for tip_id, sig in self.repo.tip_signatures():
+                index.add(tip_id, sig_from_bytes(sig))
+            self._index = index
+        return self._index
+
+    # --- наповнення ---
+
+    def add(self, texts: Iterable[str], posted: bool = False) -> int:
+        """Додати поради, відкинувши майже-дублікати історії і самої пачки. Повертає кількість доданих."""
+        with self._lock:
+            index = self._ensure_index()
+            fresh = []
+            for i, text in enumerate(texts):
+                sig = self._hasher.signature(text)
+                match = index.best_match(sig, self.threshold)
+                if match is not None:
+                    self.rejected += 1
+                    metrics.inc('tips_rejected_total')
+                    logger.debug("tip rejected as near-duplicate of #%s (%.2f): %s", match[0], match[1], text)
+                    continue
+                # тимчасовий ключ — щоб ловити повтори всередині пачки
+                index.add(('new', i), sig)
+                fresh.append((i, text, sig))
+            if not fresh:
+                return 0
+            ids = self.repo.add_tips([(text, sig_to_bytes(sig)) for _, text, sig in fresh], posted=posted)
+            for (i, _, sig), tip_id in zip(fresh, ids):
+                index.remove(('new', i))
+                index.add(tip_id, sig)
+        return len(ids)
+
+    def refill(self) -> int:
+        """
+        Догенерувати поради, доки в пулі не буде min_size неопублікованих (щонайменше batch за раз).
+        Кожен виклик просить лише per_post порад: create_useful_tips розрахований на один пост
+        (max_output_tokens), довший список обрізався б і в пул потрапили б недописані поради.
+        """
+        missing = self.min_size - self.repo.count_pending_tips()
+        if missing <= 0:
+            return 0
+        wanted = max(self.batch, missing)
+        calls = -(-wanted // self.per_post) + MAX_ATTEMPTS
+        added = 0
+        for _ in range(calls):
+            if added >= wanted:
+                break
+            added += self.add(split_tips(self._generate_raw(self.per_post)))
+        if added:
+            logger.info("tips pool: +%d tips (rejected as duplicates so far: %d)", added, self.rejected)
+        return added
+
+    # --- слот постингу ---
+
+    def take(self) -> list[dict]:
+        """per_post неопублікованих порад (id, text) або [] — якщо пул ще не наповнено."""
+        tips = self.repo.pending_tips(self.per_post)
+        return tips if len(tips) >= self.per_post else []
+
+    def mark_posted(self, tip_ids: Iterable[int]):
+        self.repo.mark_tips_posted(tip_ids)
+        self._wakeup.set()
+
+    def remember(self, texts: Iterable[str]):
+        """Поради, згенеровані в обхід пулу, теж ідуть в історію — щоб пул їх не повторив."""
+        self.add(texts, posted=True)
+
+    # --- фоновий потік ---
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refill()
+            except Exception as e:
+                logger.warning("tips pool refill failed: %s", e)
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="tips-pool", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
@@ -0,0 +1,255 @@
+"""
+Сторінка вакансії: одне завантаження на актуальність і опис.
+
+Раніше для кандидата сторінка качалась двічі: is_vacancy_active (HEAD/GET,
+перші 600 символів) і get_vacancy_description (ще один GET і повний парсинг).
+fetch_vacancy_page робить один запит і з тієї ж відповіді дає статус,
+перевірку фраз «вакансію закрито» і опис (парсинг — лише коли опис потрібен).
+
+Сторінки лежать у невеликому дисковому кеші (PageCache): gzip-файл на URL
+з валідаторами ETag / Last-Modified, витіснення найдавніше використаних (LRU)
+понад PAGE_CACHE_MB. Свіжий запис віддається без мережі, старший —
+перевіряється умовним GET (304 — тіло з кешу). Тож опис після перевірки
+актуальності, повтор після помилки LLM чи повторне summary work.ua не чіпають.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from functools import cached_property
+from typing import Optional
+
+import requests
+
+import http_client
+import metrics
+from parser_work_ua import HEADERS
+
+logger = logging.getLogger(__name__)
+
+PAGE_CACHE_DIR = os.getenv('PAGE_CACHE_DIR', os.path.join('cache', 'pages'))
+PAGE_CACHE_MB = float(os.getenv('PAGE_CACHE_MB', '32'))  # 0 — кеш вимкнено
+# скільки секунд запис вважається свіжим без звернення до work.ua
+LIVENESS_MAX_AGE = 60          # актуальність: майже завжди перевіряємо (умовний GET дешевий)
+DESCRIPTION_MAX_AGE = 24 * 3600
+SNIPPET_CHARS = 600
+
+INACTIVE_PHRASES = (
+    "вакансія неактуальна", "вакансію закрито", "вакансію видалено",
+    "вакансія закрита", "this vacancy is no longer available",
+    "job not found", "объявление удалено", "оголошення видалено",
+    "сторінку не знайдено", "такої сторінки не існує"
+)
+
+
+def extract_description(html: str) -> str:
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, "html.parser")
+    # Залежить від структури сторінки Work.ua
+    description_block = soup.find("div", {"id": "job-description"})
+    if not description_block:
+        # fallback — Work.ua часто використовує інший div
+        description_block = soup.find("div", class_="card wordwrap")
+    return description_block.get_text(separator="\n", strip=True) if description_block else ""
+
+
+class VacancyPage:
+    def __init__(self, url: str, status: Optional[int], html: str = "", error: Optional[str] = None,
+                 from_cache: bool = False, entry: Optional[dict] = None):
+        self.url = url
+        self.status = status
+        self.html = html
+        self.error = error
+        self.from_cache = from_cache
+        self.entry = entry   # запис кешу, з якого (або в який) записано сторінку
+
+    @property
+    def snippet(self) -> str:
+        return self.html[:SNIPPET_CHARS].lower()
+
+    def liveness(self) -> tuple[bool, str]:
+        """(active, reason) — як у старому is_vacancy_active."""
+        if self.error is not None:
+            return False, f"request_error:{self.error}"
+        if self.status in (404, 410):
+            return False, f"status_{self.status}"
+        snippet = self.snippet
+        for p in INACTIVE_PHRASES:
+            if p in snippet:
+                return False, f"phrase:{p}"
+        if self.status == 200:
+            return True, "ok"
+        return False, f"status_{self.status}"
+
+    @cached_property
+    def description(self) -> str:
+        if self.entry is not None and self.entry.get('description') is not None:
+            return self.entry['description']
+        text = extract_description(self.html) if self.status == 200 and self.html else ""
+        if self.entry is not None:
+            # наступні звернення до опису обійдуться без парсингу
+            self.entry['description'] = text
+            cache.store(self.entry)
+        return text
+
+
+class PageCache:
+    """Дисковий LRU-кеш сторінок: <sha1(url)>.gz = рядок JSON з метаданими + HTML."""
+
+    def __init__(self, directory: str = PAGE_CACHE_DIR, max_bytes: int = int(PAGE_CACHE_MB * 1024 * 1024)):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._sizes = None   # ім'я файлу -> розмір; порядок — за часом використання
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(url.encode('utf-8')).hexdigest() + ".gz")
+
+    def _load_index(self):
+        if self._sizes is not None:
+            return
+        entries = []
+        if os.path.isdir(self.directory):
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(".gz"):
+                    st = entry.stat()
+                    entries.append((st.st_mtime, entry.name, st.st_size))
+        entries.sort()
+        self._sizes = {name: size for _, name, size in entries}
+
+    def get(self, url: str) -> Optional[dict]:
+        """{'url', 'status', 'etag', 'last_modified', 'fetched_at', 'description', 'html'} або None."""
+        if not self.max_bytes:
+            return None
+        path = self._path(url)
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                meta = json.loads(f.readline())
+                meta['html'] = f.read()
+        except (OSError, ValueError, EOFError):
+            return None
+        if meta.get('url') != url:
+            return None
+        with self._lock:
+            self._load_index()
+            name = os.path.basename(path)
+            if name in self._sizes:
+                self._sizes[name] = self._sizes.pop(name)
+        try:
+            # mtime — час останнього використання: за ним відновлюється порядок LRU після рестарту
+            os.utime(path)
+        except OSError:
+            pass
+        return meta
+
+    def put(self, url: str, status: int, html: str, etag: Optional[str], last_modified: Optional[str]) -> dict:
+        entry = {'url': url, 'status': status, 'etag': etag, 'last_modified': last_modified,
+                 'fetched_at': time.time(), 'description': None, 'html': html}
+        self.store(entry)
+        return entry
+
+    def store(self, entry: dict):
+        if not self.max_bytes:
+            return
+        meta = {k: v for k, v in entry.items() if k != 'html'}
+        data = gzip.compress((json.dumps(meta, ensure_ascii=False) + "\n" + entry['html']).encode('utf-8'),
+                             compresslevel=6)
+        path = self._path(entry['url'])
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+        with self._lock:
+            self._load_index()
+            name = os.path.basename(path)
+            self._sizes.pop(name, None)
+            self._sizes[name] = len(data)
+            self._evict()
+
+    def touch(self, entry: dict):
+        """Повторна валідація (304): та сама сторінка, новий fetched_at."""
+        entry['fetched_at'] = time.time()
+        self.store(entry)
+
+    def discard(self, url: str):
+        path = self._path(url)
+        with self._lock:
+            self._load_index()
+            self._sizes.pop(os.path.basename(path), None)
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _evict(self):
+        total = sum(self._sizes.values())
+        while total > self.max_bytes and len(self._sizes) > 1:
+            name = next(iter(self._sizes))
+            total -= self._sizes.pop(name)
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+            metrics.inc('page_cache_evictions_total')
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._load_index()
+            return {'entries': len(self._sizes), 'bytes': sum(self._sizes.values())}
+
+
+cache = PageCache()
+
+
+@metrics.timed('vacancy_page')
+def fetch_vacancy_page(url: str, max_age: float = LIVENESS_MAX_AGE) -> VacancyPage:
+    """
+    Сторінка вакансії з кешу (якщо молодша за max_age) або одним GET — умовним,
+    якщо в кеші є валідатори. Мережеві помилки не кидаються: page.error.
+    """
+    entry = cache.get(url)
+    if entry is not None and time.time() - entry['fetched_at'] < max_age:
+        metrics.inc('page_cache_total', result='hit')
+        return VacancyPage(url, entry['status'], entry['html'], from_cache=True, entry=entry)
+
+    headers = dict(HEADERS)
+    if entry is not None:
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+    try:
+        resp = http_client.get(url, headers=headers, timeout=10, allow_redirects=True)
+    except Exception as e:
+        logger.info("[page-error] request failed for %s: %s", url, e)
+        return VacancyPage(url, None, error=str(e))
+
+    if resp.status_code == 304 and entry is not None:
+        metrics.inc('page_cache_total', result='revalidated')
+        cache.touch(entry)
+        return VacancyPage(url, entry['status'], entry['html'], from_cache=True, entry=entry)
+
+    metrics.inc('page_cache_total', result='miss')
+    html = resp.text or ""
+    if resp.status_code == 200:
+        entry = cache.put(url, 200, html, resp.headers.get('ETag'), resp.headers.get('Last-Modified'))
+        return VacancyPage(url, 200, html, entry=entry)
+    if entry is not None:
+        # 404/410/5xx — стару копію більше не віддаємо
+        cache.discard(url)
+    metrics.sampled(logger, logging.DEBUG, "[page-get] %s -> status=%s", url, resp.status_code)
+    return VacancyPage(url, resp.status_code, html)
+
+
+def get_description(url: str, max_age: float = DESCRIPTION_MAX_AGE) -> str:
+    """Опис вакансії; не-200 відповідь — requests.HTTPError, як raise_for_status раніше."""
+    page = fetch_vacancy_page(url, max_age=max_age)
+    if page.error is not None:
+        raise requests.ConnectionError(page.error)
+    if page.status != 200:
+        raise requests.HTTPError(f"{page.status} for url: {url}")
+    return page.description